@@ -0,0 +1,16 @@
+-- Migration: Indexes for the paginated admin user directory
+-- Description: Substring search on email/phone/names via trigram indexes, and composite
+--              indexes matching the role/status filters with newest-first keyset ordering
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- ILIKE '%term%' search
+CREATE INDEX IF NOT EXISTS idx_user_email_trgm ON "user" USING GIN (email gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_user_phone_trgm ON "user" USING GIN (phone gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_user_first_name_trgm ON "user" USING GIN (first_name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_user_last_name_trgm ON "user" USING GIN (last_name gin_trgm_ops);
+
+-- ORDER BY created_at DESC, id DESC with optional role / status filters
+CREATE INDEX IF NOT EXISTS idx_user_role_status_created ON "user" (role, account_status, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_user_status_created ON "user" (account_status, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_user_created ON "user" (created_at DESC, id DESC);
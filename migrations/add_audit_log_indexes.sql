@@ -0,0 +1,23 @@
+-- Migration: Indexes and archive table for the paginated audit log
+-- Description: Newest-first keyset indexes, optionally narrowed by actor / action / target,
+--              plus audit_log_archive for entries past the retention window (see src/audit_archive.py)
+
+CREATE INDEX IF NOT EXISTS idx_audit_log_timestamp ON audit_log (timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_audit_log_actor_timestamp ON audit_log (actor_id, timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_audit_log_action_timestamp ON audit_log (action, timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_audit_log_target_timestamp ON audit_log (target_id, timestamp, id);
+
+CREATE TABLE IF NOT EXISTS audit_log_archive (
+    id VARCHAR(36) PRIMARY KEY,
+    timestamp TIMESTAMP,
+    actor_id VARCHAR(36) NOT NULL,
+    action VARCHAR(100) NOT NULL,
+    target_id VARCHAR(36),
+    details JSON,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_audit_log_archive_timestamp ON audit_log_archive (timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_audit_log_archive_actor_timestamp ON audit_log_archive (actor_id, timestamp, id);
+
+COMMENT ON TABLE audit_log_archive IS 'Audit entries older than the retention window, moved in batches by src/audit_archive.py';
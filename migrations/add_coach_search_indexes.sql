@@ -0,0 +1,19 @@
+-- Migration: Indexes for coach typeahead search and the paginated coach directory
+-- Description: Prefix (text_pattern_ops) and trigram indexes on user names/email, plus a
+--              composite index matching the directory's keyset ordering
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Prefix matches: lower(col) LIKE 'abc%'
+CREATE INDEX IF NOT EXISTS idx_user_first_name_prefix ON "user" (lower(first_name) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_user_last_name_prefix ON "user" (lower(last_name) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_user_email_prefix ON "user" (lower(email) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_user_full_name_prefix ON "user" (lower(first_name || ' ' || last_name) text_pattern_ops);
+
+-- Fuzzy matches: lower(first_name || ' ' || last_name) % 'jon smth'
+CREATE INDEX IF NOT EXISTS idx_user_full_name_trgm ON "user" USING GIN (lower(first_name || ' ' || last_name) gin_trgm_ops);
+
+-- Coach directory: WHERE role = 'coach' AND account_status = 'active' ORDER BY first_name, last_name, id
+CREATE INDEX IF NOT EXISTS idx_user_directory ON "user" (role, account_status, first_name, last_name, id);
+
+CREATE INDEX IF NOT EXISTS idx_coach_profile_user ON coach_profile (user_id);
@@ -0,0 +1,19 @@
+-- Migration: Full-text and trigram search for exercise templates
+-- Description: Weighted tsvector (name > equipment > muscle group > instructions) kept in sync
+--              by a stored generated column, plus a trigram index on name for fuzzy/typeahead matches
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE exercise_template
+ADD COLUMN IF NOT EXISTS search_vector tsvector
+GENERATED ALWAYS AS (
+    setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(equipment, '')), 'B') ||
+    setweight(to_tsvector('simple', coalesce(muscle_group, '')), 'C') ||
+    setweight(to_tsvector('simple', coalesce(instructions, '')), 'D')
+) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_exercise_template_search ON exercise_template USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_exercise_template_name_trgm ON exercise_template USING GIN (name gin_trgm_ops);
+
+COMMENT ON COLUMN exercise_template.search_vector IS 'Generated full-text document used by /exercise-templates search';
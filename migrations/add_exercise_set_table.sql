@@ -0,0 +1,17 @@
+-- Migration: Add exercise_sets table
+-- Description: One typed row (reps INTEGER, weight DOUBLE PRECISION) per performed set of an exercise
+--              completion, so volume / tonnage / best-set figures are SQL aggregates instead of
+--              parsing exercise_completions.reps_completed and weight_used strings in Python.
+--              Rows for existing completions are created by the batched backfill registered with
+--              this migration in src/schema_migrations.py (python -m src.schema_migrations upgrade).
+
+CREATE TABLE IF NOT EXISTS exercise_sets (
+    id VARCHAR(36) PRIMARY KEY,
+    exercise_completion_id VARCHAR(36) NOT NULL REFERENCES exercise_completions(id) ON DELETE CASCADE,
+    set_number INTEGER NOT NULL,
+    reps INTEGER,               -- NULL when not recorded or not a number ("to failure")
+    weight DOUBLE PRECISION,    -- NULL for bodyweight / not recorded
+    CONSTRAINT uq_exercise_sets_completion_set UNIQUE (exercise_completion_id, set_number)
+);
+
+COMMENT ON TABLE exercise_sets IS 'Typed per-set results; exercise_completions.reps_completed / weight_used are kept as a mirror for API compatibility';
@@ -0,0 +1,15 @@
+-- Migration: Add indexes for the expiry sweeper
+-- Description: Indexes for the sweeper (src/expiry_sweeper.py): active subscriptions by end_date (partial)
+--              and bookings by (status, start_time), which serves status IN ('pending', 'pending_credits')
+--              with a start_time range on every backend.
+--              Built CONCURRENTLY, so this file must run outside a transaction.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_package_subscription_expiry
+    ON package_subscription (end_date)
+    WHERE status = 'active';
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_booking_status_start
+    ON booking (status, start_time);
+
+ANALYZE package_subscription;
+ANALYZE booking;
@@ -0,0 +1,41 @@
+-- Migration: Composite and partial indexes for hot route queries
+-- Description: Built CONCURRENTLY so live booking traffic is not blocked; each statement runs
+--              outside a transaction (see run_hot_query_index_migration.py).
+--              A failed concurrent build leaves an INVALID index behind: drop it before re-running.
+--              Verify with: python -m src.index_check
+
+-- Coach calendar range scans ordered by start_time
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_booking_coach_start ON booking (coach_id, start_time);
+
+-- Slot conflict checks only ever look at live bookings
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_booking_coach_live ON booking (coach_id, start_time, end_time)
+    WHERE status IN ('confirmed', 'pending');
+
+-- Customer booking lists, pending-booking conversion, auto-book existence checks
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_booking_customer_coach_start
+    ON booking (customer_id, coach_id, start_time, status);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_booking_customer_start ON booking (customer_id, start_time);
+
+-- "Active subscription of this customer with this coach"
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_package_subscription_customer_coach_status
+    ON package_subscription (customer_id, coach_id, status);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_package_subscription_active
+    ON package_subscription (customer_id, coach_id) WHERE status = 'active';
+
+-- Current / overlapping substitute assignments for a customer
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_coach_assignment_customer_status_dates
+    ON coach_assignment (customer_id, status, start_date, end_date);
+
+-- Per-day availability overrides
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_date_specific_availability_coach_date
+    ON date_specific_availability (coach_id, date);
+
+-- Workout history, newest first
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_workout_completions_customer_completed
+    ON workout_completions (customer_id, completed_at);
+
+ANALYZE booking;
+ANALYZE package_subscription;
+ANALYZE coach_assignment;
+ANALYZE date_specific_availability;
+ANALYZE workout_completions;
@@ -0,0 +1,19 @@
+-- Migration: Add plan_assignment table
+-- Description: One row per (training plan, customer) replacing lookups on training_plan.assigned_customer_ids.
+--              Rows for existing plans are created by the batched backfill registered with this
+--              migration in src/schema_migrations.py (python -m src.schema_migrations upgrade).
+
+CREATE TABLE IF NOT EXISTS plan_assignment (
+    id VARCHAR(36) PRIMARY KEY,
+    plan_id VARCHAR(36) NOT NULL REFERENCES training_plan(id) ON DELETE CASCADE,
+    customer_id VARCHAR(36) NOT NULL REFERENCES customer_profile(id) ON DELETE CASCADE,
+    start_date DATE,  -- NULL means the plan's own start_date applies
+    end_date DATE,    -- NULL means the plan's own end_date applies
+    assigned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_plan_assignment_plan_customer UNIQUE (plan_id, customer_id)
+);
+
+-- Customer plan lookups
+CREATE INDEX IF NOT EXISTS idx_plan_assignment_customer_plan ON plan_assignment (customer_id, plan_id);
+
+COMMENT ON TABLE plan_assignment IS 'Training plans assigned to customers; training_plan.assigned_customer_ids is kept only as a mirror for API compatibility';
@@ -0,0 +1,12 @@
+-- Migration: Add booking horizon columns to recurring_schedule
+-- Description: booked_until is the date sessions have been created up to; next_booking_on is the date
+--              the next unbooked occurrence enters the book_weeks_ahead window. The batch auto-booking
+--              run (src/auto_booking.py) only visits schedules with next_booking_on <= today.
+--              Existing schedules start with NULLs and are booked (and de-duplicated) on the next run.
+
+ALTER TABLE recurring_schedule ADD COLUMN IF NOT EXISTS booked_until DATE;
+ALTER TABLE recurring_schedule ADD COLUMN IF NOT EXISTS next_booking_on DATE;
+
+CREATE INDEX IF NOT EXISTS idx_recurring_schedule_next_booking
+    ON recurring_schedule (next_booking_on)
+    WHERE is_active AND auto_book_enabled;
@@ -0,0 +1,11 @@
+-- Migration: Add due-renewal index on package_subscription
+-- Description: Lets the renewal job (src/renewals.py) find active auto-renewing subscriptions with
+--              next_renewal_date <= today without scanning the table. The credit_ledger table itself is
+--              created by db.create_all().
+--              Built CONCURRENTLY, so this file must run outside a transaction.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_package_subscription_renewal
+    ON package_subscription (next_renewal_date)
+    WHERE status = 'active' AND auto_renew;
+
+ANALYZE package_subscription;
@@ -0,0 +1,5 @@
+-- Migration: Index for coach training plan listings by status
+-- Description: TrainingPlan.status is derived from start_date / end_date; status filters are
+--              applied as ranges over those columns (TrainingPlan.status_is).
+
+CREATE INDEX IF NOT EXISTS idx_training_plan_coach_dates ON training_plan (coach_id, start_date, end_date);
@@ -0,0 +1,6 @@
+-- Migration: Add version column to training_plan
+-- Description: Incremented on every plan or exercise change; keys the compiled exercise cache
+--              (src/plan_documents.py) and optimistic concurrency checks.
+--              ADD COLUMN with a constant default is a metadata-only change on PostgreSQL 11+.
+
+ALTER TABLE training_plan ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
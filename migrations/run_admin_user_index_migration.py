@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Migration runner for admin user directory indexes
+Adds trigram search and role/status keyset indexes on the user table (PostgreSQL only)
+"""
+
+import os
+import sys
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.user import db
+from src.main import app
+
+def run_migration():
+    """Run the admin user index migration"""
+    migration_file = os.path.join(os.path.dirname(__file__), 'add_admin_user_indexes.sql')
+
+    print("Running migration: add_admin_user_indexes")
+    print("=" * 50)
+
+    try:
+        with app.app_context():
+            if db.engine.dialect.name != 'postgresql':
+                print("⚠️  Not a PostgreSQL database - nothing to do. Skipping.")
+                return
+
+            # Read SQL file
+            with open(migration_file, 'r') as f:
+                sql = f.read()
+
+            # Execute SQL
+            db.session.execute(db.text(sql))
+            db.session.commit()
+
+            print("✅ Migration completed successfully!")
+            print("   - Enabled pg_trgm extension")
+            print("   - Created trigram indexes on email, phone and names")
+            print("   - Created role/status/created_at keyset indexes")
+
+    except Exception as e:
+        print(f"❌ Migration failed: {str(e)}")
+        db.session.rollback()
+        sys.exit(1)
+
+if __name__ == '__main__':
+    run_migration()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Migration runner for audit log indexes
+Adds keyset indexes on audit_log and creates audit_log_archive (PostgreSQL only)
+"""
+
+import os
+import sys
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.user import db
+from src.main import app
+
+def run_migration():
+    """Run the audit log index migration"""
+    migration_file = os.path.join(os.path.dirname(__file__), 'add_audit_log_indexes.sql')
+
+    print("Running migration: add_audit_log_indexes")
+    print("=" * 50)
+
+    try:
+        with app.app_context():
+            if db.engine.dialect.name != 'postgresql':
+                print("⚠️  Not a PostgreSQL database - indexes are created by db.create_all(). Skipping.")
+                return
+
+            # Read SQL file
+            with open(migration_file, 'r') as f:
+                sql = f.read()
+
+            # Execute SQL
+            db.session.execute(db.text(sql))
+            db.session.commit()
+
+            print("✅ Migration completed successfully!")
+            print("   - Created audit_log keyset indexes")
+            print("   - Created audit_log_archive table")
+
+    except Exception as e:
+        print(f"❌ Migration failed: {str(e)}")
+        db.session.rollback()
+        sys.exit(1)
+
+if __name__ == '__main__':
+    run_migration()
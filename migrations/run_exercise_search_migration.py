@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Migration runner for exercise template search
+Adds the generated tsvector column and GIN/trigram indexes (PostgreSQL only)
+"""
+
+import os
+import sys
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.user import db
+from src.main import app
+
+def run_migration():
+    """Run the exercise search migration"""
+    migration_file = os.path.join(os.path.dirname(__file__), 'add_exercise_search_index.sql')
+
+    print("Running migration: add_exercise_search_index")
+    print("=" * 50)
+
+    try:
+        with app.app_context():
+            if db.engine.dialect.name != 'postgresql':
+                print("⚠️  Not a PostgreSQL database - SQLite uses the FTS5 index created at startup. Skipping.")
+                return
+
+            # Read SQL file
+            with open(migration_file, 'r') as f:
+                sql = f.read()
+
+            # Execute SQL
+            db.session.execute(db.text(sql))
+            db.session.commit()
+
+            print("✅ Migration completed successfully!")
+            print("   - Enabled pg_trgm extension")
+            print("   - Added exercise_template.search_vector generated column")
+            print("   - Created GIN full-text and trigram indexes")
+
+    except Exception as e:
+        print(f"❌ Migration failed: {str(e)}")
+        db.session.rollback()
+        sys.exit(1)
+
+if __name__ == '__main__':
+    run_migration()
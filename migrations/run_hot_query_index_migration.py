@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Migration runner for hot query indexes
+Adds composite and partial indexes on booking, package_subscription, coach_assignment,
+date_specific_availability and workout_completions (PostgreSQL only)
+"""
+
+import os
+import sys
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.user import db
+from src.main import app
+
+def _statements(sql):
+    """Split the migration into statements, dropping comment lines"""
+    lines = [line for line in sql.splitlines() if not line.strip().startswith('--')]
+    return [statement.strip() for statement in '\n'.join(lines).split(';') if statement.strip()]
+
+def run_migration():
+    """Run the hot query index migration"""
+    migration_file = os.path.join(os.path.dirname(__file__), 'add_hot_query_indexes.sql')
+
+    print("Running migration: add_hot_query_indexes")
+    print("=" * 50)
+
+    try:
+        with app.app_context():
+            if db.engine.dialect.name != 'postgresql':
+                print("⚠️  Not a PostgreSQL database - indexes are created by db.create_all(). Skipping.")
+                return
+
+            # Read SQL file
+            with open(migration_file, 'r') as f:
+                sql = f.read()
+
+            # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+            with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+                for statement in _statements(sql):
+                    print(f"   → {statement.splitlines()[0]}")
+                    connection.execute(db.text(statement))
+
+            print("✅ Migration completed successfully!")
+            print("   - Created booking, subscription, assignment, availability and workout indexes")
+            print("   - Run `python -m src.index_check` to confirm the plans use them")
+
+    except Exception as e:
+        print(f"❌ Migration failed: {str(e)}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    run_migration()
@@ -0,0 +1,204 @@
+"""
+Adherence
+Coach-wide training adherence: which plan days each customer was scheduled to
+train versus the days they logged a workout, as customers x days matrices
+
+Everything is loaded with four queries per coach (customers, assignments with
+their plans, the plans' training days, completions in the window) and computed
+with NumPy, so the cost doesn't grow with queries per customer. Summaries are
+cached per coach and day; logging a workout and every plan, exercise or
+assignment change drops the coach's entries.
+
+A plan schedules day_number N (1-7) on every date whose offset from the plan's
+start_date is N - 1 modulo 7, if the plan has exercises for that day and the
+date is inside both the plan's and the assignment's date range.
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+
+from src.models.user import db, User, CustomerProfile, TrainingPlan, PlanAssignment, Exercise
+from src.models.workout_completion import WorkoutCompletion
+from src.ttl_cache import TTLCache
+
+DEFAULT_WINDOW_DAYS = 28
+MAX_WINDOW_DAYS = 180
+
+# One character per day in a customer's compact row
+DAY_DONE = 'x'      # scheduled and logged
+DAY_MISSED = '.'    # scheduled, not logged, in the past
+DAY_PENDING = 'o'   # scheduled today, not logged yet
+DAY_EXTRA = '+'     # logged on a day nothing was scheduled
+DAY_REST = '-'      # nothing scheduled, nothing logged
+
+# (coach_id, day, window_days) -> summary
+adherence_cache = TTLCache(maxsize=1024, ttl=900)
+
+
+def invalidate_coach(coach_id):
+    adherence_cache.invalidate_where(lambda key: key[0] == coach_id)
+
+
+def _customers(coach_id):
+    return db.session.query(
+        CustomerProfile.id, CustomerProfile.user_id, User.first_name, User.last_name
+    ).join(User, User.id == CustomerProfile.user_id).filter(
+        CustomerProfile.coach_id == coach_id
+    ).order_by(User.first_name, User.last_name, CustomerProfile.id).all()
+
+
+def _assignments(coach_id, first_day, last_day):
+    """Assignments of the coach's started plans that overlap the window"""
+    start = db.func.coalesce(PlanAssignment.start_date, TrainingPlan.start_date)
+    end = db.func.coalesce(PlanAssignment.end_date, TrainingPlan.end_date)
+    return db.session.query(
+        PlanAssignment.customer_id, TrainingPlan.id, TrainingPlan.start_date,
+        TrainingPlan.end_date, PlanAssignment.start_date, PlanAssignment.end_date
+    ).join(TrainingPlan, TrainingPlan.id == PlanAssignment.plan_id).filter(
+        TrainingPlan.coach_id == coach_id,
+        TrainingPlan.start_date.isnot(None),
+        start <= last_day,
+        db.or_(end.is_(None), end >= first_day)
+    ).all()
+
+
+def _training_days(plan_ids):
+    """{plan_id: bool array of length 7, True where day_number i + 1 has exercises}"""
+    days = {plan_id: np.zeros(7, dtype=bool) for plan_id in plan_ids}
+    if plan_ids:
+        rows = db.session.query(Exercise.training_plan_id, Exercise.day_number).filter(
+            Exercise.training_plan_id.in_(plan_ids)
+        ).distinct()
+        for plan_id, day_number in rows:
+            if day_number and 1 <= day_number <= 7:
+                days[plan_id][day_number - 1] = True
+    return days
+
+
+def _completion_days(user_ids, first_day, last_day):
+    return db.session.query(WorkoutCompletion.customer_id, WorkoutCompletion.completed_at).filter(
+        WorkoutCompletion.customer_id.in_(user_ids),
+        WorkoutCompletion.completed_at >= first_day,
+        WorkoutCompletion.completed_at < last_day + timedelta(days=1)
+    ).all() if user_ids else []
+
+
+def _clip_ordinal(value, default):
+    return value.toordinal() if value else default
+
+
+def adherence_matrices(coach_id, first_day, last_day):
+    """
+    Returns:
+        (customers, scheduled, logged) - customers is the list of customer rows and
+        scheduled / logged are bool arrays of shape (len(customers), days in window)
+    """
+    customers = _customers(coach_id)
+    row_of_profile = {customer.id: index for index, customer in enumerate(customers)}
+    row_of_user = {customer.user_id: index for index, customer in enumerate(customers)}
+
+    first = first_day.toordinal()
+    day_count = last_day.toordinal() - first + 1
+    ordinals = np.arange(first, first + day_count)
+
+    scheduled = np.zeros((len(customers), day_count), dtype=bool)
+    logged = np.zeros((len(customers), day_count), dtype=bool)
+
+    assignments = _assignments(coach_id, first_day, last_day)
+    training_days = _training_days({assignment[1] for assignment in assignments})
+    for customer_id, plan_id, plan_start, plan_end, assigned_start, assigned_end in assignments:
+        row = row_of_profile.get(customer_id)
+        if row is None:
+            continue
+        start = max(plan_start.toordinal(), _clip_ordinal(assigned_start, first))
+        end = min(_clip_ordinal(plan_end, ordinals[-1]), _clip_ordinal(assigned_end, ordinals[-1]))
+        active = (ordinals >= start) & (ordinals <= end)
+        scheduled[row] |= active & training_days[plan_id][(ordinals - plan_start.toordinal()) % 7]
+
+    completions = _completion_days(list(row_of_user), first_day, last_day)
+    if completions:
+        rows = np.fromiter((row_of_user[user_id] for user_id, _ in completions), dtype=np.intp, count=len(completions))
+        columns = np.fromiter(
+            (completed_at.date().toordinal() - first for _, completed_at in completions),
+            dtype=np.intp, count=len(completions)
+        )
+        logged[rows, columns] = True
+
+    return customers, scheduled, logged
+
+
+def _current_streaks(hit, miss):
+    """Scheduled days in a row completed, counting back from the latest scheduled day"""
+    positions = np.arange(hit.shape[1])
+    last_miss = np.where(miss, positions, -1).max(axis=1, initial=-1)
+    return (hit & (positions > last_miss[:, None])).sum(axis=1)
+
+
+def _ratio(part, whole):
+    return np.divide(part, whole, out=np.zeros(part.shape, dtype=float), where=whole > 0)
+
+
+def compute_adherence(coach_id, days=DEFAULT_WINDOW_DAYS, today=None):
+    """Uncached adherence summary for the `days` days ending today (see coach_adherence)"""
+    today = today or date.today()
+    first_day = today - timedelta(days=days - 1)
+    customers, scheduled, logged = adherence_matrices(coach_id, first_day, today)
+
+    past = np.ones(scheduled.shape[1], dtype=bool)
+    past[-1] = False  # today's session can still be logged
+    hit = scheduled & logged
+    miss = scheduled & ~logged & past
+    extra = logged & ~scheduled
+
+    due = hit.sum(axis=1) + miss.sum(axis=1)
+    adherence = _ratio(hit.sum(axis=1), due)
+    streaks = _current_streaks(hit, miss)
+
+    codes = np.full(scheduled.shape, DAY_REST, dtype='<U1')
+    codes[extra] = DAY_EXTRA
+    codes[scheduled & ~logged] = DAY_PENDING
+    codes[miss] = DAY_MISSED
+    codes[hit] = DAY_DONE
+
+    daily_due = hit.sum(axis=0) + miss.sum(axis=0)
+    return {
+        'first_day': first_day.isoformat(),
+        'last_day': today.isoformat(),
+        'legend': {'done': DAY_DONE, 'missed': DAY_MISSED, 'pending': DAY_PENDING, 'extra': DAY_EXTRA, 'rest': DAY_REST},
+        'overall_adherence': round(float(hit.sum() / due.sum()), 3) if due.sum() else None,
+        'daily_adherence': [
+            round(float(value), 3) if count else None
+            for value, count in zip(_ratio(hit.sum(axis=0), daily_due), daily_due)
+        ],
+        'customers': [
+            {
+                'customer_id': customer.id,
+                'name': f'{customer.first_name} {customer.last_name}',
+                'scheduled': int(due[index]),
+                'completed': int(hit[index].sum()),
+                'missed': int(miss[index].sum()),
+                'extra': int(extra[index].sum()),
+                'adherence': round(float(adherence[index]), 3) if due[index] else None,
+                'current_streak': int(streaks[index]),
+                'days': ''.join(codes[index])
+            }
+            for index, customer in enumerate(customers)
+        ]
+    }
+
+
+def coach_adherence(coach_id, days=DEFAULT_WINDOW_DAYS):
+    """
+    Adherence of every customer of a coach over the last `days` days.
+
+    Each customer gets counts, adherence (completed / scheduled days that are
+    due), the current streak and a compact one-character-per-day string (see
+    DAY_* codes). Cached per coach and day.
+    """
+    key = (coach_id, date.today(), days)
+    summary = adherence_cache.get(key)
+    if summary is None:
+        summary = compute_adherence(coach_id, days)
+        adherence_cache.set(key, summary)
+    return summary
@@ -0,0 +1,116 @@
+"""
+Admin Bulk Operations
+Set-based account status changes for many users at once (e.g. suspending every
+customer of a departing coach)
+
+Each chunk of users is changed with one UPDATE, audited with one multi-row
+INSERT and committed on its own, so very large batches hold short locks and
+report progress as they go.
+"""
+
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import update
+
+from src.models.user import db, User, CustomerProfile
+from src.admin_stats import move_user_counters
+from src.audit_writer import record_audit_many
+from src.routes.coach_network import coach_search_cache
+
+ACCOUNT_STATUSES = ['active', 'inactive', 'suspended', 'deleted']
+BULK_FILTER_FIELDS = ('role', 'status', 'coach_id')
+
+BULK_CHUNK_SIZE = 500
+BULK_BACKGROUND_THRESHOLD = 2000  # more targets than this run as a background job
+
+
+def bulk_status_targets(actor_id, new_status, user_ids=None, filters=None):
+    """
+    Ids of users a bulk status change applies to, in a stable order.
+
+    Args:
+        actor_id: Admin performing the change (never suspends/deletes themselves)
+        new_status: Target account status; users already in it are skipped
+        user_ids: Explicit list of user ids
+        filters: {'role', 'status', 'coach_id'} - coach_id is a coach profile id
+                 and selects that coach's customers
+    """
+    query = db.session.query(User.id).filter(User.account_status != new_status)
+
+    if user_ids is not None:
+        query = query.filter(User.id.in_(user_ids))
+
+    filters = filters or {}
+    if filters.get('role'):
+        query = query.filter(User.role == filters['role'])
+    if filters.get('status'):
+        query = query.filter(User.account_status == filters['status'])
+    if filters.get('coach_id'):
+        query = query.filter(User.id.in_(
+            db.session.query(CustomerProfile.user_id).filter(CustomerProfile.coach_id == filters['coach_id'])
+        ))
+
+    if new_status in ('deleted', 'suspended'):
+        query = query.filter(User.id != actor_id)
+
+    return [row.id for row in query.order_by(User.id)]
+
+
+def apply_status_change(actor_id, new_status, reason, user_ids, progress=None):
+    """
+    Move user_ids to new_status in chunks of BULK_CHUNK_SIZE.
+
+    Rows are re-checked and locked per chunk, so a re-run after an interruption
+    only touches users not yet changed.
+
+    Returns:
+        {'updated': count, 'by_previous_status': {status: count}}
+    """
+    updated = 0
+    by_previous_status = Counter()
+    coaches_changed = False
+
+    for start in range(0, len(user_ids), BULK_CHUNK_SIZE):
+        chunk = user_ids[start:start + BULK_CHUNK_SIZE]
+        rows = db.session.query(User.id, User.role, User.account_status).filter(
+            User.id.in_(chunk),
+            User.account_status != new_status
+        ).with_for_update().all()
+
+        if rows:
+            now = datetime.utcnow()
+            db.session.execute(
+                update(User)
+                .where(User.id.in_([row.id for row in rows]))
+                .values(
+                    account_status=new_status,
+                    status_changed_at=now,
+                    status_changed_by=actor_id,
+                    status_reason=reason,
+                    deleted_at=now if new_status == 'deleted' else None
+                )
+                .execution_options(synchronize_session=False)
+            )
+            # Bulk UPDATE skips the mapper events that maintain the admin counters
+            move_user_counters(db.session.connection(), Counter(
+                (row.role, row.account_status, new_status) for row in rows
+            ))
+            record_audit_many(actor_id, 'user.status_changed', [
+                (row.id, {'from': row.account_status, 'to': new_status, 'reason': reason, 'bulk': True})
+                for row in rows
+            ])
+
+            updated += len(rows)
+            by_previous_status.update(row.account_status for row in rows)
+            coaches_changed = coaches_changed or any(row.role == 'coach' for row in rows)
+
+        db.session.commit()
+        if progress:
+            progress(min(start + BULK_CHUNK_SIZE, len(user_ids)))
+
+    if coaches_changed:
+        # Only clears this worker's copy; other workers expire theirs within the TTL
+        coach_search_cache.clear()
+
+    return {'updated': updated, 'by_previous_status': dict(by_previous_status)}
@@ -0,0 +1,389 @@
+"""
+Admin Statistics
+Counters and daily rollups maintained incrementally from model write events, so
+admin KPIs are read from a handful of rows instead of counting whole tables
+
+Bulk INSERT/UPDATE statements bypass mapper events, so the set-based writers
+apply the same deltas themselves (move_user_counters, move_subscription_counters,
+add_booking_days). Writers that only touch untracked columns need nothing:
+renewals change credits and dates, and confirming pending bookings keeps them
+live. The nightly reconciliation re-derives everything from the source tables
+to correct any remaining drift; schema migrations 0016/0017 seed the counters
+for rows that predate them.
+
+Usage (cron, nightly):
+    python -m src.admin_stats --days 90
+"""
+
+import argparse
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import event, inspect, text
+
+from src.models.user import db, User, Booking, PackageSubscription
+from src.models.stats import StatCounter, DailyStat
+
+USER_COUNTER_PREFIX = 'users:'
+SUBSCRIPTION_COUNTER_PREFIX = 'subscriptions:'
+
+METRIC_SIGNUPS = 'signups'
+METRIC_BOOKINGS = 'bookings'
+
+DEFAULT_RECONCILE_DAYS = 90
+
+
+def user_counter_name(role, status):
+    return f'{USER_COUNTER_PREFIX}{role}:{status or "active"}'
+
+
+def subscription_counter_name(status):
+    return f'{SUBSCRIPTION_COUNTER_PREFIX}{status or "active"}'
+
+
+def bump_counter(connection, name, delta):
+    """Atomically add delta to a counter inside the caller's transaction"""
+    if not delta:
+        return
+    connection.execute(text(
+        "INSERT INTO stat_counter (name, value, updated_at) VALUES (:name, :delta, CURRENT_TIMESTAMP) "
+        "ON CONFLICT (name) DO UPDATE SET value = stat_counter.value + excluded.value, "
+        "updated_at = CURRENT_TIMESTAMP"
+    ), {'name': name, 'delta': delta})
+
+
+def bump_daily(connection, day, metric, delta):
+    """Atomically add delta to one day's rollup inside the caller's transaction"""
+    if not delta or day is None:
+        return
+    connection.execute(text(
+        "INSERT INTO daily_stat (day, metric, value, updated_at) VALUES (:day, :metric, :delta, CURRENT_TIMESTAMP) "
+        "ON CONFLICT (day, metric) DO UPDATE SET value = daily_stat.value + excluded.value, "
+        "updated_at = CURRENT_TIMESTAMP"
+    ), {'day': day, 'metric': metric, 'delta': delta})
+
+
+def _track_previous_values(*attributes):
+    """
+    Make SQLAlchemy load the old value when these attributes are assigned on an
+    expired instance, so after_update can see what the row changed from.
+    """
+    for attribute in attributes:
+        event.listen(attribute, 'set', lambda target, value, oldvalue, initiator: value,
+                     active_history=True, retval=True)
+
+
+_track_previous_values(
+    User.role, User.account_status,
+    PackageSubscription.status,
+    Booking.status, Booking.event_type, Booking.start_time
+)
+
+
+def _previous(state, attr):
+    """Value of attr before the flush being processed"""
+    history = state.attrs[attr].history
+    return history.deleted[0] if history.deleted else getattr(state.object, attr)
+
+
+def _changed(state, *attrs):
+    return any(state.attrs[attr].history.has_changes() for attr in attrs)
+
+
+# ============================================================================
+# USERS: counters by role/status, daily signups
+# ============================================================================
+
+@event.listens_for(User, 'after_insert')
+def _count_new_user(mapper, connection, target):
+    bump_counter(connection, user_counter_name(target.role, target.account_status), 1)
+    bump_daily(connection, (target.created_at or datetime.utcnow()).date(), METRIC_SIGNUPS, 1)
+
+
+@event.listens_for(User, 'after_update')
+def _count_user_change(mapper, connection, target):
+    state = inspect(target)
+    if not _changed(state, 'role', 'account_status'):
+        return
+    bump_counter(connection, user_counter_name(_previous(state, 'role'), _previous(state, 'account_status')), -1)
+    bump_counter(connection, user_counter_name(target.role, target.account_status), 1)
+
+
+@event.listens_for(User, 'after_delete')
+def _count_deleted_user(mapper, connection, target):
+    bump_counter(connection, user_counter_name(target.role, target.account_status), -1)
+
+
+def move_user_counters(connection, transitions):
+    """
+    Apply counter deltas for users changed by a bulk UPDATE, which skips the
+    mapper events above. transitions maps (role, from_status, to_status) to a count.
+    """
+    for (role, from_status, to_status), count in transitions.items():
+        if from_status == to_status:
+            continue
+        bump_counter(connection, user_counter_name(role, from_status), -count)
+        bump_counter(connection, user_counter_name(role, to_status), count)
+
+
+# ============================================================================
+# SUBSCRIPTIONS: counters by status
+# ============================================================================
+
+@event.listens_for(PackageSubscription, 'after_insert')
+def _count_new_subscription(mapper, connection, target):
+    bump_counter(connection, subscription_counter_name(target.status), 1)
+
+
+@event.listens_for(PackageSubscription, 'after_update')
+def _count_subscription_change(mapper, connection, target):
+    state = inspect(target)
+    if not _changed(state, 'status'):
+        return
+    bump_counter(connection, subscription_counter_name(_previous(state, 'status')), -1)
+    bump_counter(connection, subscription_counter_name(target.status), 1)
+
+
+@event.listens_for(PackageSubscription, 'after_delete')
+def _count_deleted_subscription(mapper, connection, target):
+    bump_counter(connection, subscription_counter_name(target.status), -1)
+
+
+def move_subscription_counters(connection, transitions):
+    """
+    Apply counter deltas for subscriptions changed by a bulk UPDATE.
+    transitions maps (from_status, to_status) to a count.
+    """
+    for (from_status, to_status), count in transitions.items():
+        if from_status == to_status:
+            continue
+        bump_counter(connection, subscription_counter_name(from_status), -count)
+        bump_counter(connection, subscription_counter_name(to_status), count)
+
+
+# ============================================================================
+# BOOKINGS: customer sessions per day (by session date, cancelled excluded)
+# ============================================================================
+
+def _booking_day(status, event_type, start_time):
+    """Day a booking counts towards, or None if it isn't a live customer session"""
+    if status == 'cancelled' or (event_type or 'customer_session') != 'customer_session' or not start_time:
+        return None
+    return start_time.date()
+
+
+@event.listens_for(Booking, 'after_insert')
+def _count_new_booking(mapper, connection, target):
+    bump_daily(connection, _booking_day(target.status, target.event_type, target.start_time), METRIC_BOOKINGS, 1)
+
+
+@event.listens_for(Booking, 'after_update')
+def _count_booking_change(mapper, connection, target):
+    state = inspect(target)
+    if not _changed(state, 'status', 'event_type', 'start_time'):
+        return
+    old_day = _booking_day(_previous(state, 'status'), _previous(state, 'event_type'), _previous(state, 'start_time'))
+    new_day = _booking_day(target.status, target.event_type, target.start_time)
+    if old_day != new_day:
+        bump_daily(connection, old_day, METRIC_BOOKINGS, -1)
+        bump_daily(connection, new_day, METRIC_BOOKINGS, 1)
+
+
+@event.listens_for(Booking, 'after_delete')
+def _count_deleted_booking(mapper, connection, target):
+    bump_daily(connection, _booking_day(target.status, target.event_type, target.start_time), METRIC_BOOKINGS, -1)
+
+
+def add_booking_days(connection, bookings, sign=1):
+    """
+    Apply rollup deltas for bookings written by a bulk INSERT (sign=1) or
+    taken out of the rollup by a bulk UPDATE/DELETE (sign=-1). bookings are
+    (status, event_type, start_time) tuples of the counted state.
+    """
+    days = {}
+    for status, event_type, start_time in bookings:
+        day = _booking_day(status, event_type, start_time)
+        if day is not None:
+            days[day] = days.get(day, 0) + 1
+    for day, count in days.items():
+        bump_daily(connection, day, METRIC_BOOKINGS, sign * count)
+
+
+# ============================================================================
+# RECONCILIATION
+# ============================================================================
+
+def _replace_counters(prefix, counts):
+    StatCounter.query.filter(StatCounter.name.like(f'{prefix}%')).delete(synchronize_session=False)
+    for name, value in counts.items():
+        db.session.add(StatCounter(name=name, value=value))
+
+
+def _replace_daily(metric, start, end, counts):
+    DailyStat.query.filter(
+        DailyStat.metric == metric, DailyStat.day >= start, DailyStat.day < end
+    ).delete(synchronize_session=False)
+    for day, value in counts.items():
+        db.session.add(DailyStat(day=day, metric=metric, value=value))
+
+
+def _as_date(value):
+    # SQLite returns func.date() as a string
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def reconcile_user_counters():
+    """Recompute every users:* counter from the user table"""
+    rows = db.session.query(
+        User.role, User.account_status, db.func.count(User.id)
+    ).group_by(User.role, User.account_status).all()
+    _replace_counters(USER_COUNTER_PREFIX, {user_counter_name(role, status): count for role, status, count in rows})
+    db.session.commit()
+
+
+def seed_user_counters(max_batches=None):
+    """Schema migration 0016: count the users that predate the counters"""
+    reconcile_user_counters()
+    return True
+
+
+def reconcile_stats(days=DEFAULT_RECONCILE_DAYS):
+    """
+    Re-derive all counters, plus daily rollups for the last `days` days (and the
+    same span of future booking dates), from the source tables in one transaction.
+    """
+    rows = db.session.query(
+        User.role, User.account_status, db.func.count(User.id)
+    ).group_by(User.role, User.account_status).all()
+    _replace_counters(USER_COUNTER_PREFIX, {user_counter_name(role, status): count for role, status, count in rows})
+
+    rows = db.session.query(
+        PackageSubscription.status, db.func.count(PackageSubscription.id)
+    ).group_by(PackageSubscription.status).all()
+    _replace_counters(SUBSCRIPTION_COUNTER_PREFIX, {subscription_counter_name(status): count for status, count in rows})
+
+    start = date.today() - timedelta(days=days)
+    end = date.today() + timedelta(days=days + 1)
+
+    signup_day = db.func.date(User.created_at)
+    rows = db.session.query(signup_day, db.func.count(User.id)).filter(
+        User.created_at >= datetime.combine(start, datetime.min.time()),
+        User.created_at < datetime.combine(end, datetime.min.time())
+    ).group_by(signup_day).all()
+    _replace_daily(METRIC_SIGNUPS, start, end, {_as_date(day): count for day, count in rows})
+
+    booking_day = db.func.date(Booking.start_time)
+    rows = db.session.query(booking_day, db.func.count(Booking.id)).filter(
+        Booking.start_time >= datetime.combine(start, datetime.min.time()),
+        Booking.start_time < datetime.combine(end, datetime.min.time()),
+        Booking.status != 'cancelled',
+        db.or_(Booking.event_type == 'customer_session', Booking.event_type.is_(None))
+    ).group_by(booking_day).all()
+    _replace_daily(METRIC_BOOKINGS, start, end, {_as_date(day): count for day, count in rows})
+
+    db.session.commit()
+
+
+def seed_admin_stats(max_batches=None):
+    """
+    Schema migration 0017: derive subscription counters and the signup and
+    booking rollups for every existing row (the whole span of dates in use)
+    """
+    today = date.today()
+    earliest = [
+        value for value in (
+            db.session.query(db.func.min(User.created_at)).scalar(),
+            db.session.query(db.func.min(Booking.start_time)).scalar()
+        ) if value
+    ]
+    latest = db.session.query(db.func.max(Booking.start_time)).scalar()
+    days = max(
+        [DEFAULT_RECONCILE_DAYS] +
+        [(today - value.date()).days for value in earliest] +
+        ([(latest.date() - today).days] if latest else [])
+    )
+    reconcile_stats(days)
+    return True
+
+
+# ============================================================================
+# READERS
+# ============================================================================
+
+def _counters(prefix):
+    return {
+        counter.name[len(prefix):]: counter.value
+        for counter in StatCounter.query.filter(StatCounter.name.like(f'{prefix}%')).all()
+    }
+
+
+def user_counts():
+    """Return {(role, status): count} from the maintained counters"""
+    counters = _counters(USER_COUNTER_PREFIX)
+    return {tuple(key.split(':', 1)): value for key, value in counters.items()}
+
+
+def user_total(role=None, status=None):
+    """Number of users matching the optional role/status filter, without touching the user table"""
+    return sum(
+        count for (counter_role, counter_status), count in user_counts().items()
+        if (not role or counter_role == role) and (not status or counter_status == status)
+    )
+
+
+def daily_series(metric, start, end):
+    """[{day, value}] for every day in [start, end], zero-filled"""
+    values = {
+        row.day: row.value
+        for row in DailyStat.query.filter(
+            DailyStat.metric == metric, DailyStat.day >= start, DailyStat.day <= end
+        ).all()
+    }
+    series = []
+    day = start
+    while day <= end:
+        series.append({'day': day.isoformat(), 'value': values.get(day, 0)})
+        day += timedelta(days=1)
+    return series
+
+
+def dashboard_stats(days=30):
+    """Admin KPIs: user counts, subscriptions by status, signups and bookings for the last `days` days"""
+    counts = user_counts()
+    by_role = {}
+    by_status = {}
+    for (role, status), count in counts.items():
+        by_role[role] = by_role.get(role, 0) + count
+        by_status[status] = by_status.get(status, 0) + count
+
+    subscriptions = _counters(SUBSCRIPTION_COUNTER_PREFIX)
+    end = date.today()
+    start = end - timedelta(days=days - 1)
+
+    return {
+        'users': {
+            'total': sum(counts.values()),
+            'by_role': by_role,
+            'by_status': by_status,
+            'by_role_and_status': [
+                {'role': role, 'status': status, 'count': count}
+                for (role, status), count in sorted(counts.items())
+            ]
+        },
+        'subscriptions': {
+            'active': subscriptions.get('active', 0),
+            'by_status': subscriptions
+        },
+        'signups': daily_series(METRIC_SIGNUPS, start, end),
+        'bookings': daily_series(METRIC_BOOKINGS, start, end)
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Rebuild admin counters and daily rollups from source tables')
+    parser.add_argument('--days', type=int, default=DEFAULT_RECONCILE_DAYS, help='Days of daily rollups to re-derive')
+    args = parser.parse_args()
+
+    from src.main import app
+    with app.app_context():
+        reconcile_stats(args.days)
+        print(f"✅ Reconciled admin counters and {args.days} days of daily rollups")
@@ -0,0 +1,71 @@
+"""
+Audit Log Archival
+Moves audit entries older than the retention window from audit_log into
+audit_log_archive in small batches, so the live table only holds recent history
+
+Usage (cron):
+    python -m src.audit_archive --days 180 --batch-size 1000
+"""
+
+import argparse
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select
+
+from src.models.user import db, AuditLog, AuditLogArchive
+
+DEFAULT_RETENTION_DAYS = 180
+DEFAULT_BATCH_SIZE = 1000
+
+ARCHIVED_COLUMNS = ['id', 'timestamp', 'actor_id', 'action', 'target_id', 'details']
+
+
+def archive_audit_entries(older_than_days=DEFAULT_RETENTION_DAYS, batch_size=DEFAULT_BATCH_SIZE, max_batches=None):
+    """
+    Archive audit entries older than `older_than_days`, oldest first.
+
+    Each batch copies and deletes at most `batch_size` rows in its own short
+    transaction, so admin actions writing to audit_log are never blocked for long.
+    Safe to interrupt and re-run.
+
+    Returns:
+        int: number of entries archived
+    """
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    archived = 0
+    batches = 0
+
+    while max_batches is None or batches < max_batches:
+        ids = [row[0] for row in db.session.query(AuditLog.id).filter(
+            AuditLog.timestamp < cutoff
+        ).order_by(AuditLog.timestamp, AuditLog.id).limit(batch_size).all()]
+        if not ids:
+            break
+
+        source = AuditLog.__table__
+        db.session.execute(
+            insert(AuditLogArchive.__table__).from_select(
+                ARCHIVED_COLUMNS,
+                select(*[source.c[name] for name in ARCHIVED_COLUMNS]).where(source.c.id.in_(ids))
+            )
+        )
+        db.session.execute(source.delete().where(source.c.id.in_(ids)))
+        db.session.commit()
+
+        archived += len(ids)
+        batches += 1
+
+    return archived
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Move old audit log entries to audit_log_archive')
+    parser.add_argument('--days', type=int, default=DEFAULT_RETENTION_DAYS, help='Keep this many days in audit_log')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--max-batches', type=int, default=None)
+    args = parser.parse_args()
+
+    from src.main import app
+    with app.app_context():
+        count = archive_audit_entries(args.days, args.batch_size, args.max_batches)
+        print(f"✅ Archived {count} audit log entries older than {args.days} days")
@@ -0,0 +1,217 @@
+"""
+Audit Writer
+Buffers audit log entries in memory and inserts them in batches from a background
+thread, keeping the extra INSERT off the request path
+
+Set AUDIT_SYNC_WRITES=1 for crash-safe mode: entries are then added to the caller's
+session and committed in the same transaction as the change they describe.
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+
+from src.models.user import db, AuditLog
+
+DEFAULT_QUEUE_SIZE = 10000
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_FLUSH_INTERVAL = 1.0    # seconds an entry may wait before its batch is written
+DEFAULT_ENQUEUE_TIMEOUT = 0.05  # seconds a request waits on a full queue before writing inline
+
+_STOP = object()
+
+
+class AuditWriter:
+    def __init__(self, maxsize=DEFAULT_QUEUE_SIZE, batch_size=DEFAULT_BATCH_SIZE,
+                 flush_interval=DEFAULT_FLUSH_INTERVAL, enqueue_timeout=DEFAULT_ENQUEUE_TIMEOUT):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._app = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.sync = False
+
+    def init_app(self, app):
+        self._app = app
+        self.sync = bool(app.config.get('AUDIT_SYNC_WRITES'))
+        atexit.register(self.shutdown)
+
+    # ------------------------------------------------------------------
+    # Producer side (request threads)
+    # ------------------------------------------------------------------
+
+    def record(self, actor_id, action, target_id=None, details=None):
+        """
+        Record an audit entry.
+
+        Synchronous mode adds the row to the current session (committed by the caller).
+        Otherwise the row is held on the session and only queued once the caller's
+        transaction commits, so a rolled-back change never leaves an audit entry.
+        """
+        row = self._row(actor_id, action, target_id, details)
+
+        if self.sync or self._app is None:
+            db.session.add(AuditLog(**row))
+            return
+
+        db.session().info.setdefault('pending_audit', []).append(row)
+
+    def record_many(self, actor_id, action, entries):
+        """
+        Record one audit entry per (target_id, details) pair. Synchronous mode
+        inserts them with a single multi-row statement in the caller's transaction.
+        """
+        rows = [self._row(actor_id, action, target_id, details) for target_id, details in entries]
+        if not rows:
+            return
+
+        if self.sync or self._app is None:
+            db.session.execute(insert(AuditLog.__table__), rows)
+            return
+
+        db.session().info.setdefault('pending_audit', []).extend(rows)
+
+    @staticmethod
+    def _row(actor_id, action, target_id, details):
+        return {
+            'id': str(uuid.uuid4()),
+            'timestamp': datetime.utcnow(),
+            'actor_id': actor_id,
+            'action': action,
+            'target_id': target_id,
+            'details': details
+        }
+
+    def enqueue(self, rows):
+        """
+        Hand committed rows to the background thread. If the queue stays full for
+        enqueue_timeout the rows are written inline instead of being dropped, which
+        throttles callers while the writer catches up.
+        """
+        self._ensure_thread()
+        overflow = []
+        for row in rows:
+            try:
+                self._queue.put(row, timeout=self.enqueue_timeout)
+            except queue.Full:
+                overflow.append(row)
+        if overflow:
+            self._write_batch(overflow)
+
+    def flush(self):
+        """Block until every queued entry has been written"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def shutdown(self, timeout=10):
+        """Drain the queue and stop the background thread (registered with atexit)"""
+        with self._lock:
+            thread = self._thread
+            if thread is None or not thread.is_alive() or self._pid != os.getpid():
+                return
+            self._queue.put(_STOP)
+            self._thread = None
+        thread.join(timeout)
+
+    # ------------------------------------------------------------------
+    # Consumer side (background thread)
+    # ------------------------------------------------------------------
+
+    def _ensure_thread(self):
+        # Threads don't survive fork, so gunicorn workers each start their own
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            if self._pid != os.getpid():
+                self._queue = queue.Queue(maxsize=self._queue.maxsize)
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                self._queue.task_done()
+                return
+
+            batch = [first]
+            stop = False
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            try:
+                self._write_batch(batch)
+            finally:
+                for _ in range(len(batch) + (1 if stop else 0)):
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _write_batch(self, rows):
+        """Insert rows with one multi-row statement in its own session"""
+        with self._app.app_context():
+            try:
+                db.session.execute(insert(AuditLog.__table__), rows)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                self._app.logger.error(f'Audit batch of {len(rows)} failed, retrying row by row: {str(e)}')
+                for row in rows:
+                    try:
+                        db.session.execute(insert(AuditLog.__table__), [row])
+                        db.session.commit()
+                    except Exception as row_error:
+                        db.session.rollback()
+                        self._app.logger.error(f'Dropping audit entry {row["action"]} for {row["target_id"]}: {str(row_error)}')
+            finally:
+                db.session.remove()
+
+
+# Process-wide writer, bound to the Flask app in main.py
+audit_writer = AuditWriter()
+
+
+@event.listens_for(Session, 'after_commit')
+def _enqueue_committed_audit(session):
+    rows = session.info.pop('pending_audit', None)
+    if rows:
+        audit_writer.enqueue(rows)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_rolled_back_audit(session):
+    session.info.pop('pending_audit', None)
+
+
+def record_audit(actor_id, action, target_id=None, details=None):
+    """Record an admin/business action in the audit log"""
+    audit_writer.record(actor_id, action, target_id=target_id, details=details)
+
+
+def record_audit_many(actor_id, action, entries):
+    """Record the same action against many targets; entries are (target_id, details) pairs"""
+    audit_writer.record_many(actor_id, action, entries)
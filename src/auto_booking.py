@@ -0,0 +1,274 @@
+"""
+Auto Booking
+Creates the sessions of recurring schedules (RecurringSchedule) for every
+coach in batches: each schedule remembers the last date it was booked up to
+(booked_until), so a run only looks at the weeks that came into its
+book_weeks_ahead window since the previous run
+
+next_booking_on is the date the first occurrence after booked_until enters
+that window, so finding due schedules is one indexed range scan. The horizon
+never moves past a paused occurrence: a paused schedule stays due and is
+booked from the first run after its pause ends or is lifted.
+
+Per batch of schedules there is one query for their subscriptions (locked, so
+credits are decided consistently), one for the bookings that already exist in
+the new weeks, one multi-row INSERT of new bookings, one executemany UPDATE
+each for subscription credits and schedule horizons, and the credits spent go
+to the credit ledger and session_credits (src/pending_bookings.py) - then a
+commit.
+Concurrent runners skip schedules another runner has locked.
+
+Run from cron:
+    python -m src.auto_booking
+or in-process, every AUTO_BOOKING_INTERVAL seconds (see main.py):
+    AUTO_BOOKING_INTERVAL=3600
+"""
+
+import argparse
+import threading
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import insert, or_, tuple_, update
+
+from src.models.user import db, Package, PackageSubscription, RecurringSchedule, Booking
+from src.admin_stats import add_booking_days
+from src.pending_bookings import record_credit_spend
+
+AUTO_BOOK_BATCH_SIZE = 200
+
+
+def due_schedules_filter(today):
+    """Active auto-booking schedules with an occurrence that entered their window by today"""
+    return [
+        RecurringSchedule.is_active.is_(True),
+        RecurringSchedule.auto_book_enabled.is_(True),
+        or_(RecurringSchedule.next_booking_on.is_(None), RecurringSchedule.next_booking_on <= today)
+    ]
+
+
+def _next_booking_on(schedule, horizon):
+    """The day the schedule's first occurrence after horizon comes within book_weeks_ahead"""
+    next_occurrence = horizon + timedelta(days=(schedule.day_of_week - horizon.weekday() - 1) % 7 + 1)
+    return next_occurrence - timedelta(weeks=schedule.book_weeks_ahead or 0)
+
+
+def _new_dates(schedule, subscription, today):
+    """
+    Dates of this schedule's weekday not booked before, inside its window and
+    subscription, and the date the schedule is then booked up to.
+
+    Booking stops at the first occurrence inside paused_until and the horizon
+    stays before it, so those weeks are still booked once the pause ends, is
+    shortened or is lifted.
+    """
+    horizon = today + timedelta(weeks=schedule.book_weeks_ahead or 0)
+    if subscription.end_date:
+        horizon = min(horizon, subscription.end_date)
+
+    first = today
+    if schedule.booked_until and schedule.booked_until >= first:
+        first = schedule.booked_until + timedelta(days=1)
+    first += timedelta(days=(schedule.day_of_week - first.weekday()) % 7)
+
+    dates = []
+    current = first
+    while current <= horizon:
+        if schedule.paused_until and current <= schedule.paused_until:
+            return dates, current - timedelta(days=1)
+        dates.append(current)
+        current += timedelta(weeks=1)
+    return dates, horizon
+
+
+def book_schedules(schedule_ids, today=None):
+    """
+    Create the missing sessions of the given schedules. Runs in the caller's
+    transaction; does not commit.
+
+    Returns:
+        {'confirmed': n, 'pending': n} bookings created
+    """
+    today = today or date.today()
+    created = {'confirmed': 0, 'pending': 0}
+
+    schedules = RecurringSchedule.query.filter(
+        RecurringSchedule.id.in_(schedule_ids)
+    ).with_for_update(skip_locked=True).all()
+    if not schedules:
+        return created
+
+    subscriptions = {
+        subscription.id: (subscription, is_unlimited)
+        for subscription, is_unlimited in db.session.query(PackageSubscription, Package.is_unlimited).join(
+            Package, Package.id == PackageSubscription.package_id
+        ).filter(
+            PackageSubscription.id.in_({schedule.subscription_id for schedule in schedules})
+        ).with_for_update(of=PackageSubscription)
+    }
+
+    planned = []  # (schedule, subscription, is_unlimited, start, end)
+    horizons = []
+    for schedule in sorted(schedules, key=lambda schedule: (schedule.subscription_id, schedule.id)):
+        subscription, is_unlimited = subscriptions.get(schedule.subscription_id, (None, False))
+        if subscription is None or subscription.status != 'active':
+            continue
+        dates, horizon = _new_dates(schedule, subscription, today)
+        if horizon < today:
+            # Ended subscription, or paused from today on: stays due until there is something to book
+            continue
+        horizons.append({
+            'id': schedule.id,
+            'booked_until': horizon,
+            'next_booking_on': _next_booking_on(schedule, horizon)
+        })
+        for day in dates:
+            planned.append((
+                schedule, subscription, is_unlimited,
+                datetime.combine(day, schedule.start_time), datetime.combine(day, schedule.end_time)
+            ))
+
+    existing = set()
+    if planned:
+        existing = {
+            tuple(row) for row in db.session.query(Booking.customer_id, Booking.coach_id, Booking.start_time).filter(
+                tuple_(Booking.customer_id, Booking.coach_id).in_(
+                    {(schedule.customer_id, schedule.coach_id) for schedule, *_ in planned}
+                ),
+                Booking.start_time >= min(start for _, _, _, start, _ in planned),
+                Booking.start_time <= max(start for _, _, _, start, _ in planned),
+                Booking.status != 'cancelled'
+            )
+        }
+
+    bookings = []
+    credits = {}
+    first_booking = {}  # subscription_id -> first booking paid with its credits
+    # Earliest sessions get the credits first
+    for schedule, subscription, is_unlimited, start, end in sorted(planned, key=lambda item: item[3]):
+        if (schedule.customer_id, schedule.coach_id, start) in existing:
+            continue
+        existing.add((schedule.customer_id, schedule.coach_id, start))
+
+        remaining = credits.get(subscription.id, subscription.credits_remaining or 0)
+        confirmed = is_unlimited or remaining > 0
+        booking_id = str(uuid.uuid4())
+        if confirmed and not is_unlimited:
+            credits[subscription.id] = remaining - 1
+            first_booking.setdefault(subscription.id, booking_id)
+        bookings.append({
+            'id': booking_id,
+            'customer_id': schedule.customer_id,
+            'coach_id': schedule.coach_id,
+            'subscription_id': subscription.id,
+            'start_time': start,
+            'end_time': end,
+            'status': 'confirmed' if confirmed else 'pending',
+            'event_type': 'customer_session',
+            'created_at': datetime.utcnow()
+        })
+        created['confirmed' if confirmed else 'pending'] += 1
+
+    if bookings:
+        db.session.execute(insert(Booking.__table__), bookings)
+        add_booking_days(db.session.connection(), [
+            (booking['status'], booking['event_type'], booking['start_time']) for booking in bookings
+        ])
+    if credits:
+        # Spent counts from the locked balances, before the UPDATE refreshes them
+        spent = [
+            {
+                'subscription_id': subscription_id,
+                'customer_id': subscriptions[subscription_id][0].customer_id,
+                'coach_id': subscriptions[subscription_id][0].coach_id,
+                'count': (subscriptions[subscription_id][0].credits_remaining or 0) - remaining,
+                'balance_after': remaining,
+                'booking_id': first_booking[subscription_id]
+            }
+            for subscription_id, remaining in credits.items()
+        ]
+        db.session.execute(update(PackageSubscription), [
+            {
+                'id': row['subscription_id'],
+                'credits_remaining': row['balance_after'],
+                'credits_used': (subscriptions[row['subscription_id']][0].credits_used or 0) + row['count']
+            }
+            for row in spent
+        ])
+        record_credit_spend(spent)
+    if horizons:
+        db.session.execute(update(RecurringSchedule), horizons)
+    return created
+
+
+def run_auto_booking(coach_id=None, today=None, batch_size=AUTO_BOOK_BATCH_SIZE, log=print):
+    """
+    Book every due schedule (optionally of one coach), committing per batch.
+
+    Returns:
+        {'schedules': n, 'confirmed': n, 'pending': n}
+    """
+    today = today or date.today()
+    totals = {'schedules': 0, 'confirmed': 0, 'pending': 0}
+    last_id = None
+
+    while True:
+        query = db.session.query(RecurringSchedule.id).join(
+            PackageSubscription, PackageSubscription.id == RecurringSchedule.subscription_id
+        ).filter(*due_schedules_filter(today), PackageSubscription.status == 'active')
+        if coach_id:
+            query = query.filter(RecurringSchedule.coach_id == coach_id)
+        if last_id is not None:
+            query = query.filter(RecurringSchedule.id > last_id)
+        schedule_ids = [row.id for row in query.order_by(RecurringSchedule.id).limit(batch_size)]
+        if not schedule_ids:
+            break
+
+        try:
+            created = book_schedules(schedule_ids, today)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        last_id = schedule_ids[-1]
+        totals['schedules'] += len(schedule_ids)
+        totals['confirmed'] += created['confirmed']
+        totals['pending'] += created['pending']
+
+    if totals['confirmed'] or totals['pending']:
+        log(f"   auto-booking: {totals['confirmed']} confirmed, {totals['pending']} pending "
+            f"from {totals['schedules']} schedules")
+    return totals
+
+
+def init_app(app):
+    """Start the in-process scheduler thread if AUTO_BOOKING_INTERVAL (seconds) is set"""
+    interval = app.config.get('AUTO_BOOKING_INTERVAL') or 0
+    if interval <= 0:
+        return
+
+    def loop():
+        while True:
+            with app.app_context():
+                try:
+                    run_auto_booking(log=app.logger.info)
+                except Exception as e:
+                    app.logger.error(f'Auto-booking run failed: {str(e)}')
+                finally:
+                    db.session.remove()
+            time.sleep(interval)
+
+    threading.Thread(target=loop, name='auto-booking', daemon=True).start()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Create bookings for due recurring schedules')
+    parser.add_argument('--coach', help='Only this coach profile id')
+    args = parser.parse_args()
+
+    from src.main import app
+    with app.app_context():
+        result = run_auto_booking(coach_id=args.coach)
+        print(f"✅ Auto-booking done: {result}")
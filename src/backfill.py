@@ -0,0 +1,124 @@
+"""
+Online Backfills
+Processes a large table in small keyset-ordered batches, each in its own short
+transaction, so data migrations never hold long locks on hot tables like booking
+
+- Resumable: the last processed key is committed with each batch (backfill_progress)
+- Throttled: sleeps between batches in proportion to how long the batch took
+- Lock-friendly: on PostgreSQL each batch gives up quickly if it has to wait for a
+  row lock, backs off and retries instead of queueing ahead of live traffic
+"""
+
+import time
+from datetime import datetime
+
+from sqlalchemy.exc import OperationalError
+
+from src.models.user import db
+from src.models.migration import BackfillProgress
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_MIN_PAUSE = 0.05    # seconds to sleep after every batch
+DEFAULT_THROTTLE = 1.0      # extra sleep as a multiple of the batch's duration (1.0 = at most ~50% busy)
+DEFAULT_LOCK_TIMEOUT_MS = 2000
+MAX_RETRIES = 5
+
+
+def _progress(name):
+    progress = BackfillProgress.query.get(name)
+    if progress is None:
+        progress = BackfillProgress(name=name, rows_processed=0, batches=0)
+        db.session.add(progress)
+        db.session.commit()
+    return progress
+
+
+def backfill_status(name):
+    """Progress row for a backfill as a dict, or None if it never started"""
+    progress = BackfillProgress.query.get(name)
+    return progress.to_dict() if progress else None
+
+
+def reset_backfill(name):
+    """Forget a backfill's progress so the next run starts from the beginning"""
+    BackfillProgress.query.filter_by(name=name).delete()
+    db.session.commit()
+
+
+def run_backfill(name, key_column, process_batch, where=None, batch_size=DEFAULT_BATCH_SIZE,
+                 min_pause=DEFAULT_MIN_PAUSE, throttle=DEFAULT_THROTTLE,
+                 lock_timeout_ms=DEFAULT_LOCK_TIMEOUT_MS, max_batches=None, log=print):
+    """
+    Walk the rows of key_column's table in key order and hand them to process_batch.
+
+    Args:
+        name: Unique backfill name; progress is stored under it
+        key_column: Unique, indexed column to page by (normally the primary key)
+        process_batch: Function(keys) -> rows changed. Runs inside the batch's
+                       transaction and must not commit.
+        where: Optional filter limiting which rows are visited
+        batch_size: Keys per batch
+        min_pause / throttle: Sleep max(min_pause, batch_duration * throttle) between batches
+        lock_timeout_ms: PostgreSQL lock_timeout per batch
+        max_batches: Stop after this many batches (resume later)
+        log: Progress callback taking a message string
+
+    Returns:
+        True when every row has been processed, False if stopped by max_batches
+    """
+    progress = _progress(name)
+    if progress.completed_at is not None:
+        log(f"   {name}: already complete ({progress.rows_processed} rows)")
+        return True
+
+    last_key = progress.last_key
+    batches = 0
+    postgres = db.engine.dialect.name == 'postgresql'
+
+    while max_batches is None or batches < max_batches:
+        query = db.session.query(key_column)
+        if where is not None:
+            query = query.filter(where)
+        if last_key is not None:
+            query = query.filter(key_column > last_key)
+        keys = [row[0] for row in query.order_by(key_column).limit(batch_size)]
+
+        if not keys:
+            progress = BackfillProgress.query.get(name)
+            progress.completed_at = datetime.utcnow()
+            db.session.commit()
+            log(f"   {name}: complete ({progress.rows_processed} rows in {progress.batches} batches)")
+            return True
+
+        started = time.monotonic()
+        for attempt in range(1, MAX_RETRIES + 1):
+            try:
+                if postgres:
+                    db.session.execute(db.text(f"SET LOCAL lock_timeout = '{int(lock_timeout_ms)}ms'"))
+                changed = process_batch(keys) or 0
+                progress = BackfillProgress.query.get(name)
+                progress.last_key = str(keys[-1])
+                progress.rows_processed += changed
+                progress.batches += 1
+                db.session.commit()
+                break
+            except OperationalError as e:
+                db.session.rollback()
+                if attempt == MAX_RETRIES:
+                    raise
+                backoff = min(2 ** attempt * 0.1, 5)
+                log(f"   {name}: batch after {last_key} hit {e.orig.__class__.__name__}, retrying in {backoff:.1f}s")
+                time.sleep(backoff)
+            except Exception:
+                db.session.rollback()
+                raise
+
+        last_key = keys[-1]
+        batches += 1
+        elapsed = time.monotonic() - started
+        if progress.batches % 10 == 0:
+            log(f"   {name}: {progress.rows_processed} rows after {progress.batches} batches")
+        time.sleep(max(min_pause, elapsed * throttle))
+
+    log(f"   {name}: paused after {batches} batches, will resume from {last_key}")
+    return False
@@ -0,0 +1,65 @@
+"""
+Background Jobs
+Runs long operations on a worker thread and records their progress in the
+background_job table, so the client can poll any gunicorn worker for status
+
+Jobs must commit their work in chunks and be safe to re-run: a worker restart
+leaves an interrupted job in 'running' and the caller simply submits it again.
+"""
+
+import threading
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import update
+
+from src.models.user import db
+from src.models.job import BackgroundJob
+
+
+def start_job(kind, created_by, total, target, *args, **kwargs):
+    """
+    Create a job row and run target(*args, progress=callback, **kwargs) on a
+    daemon thread inside the app context. target's return value (JSON-serializable)
+    is stored as the job result.
+
+    Returns:
+        The committed BackgroundJob
+    """
+    job = BackgroundJob(kind=kind, created_by=created_by, total=total, status='queued')
+    db.session.add(job)
+    db.session.commit()
+
+    app = current_app._get_current_object()
+    thread = threading.Thread(
+        target=_run, args=(app, job.id, target, args, kwargs), name=f'job-{kind}', daemon=True
+    )
+    thread.start()
+    return job
+
+
+def report_progress(job_id, processed):
+    """Record how many items a job has finished (commits immediately)"""
+    _update_job(job_id, processed=processed)
+
+
+def _update_job(job_id, **values):
+    db.session.execute(update(BackgroundJob).where(BackgroundJob.id == job_id).values(**values))
+    db.session.commit()
+
+
+def _run(app, job_id, target, args, kwargs):
+    with app.app_context():
+        try:
+            _update_job(job_id, status='running', started_at=datetime.utcnow())
+            result = target(*args, progress=lambda processed: report_progress(job_id, processed), **kwargs)
+            _update_job(job_id, status='completed', result=result, finished_at=datetime.utcnow())
+        except Exception as e:
+            db.session.rollback()
+            app.logger.error(f'Background job {job_id} failed: {str(e)}')
+            try:
+                _update_job(job_id, status='failed', error=str(e), finished_at=datetime.utcnow())
+            except Exception:
+                db.session.rollback()
+        finally:
+            db.session.remove()
@@ -90,7 +90,10 @@ const AdminDashboard = () => {
     const { user, logout, token } = useAuth();
     const navigate = useNavigate();
     const [users, setUsers] = useState([]);
+    const [userTotal, setUserTotal] = useState(null);
+    const [usersCursor, setUsersCursor] = useState(null);
     const [auditLogs, setAuditLogs] = useState([]);
+    const [auditCursor, setAuditCursor] = useState(null);
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState(null);
     const [searchTerm, setSearchTerm] = useState('');
@@ -98,7 +101,7 @@ const AdminDashboard = () => {
     const [statusFilter, setStatusFilter] = useState('');
     const [activeTab, setActiveTab] = useState('users'); // 'users' or 'audit'
 
-    const fetchUsers = async (filters = {}) => {
+    const fetchUsers = async (filters = {}, cursor = null) => {
         setLoading(true);
         if (!token) { // Use token from useAuth hook
             setError("Authentication token not found.");
@@ -107,16 +110,16 @@ const AdminDashboard = () => {
         }
         
         try {
-            const response = await adminAPI.getUsers(filters);
-            // Ensure response.data is an array before setting state
-            if (Array.isArray(response.data)) {
-                setUsers(response.data);
+            const response = await adminAPI.getUsers(cursor ? { ...filters, cursor } : filters);
+            // The backend returns one page: { users, total, next_cursor }
+            if (response.data && Array.isArray(response.data.users)) {
+                setUsers(prev => cursor ? [...prev, ...response.data.users] : response.data.users);
+                setUserTotal(response.data.total);
+                setUsersCursor(response.data.next_cursor);
             } else {
-                // If it's not an array, it might be an object with a key containing the array
-                // For now, we'll assume the backend returns the array directly.
-                // If this still fails, we'll need to check the backend response structure.
                 setUsers([]); 
-                console.error("API response for users was not an array:", response.data);
+                setUsersCursor(null);
+                console.error("API response for users was not a page of users:", response.data);
             }
             setError(null);
         } catch (err) {
@@ -127,14 +130,17 @@ const AdminDashboard = () => {
         }
     };
 
-    const fetchAuditLogs = async () => {
+    const fetchAuditLogs = async (cursor = null) => {
         try {
-            const response = await adminAPI.getAuditLog();
-            if (Array.isArray(response.data)) {
-                setAuditLogs(response.data);
+            const response = await adminAPI.getAuditLog(cursor ? { cursor } : {});
+            // The backend returns one page: { entries, next_cursor }
+            if (response.data && Array.isArray(response.data.entries)) {
+                setAuditLogs(prev => cursor ? [...prev, ...response.data.entries] : response.data.entries);
+                setAuditCursor(response.data.next_cursor);
             } else {
                 setAuditLogs([]);
-                console.error("API response for audit logs was not an array:", response.data);
+                setAuditCursor(null);
+                console.error("API response for audit logs was not a page of entries:", response.data);
             }
         } catch (err) {
             console.error("Failed to fetch audit logs:", err);
@@ -237,7 +243,7 @@ const AdminDashboard = () => {
                                 : 'border-transparent text-gray-500 hover:text-gray-700 hover:border-gray-300'
                         } whitespace-nowrap py-4 px-1 border-b-2 font-medium text-sm`}
                     >
-                        User Management ({users.length})
+                        User Management ({userTotal ?? users.length})
                     </button>
                     <button
                         onClick={() => setActiveTab('audit')}
@@ -247,7 +253,7 @@ const AdminDashboard = () => {
                                 : 'border-transparent text-gray-500 hover:text-gray-700 hover:border-gray-300'
                         } whitespace-nowrap py-4 px-1 border-b-2 font-medium text-sm`}
                     >
-                        Audit Log ({auditLogs.length})
+                        Audit Log ({auditLogs.length}{auditCursor ? '+' : ''})
                     </button>
                 </nav>
             </div>
@@ -290,6 +296,18 @@ const AdminDashboard = () => {
                         </div>
 
                         <UserTable users={users} onStatusChange={handleStatusChange} onResetPassword={handleResetPassword} />
+
+                        {usersCursor && (
+                            <div className="flex justify-center mt-4">
+                                <button
+                                    onClick={() => fetchUsers({ search: searchTerm, role: roleFilter, status: statusFilter }, usersCursor)}
+                                    disabled={loading}
+                                    className="bg-gray-100 hover:bg-gray-200 text-gray-700 font-medium py-2 px-4 rounded text-sm"
+                                >
+                                    {loading ? 'Loading...' : 'Load more'}
+                                </button>
+                            </div>
+                        )}
                     </>
                 )}
 
@@ -297,6 +315,17 @@ const AdminDashboard = () => {
                     <>
                         <h2 className="text-xl font-semibold mb-4">System Audit Log</h2>
                         <AuditLogTable logs={auditLogs} />
+
+                        {auditCursor && (
+                            <div className="flex justify-center mt-4">
+                                <button
+                                    onClick={() => fetchAuditLogs(auditCursor)}
+                                    className="bg-gray-100 hover:bg-gray-200 text-gray-700 font-medium py-2 px-4 rounded text-sm"
+                                >
+                                    Load more
+                                </button>
+                            </div>
+                        )}
                     </>
                 )}
             </div>
@@ -0,0 +1,180 @@
+"""
+Exercise Catalog
+In-process, versioned copy of the exercise template library with precomputed facets
+"""
+
+import threading
+import time
+
+from src.models.user import db
+from src.models.exercise_template import ExerciseTemplate
+
+# How long a worker trusts its copy before checking the table for writes made by
+# other processes (seed script, other gunicorn workers)
+CATALOG_REVALIDATE_SECONDS = 60
+
+FACETS = ('muscle_group', 'category', 'difficulty', 'equipment')
+
+
+class _Snapshot:
+    """Immutable catalog state, swapped in as a whole so readers never see a half-built index"""
+
+    def __init__(self, entries, order, system_ids, overlays, facets, labels):
+        self.entries = entries        # id -> serialized template
+        self.order = order            # ids sorted by (muscle_group, name)
+        self.system_ids = system_ids
+        self.overlays = overlays      # coach_id -> set of custom template ids
+        self.facets = facets          # facet -> value -> set of ids
+        self.labels = labels          # facet -> value -> display label
+
+    def visible_ids(self, coach_id):
+        """System exercises plus the coach's overlay; every active template if no coach scope"""
+        if coach_id is None:
+            return set(self.entries)
+        return self.system_ids | self.overlays.get(coach_id, set())
+
+
+class ExerciseCatalog:
+    """
+    Snapshot of all active exercise templates.
+
+    System exercises form the shared base; custom exercises are kept in per-coach
+    overlays so a coach only sees their own additions. Each facet value maps to the
+    set of template IDs carrying it, so filtered lookups are set intersections.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version = 0
+        self._stale = True
+        self._checked_at = 0.0
+        self._fingerprint = None
+        self._snapshot = None
+
+    # ------------------------------------------------------------------
+    # Loading / invalidation
+    # ------------------------------------------------------------------
+
+    def invalidate(self):
+        """Bump the version and force a rebuild on the next lookup"""
+        with self._lock:
+            self.version += 1
+            self._stale = True
+
+    def _table_fingerprint(self):
+        return db.session.query(
+            db.func.count(ExerciseTemplate.id),
+            db.func.max(ExerciseTemplate.updated_at)
+        ).one()
+
+    def _rebuild(self, fingerprint):
+        templates = ExerciseTemplate.query.filter_by(is_active=True).order_by(
+            ExerciseTemplate.muscle_group, ExerciseTemplate.name
+        ).all()
+
+        entries = {}
+        order = []
+        system_ids = set()
+        overlays = {}
+        facets = {facet: {} for facet in FACETS}
+        labels = {facet: {} for facet in FACETS}
+
+        for template in templates:
+            entries[template.id] = template.to_dict()
+            order.append(template.id)
+
+            if template.is_custom and template.created_by_coach_id:
+                overlays.setdefault(template.created_by_coach_id, set()).add(template.id)
+            else:
+                system_ids.add(template.id)
+
+            for facet in ('muscle_group', 'category', 'difficulty'):
+                value = getattr(template, facet)
+                if value:
+                    facets[facet].setdefault(value.lower(), set()).add(template.id)
+                    labels[facet].setdefault(value.lower(), value)
+
+            for raw in (template.equipment or '').split(','):
+                if raw.strip():
+                    token = raw.strip().lower()
+                    facets['equipment'].setdefault(token, set()).add(template.id)
+                    labels['equipment'].setdefault(token, raw.strip())
+
+        self._snapshot = _Snapshot(entries, order, system_ids, overlays, facets, labels)
+        self._fingerprint = fingerprint
+        self._checked_at = time.monotonic()
+        self._stale = False
+
+    def _ensure_fresh(self):
+        with self._lock:
+            now = time.monotonic()
+            if not self._stale and now - self._checked_at < CATALOG_REVALIDATE_SECONDS:
+                return self._snapshot
+
+            fingerprint = tuple(self._table_fingerprint())
+            if self._stale or fingerprint != self._fingerprint:
+                if not self._stale:
+                    self.version += 1  # Changed by another process
+                self._rebuild(fingerprint)
+            else:
+                self._checked_at = now
+            return self._snapshot
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def get(self, exercise_id):
+        """Return the serialized template, or None if it is not in the active catalog"""
+        return self._ensure_fresh().entries.get(exercise_id)
+
+    def filter(self, coach_id=None, muscle_group=None, category=None, difficulty=None,
+               equipment=None, search=None, ranked_ids=None):
+        """
+        Return serialized templates matching every given facet, ordered by muscle group and name.
+
+        Args:
+            coach_id: Coach profile ID whose custom exercises should be included, or None for all
+            muscle_group / category / difficulty: Exact facet value (case-insensitive)
+            equipment: Equipment token, e.g. "Bench"
+            search: Case-insensitive substring of the exercise name
+            ranked_ids: Search backend result; restricts to these IDs and keeps their order
+        """
+        snapshot = self._ensure_fresh()
+
+        candidates = snapshot.visible_ids(coach_id)
+        for facet, value in (('muscle_group', muscle_group), ('category', category),
+                             ('difficulty', difficulty), ('equipment', equipment)):
+            if value:
+                candidates = candidates & snapshot.facets[facet].get(value.strip().lower(), set())
+                if not candidates:
+                    return []
+
+        needle = search.lower() if search else None
+        results = []
+        for exercise_id in (snapshot.order if ranked_ids is None else ranked_ids):
+            if exercise_id not in candidates:
+                continue
+            entry = snapshot.entries[exercise_id]
+            if needle and needle not in entry['name'].lower():
+                continue
+            results.append(entry)
+        return results
+
+    def facet_counts(self, coach_id=None):
+        """Return {facet: {label: count}} over the exercises visible to the coach"""
+        snapshot = self._ensure_fresh()
+
+        visible = snapshot.visible_ids(coach_id)
+        counts = {}
+        for facet in FACETS:
+            counts[facet] = {}
+            for value, ids in snapshot.facets[facet].items():
+                count = len(ids & visible)
+                if count:
+                    counts[facet][snapshot.labels[facet][value]] = count
+        return counts
+
+
+# Process-wide catalog shared by all requests in this worker
+exercise_catalog = ExerciseCatalog()
@@ -0,0 +1,138 @@
+"""
+Exercise Search
+Ranked full-text search over exercise templates
+
+PostgreSQL: weighted tsvector column + pg_trgm (see migrations/add_exercise_search_index.sql)
+SQLite: FTS5 shadow table kept in sync by mapper events
+"""
+
+import re
+
+from sqlalchemy import event, text
+
+from src.models.user import db
+from src.models.exercise_template import ExerciseTemplate
+
+FTS_TABLE = 'exercise_template_fts'
+MAX_TERMS = 8
+
+# Per-process memo of whether the search index exists for the bound database
+_index_ready = None
+
+
+def _terms(query):
+    """Lowercase word tokens of the query; punctuation is dropped so it can't break the match syntax"""
+    return re.findall(r'\w+', (query or '').lower())[:MAX_TERMS]
+
+
+def ensure_search_index():
+    """
+    Create the SQLite FTS5 table if needed and fill it from exercise_template.
+    PostgreSQL indexes are created by the migration script instead.
+    """
+    global _index_ready
+    if db.engine.dialect.name != 'sqlite':
+        return
+
+    db.session.execute(text(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        "id UNINDEXED, name, equipment, muscle_group, instructions, "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    ))
+    indexed = db.session.execute(text(f"SELECT count(*) FROM {FTS_TABLE}")).scalar()
+    if not indexed:
+        db.session.execute(text(
+            f"INSERT INTO {FTS_TABLE} (id, name, equipment, muscle_group, instructions) "
+            "SELECT id, name, coalesce(equipment, ''), muscle_group, coalesce(instructions, '') "
+            "FROM exercise_template"
+        ))
+    db.session.commit()
+    _index_ready = True
+
+
+def search_available():
+    """True if the search index for the current database has been created"""
+    global _index_ready
+    if _index_ready is None:
+        if db.engine.dialect.name == 'postgresql':
+            _index_ready = db.session.execute(text(
+                "SELECT 1 FROM information_schema.columns "
+                "WHERE table_name = 'exercise_template' AND column_name = 'search_vector'"
+            )).first() is not None
+        else:
+            _index_ready = False
+    return _index_ready
+
+
+def search_exercise_templates(query, limit=50, prefix=True):
+    """
+    Return IDs of active exercise templates matching the query, best match first.
+
+    Every term must match (as a prefix when prefix=True). Name hits outrank equipment,
+    then muscle group, then instructions. On PostgreSQL, names within trigram
+    similarity of the raw query also match, which catches misspellings.
+    """
+    terms = _terms(query)
+    if not terms:
+        return []
+
+    suffix = ':*' if prefix else ''
+    if db.engine.dialect.name == 'postgresql':
+        rows = db.session.execute(text(
+            "SELECT et.id FROM exercise_template et "
+            "WHERE et.is_active "
+            "AND (et.search_vector @@ to_tsquery('simple', :tsquery) OR et.name % :raw) "
+            "ORDER BY ts_rank(et.search_vector, to_tsquery('simple', :tsquery)) "
+            "+ similarity(et.name, :raw) DESC, et.name "
+            "LIMIT :limit"
+        ), {
+            'tsquery': ' & '.join(f'{term}{suffix}' for term in terms),
+            'raw': ' '.join(terms),
+            'limit': limit
+        })
+    else:
+        suffix = '*' if prefix else ''
+        rows = db.session.execute(text(
+            f"SELECT f.id FROM {FTS_TABLE} f "
+            "JOIN exercise_template et ON et.id = f.id "
+            f"WHERE {FTS_TABLE} MATCH :match AND et.is_active "
+            f"ORDER BY bm25({FTS_TABLE}, 0.0, 10.0, 4.0, 2.0, 1.0), et.name "
+            "LIMIT :limit"
+        ), {
+            'match': ' '.join(f'"{term}"{suffix}' for term in terms),
+            'limit': limit
+        })
+
+    return [row[0] for row in rows]
+
+
+# ============================================================================
+# SQLITE INDEX MAINTENANCE
+# ============================================================================
+
+def _fts_enabled(connection):
+    return _index_ready and connection.dialect.name == 'sqlite'
+
+
+@event.listens_for(ExerciseTemplate, 'after_insert')
+@event.listens_for(ExerciseTemplate, 'after_update')
+def _sync_fts_row(mapper, connection, target):
+    if not _fts_enabled(connection):
+        return
+    connection.execute(text(f"DELETE FROM {FTS_TABLE} WHERE id = :id"), {'id': target.id})
+    connection.execute(text(
+        f"INSERT INTO {FTS_TABLE} (id, name, equipment, muscle_group, instructions) "
+        "VALUES (:id, :name, :equipment, :muscle_group, :instructions)"
+    ), {
+        'id': target.id,
+        'name': target.name,
+        'equipment': target.equipment or '',
+        'muscle_group': target.muscle_group,
+        'instructions': target.instructions or ''
+    })
+
+
+@event.listens_for(ExerciseTemplate, 'after_delete')
+def _delete_fts_row(mapper, connection, target):
+    if _fts_enabled(connection):
+        connection.execute(text(f"DELETE FROM {FTS_TABLE} WHERE id = :id"), {'id': target.id})
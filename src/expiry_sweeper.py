@@ -0,0 +1,137 @@
+"""
+Expiry Sweeper
+Keeps status columns live so the hot "status = 'active'" / pending lookups of
+the booking and package routes never see stale rows:
+
+- active subscriptions whose end_date has passed become 'expired'
+  (PackageSubscription.is_expired only answers per object, in Python)
+- pending / pending_credits bookings whose start_time has passed become
+  'cancelled' - they can no longer be confirmed
+
+Each sweep is a series of set-based UPDATEs of at most SWEEP_BATCH_SIZE rows,
+picked through the indexes idx_package_subscription_expiry and
+idx_booking_status_start and committed per batch, so no run holds many row
+locks at once. Rows another transaction has locked are skipped and picked up
+by the next run.
+
+Run from cron (daily is enough for subscriptions, hourly for bookings):
+    python -m src.expiry_sweeper [--date 2026-01-31]
+or in-process, every EXPIRY_SWEEP_INTERVAL seconds (see main.py):
+    EXPIRY_SWEEP_INTERVAL=3600
+"""
+
+import argparse
+import threading
+import time
+from datetime import date, datetime
+
+from sqlalchemy import select, update
+
+from src.models.user import db, PackageSubscription, Booking
+from src.admin_stats import move_subscription_counters, add_booking_days
+
+SWEEP_BATCH_SIZE = 5000
+PENDING_STATUSES = ('pending', 'pending_credits')
+
+
+def _sweep(model, where, values, batch_size, returning, track):
+    """
+    UPDATE model SET values for every row matching where, batch_size rows per
+    transaction. track(connection, rows) applies the admin stat deltas for the
+    returned rows in the same transaction (bulk UPDATEs skip the mapper events).
+    """
+    swept = 0
+    while True:
+        batch = select(model.id).where(*where).limit(batch_size).with_for_update(skip_locked=True)
+        try:
+            rows = db.session.execute(
+                update(model).where(model.id.in_(batch.scalar_subquery())).values(**values)
+                .returning(*returning).execution_options(synchronize_session=False)
+            ).all()
+            count = len(rows)
+            if rows:
+                track(db.session.connection(), rows)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        swept += count
+        if count < batch_size:
+            return swept
+
+
+def expire_subscriptions(today=None, batch_size=SWEEP_BATCH_SIZE):
+    """Mark active subscriptions that ended before today as expired. Returns the number expired."""
+    today = today or date.today()
+    return _sweep(
+        PackageSubscription,
+        [PackageSubscription.status == 'active', PackageSubscription.end_date < today],
+        {'status': 'expired', 'updated_at': datetime.utcnow()},
+        batch_size,
+        (PackageSubscription.id,),
+        lambda connection, rows: move_subscription_counters(connection, {('active', 'expired'): len(rows)})
+    )
+
+
+def cancel_stale_pending_bookings(now=None, batch_size=SWEEP_BATCH_SIZE):
+    """Cancel pending / pending_credits bookings that started before now (UTC). Returns the number cancelled."""
+    now = now or datetime.utcnow()
+    return _sweep(
+        Booking,
+        [Booking.status.in_(PENDING_STATUSES), Booking.start_time < now],
+        {'status': 'cancelled'},
+        batch_size,
+        (Booking.event_type, Booking.start_time),
+        lambda connection, rows: add_booking_days(
+            connection, [('pending', event_type, start_time) for event_type, start_time in rows], sign=-1
+        )
+    )
+
+
+def run_sweep(today=None, now=None, batch_size=SWEEP_BATCH_SIZE, log=print):
+    """
+    Run both sweeps.
+
+    Returns:
+        {'subscriptions_expired': n, 'bookings_cancelled': n}
+    """
+    result = {
+        'subscriptions_expired': expire_subscriptions(today, batch_size),
+        'bookings_cancelled': cancel_stale_pending_bookings(now, batch_size)
+    }
+    if result['subscriptions_expired'] or result['bookings_cancelled']:
+        log(f"   expiry sweep: {result['subscriptions_expired']} subscriptions expired, "
+            f"{result['bookings_cancelled']} stale pending bookings cancelled")
+    return result
+
+
+def init_app(app):
+    """Start the in-process sweeper thread if EXPIRY_SWEEP_INTERVAL (seconds) is set"""
+    interval = app.config.get('EXPIRY_SWEEP_INTERVAL') or 0
+    if interval <= 0:
+        return
+
+    def loop():
+        while True:
+            with app.app_context():
+                try:
+                    run_sweep(log=app.logger.info)
+                except Exception as e:
+                    app.logger.error(f'Expiry sweep failed: {str(e)}')
+                finally:
+                    db.session.remove()
+            time.sleep(interval)
+
+    threading.Thread(target=loop, name='expiry-sweeper', daemon=True).start()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Expire ended subscriptions and stale pending bookings')
+    parser.add_argument('--date', help='Expire subscriptions that ended before this date (YYYY-MM-DD, default today)')
+    args = parser.parse_args()
+
+    from src.main import app
+    with app.app_context():
+        as_of = date.fromisoformat(args.date) if args.date else None
+        result = run_sweep(today=as_of)
+        print(f"✅ Expiry sweep done: {result}")
@@ -0,0 +1,157 @@
+"""
+Index Check
+Runs EXPLAIN on the hot route query shapes and verifies each plan uses one of
+its expected indexes
+
+On PostgreSQL sequential scans are disabled for the check transaction, so the
+result reflects whether an index *can* serve the query even on a small database.
+SQLite cannot match partial indexes against bound parameters, so each query also
+lists the full index it falls back to there.
+
+Usage:
+    python -m src.index_check
+"""
+
+import sys
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import and_, func, or_
+
+from src.models.user import db, Booking, PackageSubscription, CoachAssignment, DateSpecificAvailability
+from src.models.workout_completion import WorkoutCompletion
+
+SAMPLE_ID = '00000000-0000-0000-0000-000000000000'
+
+
+def _hot_queries():
+    """(name, query, acceptable index names) mirroring the filters used by the routes"""
+    start = datetime(2025, 1, 6, 9, 0)
+    end = start + timedelta(hours=1)
+    today = date(2025, 1, 6)
+
+    return [
+        (
+            'coach calendar (booking.get_coach_bookings)',
+            Booking.query.filter_by(coach_id=SAMPLE_ID).filter(
+                Booking.start_time >= start, Booking.end_time <= end + timedelta(days=7)
+            ).order_by(Booking.start_time),
+            ('idx_booking_coach_start', 'idx_booking_coach_live')
+        ),
+        (
+            'slot conflict check (booking.create_booking_as_coach)',
+            Booking.query.filter_by(coach_id=SAMPLE_ID).filter(
+                Booking.status.in_(['confirmed', 'pending']),
+                ((Booking.start_time <= start) & (Booking.end_time > start)) |
+                ((Booking.start_time < end) & (Booking.end_time >= end)) |
+                ((Booking.start_time >= start) & (Booking.end_time <= end))
+            ),
+            ('idx_booking_coach_live', 'idx_booking_coach_start')
+        ),
+        (
+            'customer sessions (booking.get_customer_bookings)',
+            Booking.query.filter_by(customer_id=SAMPLE_ID, event_type='customer_session')
+            .order_by(Booking.start_time.desc()),
+            ('idx_booking_customer_start',)
+        ),
+        (
+            'pending bookings (pending_bookings.confirm_pending_bookings)',
+            db.session.query(
+                Booking.id,
+                func.row_number().over(
+                    partition_by=(Booking.customer_id, Booking.coach_id),
+                    order_by=(Booking.start_time, Booking.id)
+                )
+            ).filter(
+                Booking.customer_id == SAMPLE_ID,
+                Booking.coach_id == SAMPLE_ID,
+                Booking.status.in_(['pending', 'pending_credits'])
+            ),
+            ('idx_booking_customer_coach_start',)
+        ),
+        (
+            'active subscription (package routes)',
+            PackageSubscription.query.filter_by(customer_id=SAMPLE_ID, coach_id=SAMPLE_ID, status='active'),
+            ('idx_package_subscription_active', 'idx_package_subscription_customer_coach_status')
+        ),
+        (
+            'ended subscriptions (expiry_sweeper.expire_subscriptions)',
+            PackageSubscription.query.filter(
+                PackageSubscription.status == 'active', PackageSubscription.end_date < today
+            ),
+            ('idx_package_subscription_expiry', 'idx_package_subscription_customer_coach_status')
+        ),
+        (
+            'stale pending bookings (expiry_sweeper.cancel_stale_pending_bookings)',
+            Booking.query.filter(Booking.status.in_(['pending', 'pending_credits']), Booking.start_time < start),
+            ('idx_booking_status_start',)
+        ),
+        (
+            'current substitute assignment (coach_assignment.get_current_assignment)',
+            CoachAssignment.query.filter(and_(
+                CoachAssignment.customer_id == SAMPLE_ID,
+                CoachAssignment.status == 'active',
+                CoachAssignment.start_date <= today,
+                or_(CoachAssignment.end_date.is_(None), CoachAssignment.end_date >= today)
+            )),
+            ('idx_coach_assignment_customer_status_dates',)
+        ),
+        (
+            'date override lookup (availability_helper)',
+            DateSpecificAvailability.query.filter_by(coach_id=SAMPLE_ID, date=today),
+            ('idx_date_specific_availability_coach_date',)
+        ),
+        (
+            'workout history (training_plan.get_workout_completions)',
+            WorkoutCompletion.query.filter_by(customer_id=SAMPLE_ID).order_by(WorkoutCompletion.completed_at.desc()),
+            ('idx_workout_completions_customer_completed',)
+        ),
+    ]
+
+
+def explain(query):
+    """Return the database's plan for a query as a single string"""
+    connection = db.session.connection()
+    dialect = connection.dialect
+    compiled = query.statement.compile(dialect=dialect, compile_kwargs={'render_postcompile': True})
+    params = compiled.params
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+
+    prefix = 'EXPLAIN QUERY PLAN ' if dialect.name == 'sqlite' else 'EXPLAIN '
+    rows = connection.exec_driver_sql(prefix + str(compiled), params).fetchall()
+    return '\n'.join(str(row[-1]) for row in rows)
+
+
+def check_indexes():
+    """
+    Explain every hot query.
+
+    Returns:
+        List of (name, used_index or None, plan) - used_index is None when the
+        plan uses none of the expected indexes
+    """
+    results = []
+    try:
+        if db.engine.dialect.name == 'postgresql':
+            db.session.execute(db.text('SET LOCAL enable_seqscan = off'))
+        for name, query, indexes in _hot_queries():
+            plan = explain(query)
+            used = next((index for index in indexes if index in plan), None)
+            results.append((name, used, plan))
+    finally:
+        db.session.rollback()
+    return results
+
+
+if __name__ == '__main__':
+    from src.main import app
+    with app.app_context():
+        failures = 0
+        for name, used, plan in check_indexes():
+            if used:
+                print(f"✅ {name}: {used}")
+            else:
+                failures += 1
+                print(f"❌ {name}: no expected index used")
+                print('   ' + plan.replace('\n', '\n   '))
+        sys.exit(1 if failures else 0)
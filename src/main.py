@@ -26,6 +26,9 @@ from src.routes.package import package_bp
 from src.routes.coach_assignment import assignment_bp
 from src.routes.coach_network import coach_network_bp
 from src.routes.coach_connections import coach_connections_bp
+from src.exercise_search import ensure_search_index
+from src.audit_writer import audit_writer
+from src import auto_booking, expiry_sweeper
 
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
@@ -75,10 +78,24 @@ else:
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db.init_app(app)
 
+# Audit entries are batched by a background writer unless crash-safe synchronous writes are requested
+app.config['AUDIT_SYNC_WRITES'] = os.environ.get('AUDIT_SYNC_WRITES', '').lower() in ('1', 'true', 'yes')
+audit_writer.init_app(app)
+
+# Optional in-process auto-booking scheduler (seconds between runs; 0 = run it from cron instead)
+app.config['AUTO_BOOKING_INTERVAL'] = int(os.environ.get('AUTO_BOOKING_INTERVAL', '0') or 0)
+
+# Optional in-process expiry sweeper for ended subscriptions and past pending bookings (seconds; 0 = cron)
+app.config['EXPIRY_SWEEP_INTERVAL'] = int(os.environ.get('EXPIRY_SWEEP_INTERVAL', '0') or 0)
+
 with app.app_context():
     db.create_all()
+    ensure_search_index()
     print(f"✅ Database tables created successfully")
 
+auto_booking.init_app(app)
+expiry_sweeper.init_app(app)
+
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
@@ -1,7 +1,12 @@
 # Models package
-from src.models.user import db, User, CoachProfile, CustomerProfile, TrainingPlan, Exercise, Booking, Availability, DateSpecificAvailability
+from src.models.user import db, User, CoachProfile, CustomerProfile, TrainingPlan, PlanAssignment, Exercise, Booking, Availability, DateSpecificAvailability
 from src.models.exercise_template import ExerciseTemplate
-from src.models.workout_completion import WorkoutCompletion, ExerciseCompletion
+from src.models.workout_completion import WorkoutCompletion, ExerciseCompletion, ExerciseSet
+from src.models.stats import StatCounter, DailyStat
+from src.models.job import BackgroundJob
+from src.models.migration import SchemaVersion, BackfillProgress
+from src.models.progress import ExerciseProgress, ExerciseProgressWeek
+from src.models.credit_ledger import CreditLedgerEntry
 
 __all__ = [
     'db',
@@ -9,11 +14,21 @@ __all__ = [
     'CoachProfile',
     'CustomerProfile',
     'TrainingPlan',
+    'PlanAssignment',
     'Exercise',
     'Booking',
     'Availability',
     'DateSpecificAvailability',
     'ExerciseTemplate',
     'WorkoutCompletion',
-    'ExerciseCompletion'
+    'ExerciseCompletion',
+    'ExerciseSet',
+    'StatCounter',
+    'DailyStat',
+    'BackgroundJob',
+    'SchemaVersion',
+    'BackfillProgress',
+    'ExerciseProgress',
+    'ExerciseProgressWeek',
+    'CreditLedgerEntry'
 ]
@@ -0,0 +1,42 @@
+from src.models.user import db
+from datetime import datetime
+import uuid
+
+class CreditLedgerEntry(db.Model):
+    """
+    One change to a package subscription's credits (allocation, renewal, expiry
+    of unused credits, ...). reference is unique, so an operation retried after
+    a failure can never record the same change twice.
+    """
+    __tablename__ = 'credit_ledger'
+    __table_args__ = (
+        db.Index('idx_credit_ledger_subscription_created', 'subscription_id', 'created_at'),
+        db.Index('idx_credit_ledger_coach_created', 'coach_id', 'created_at'),  # usage export
+    )
+
+    ENTRY_TYPES = ('allocation', 'renewal', 'expiry', 'booking', 'refund', 'adjustment')
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    subscription_id = db.Column(db.String(36), db.ForeignKey('package_subscription.id', ondelete='CASCADE'), nullable=False)
+    customer_id = db.Column(db.String(36), db.ForeignKey('customer_profile.id'), nullable=False)
+    coach_id = db.Column(db.String(36), db.ForeignKey('coach_profile.id'), nullable=False)
+    entry_type = db.Column(db.String(20), nullable=False)
+    delta = db.Column(db.Integer, nullable=False)  # credits added (+) or removed (-)
+    balance_after = db.Column(db.Integer, nullable=False)  # credits_remaining after this entry
+    period_start = db.Column(db.Date, nullable=True)  # subscription period the entry belongs to
+    reference = db.Column(db.String(120), nullable=False, unique=True)  # e.g. 'renewal:<subscription>:<period>'
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'subscription_id': self.subscription_id,
+            'customer_id': self.customer_id,
+            'coach_id': self.coach_id,
+            'entry_type': self.entry_type,
+            'delta': self.delta,
+            'balance_after': self.balance_after,
+            'period_start': self.period_start.isoformat() if self.period_start else None,
+            'reference': self.reference,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
@@ -0,0 +1,38 @@
+from src.models.user import db
+from datetime import datetime
+import uuid
+
+class BackgroundJob(db.Model):
+    """
+    Progress record for a long-running operation executed off the request thread
+    (see src/background_jobs.py). Stored in the database so any worker can report it.
+    """
+    __tablename__ = 'background_job'
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    kind = db.Column(db.String(50), nullable=False)  # e.g. 'user.bulk_status'
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, completed, failed
+    created_by = db.Column(db.String(36), db.ForeignKey('user.id'), nullable=True)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    processed = db.Column(db.Integer, nullable=False, default=0)
+    result = db.Column(db.JSON, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'created_by': self.created_by,
+            'total': self.total,
+            'processed': self.processed,
+            'progress': round(self.processed / self.total, 4) if self.total else None,
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
@@ -0,0 +1,51 @@
+from src.models.user import db
+from datetime import datetime
+
+class SchemaVersion(db.Model):
+    """
+    One row per versioned migration applied by src/schema_migrations.py.
+    """
+    __tablename__ = 'schema_version'
+
+    version = db.Column(db.String(10), primary_key=True)  # e.g. '0007'
+    name = db.Column(db.String(100), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='applied')  # applied, skipped, baseline
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
+    duration_ms = db.Column(db.Integer, nullable=True)
+
+    def to_dict(self):
+        return {
+            'version': self.version,
+            'name': self.name,
+            'status': self.status,
+            'applied_at': self.applied_at.isoformat() if self.applied_at else None,
+            'duration_ms': self.duration_ms
+        }
+
+
+class BackfillProgress(db.Model):
+    """
+    Resume point of a batched backfill (see src/backfill.py). last_key is committed
+    in the same transaction as the batch it follows, so a restart never repeats or
+    skips rows.
+    """
+    __tablename__ = 'backfill_progress'
+
+    name = db.Column(db.String(100), primary_key=True)
+    last_key = db.Column(db.String(255), nullable=True)
+    rows_processed = db.Column(db.BigInteger, nullable=False, default=0)
+    batches = db.Column(db.Integer, nullable=False, default=0)
+    started_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'last_key': self.last_key,
+            'rows_processed': self.rows_processed,
+            'batches': self.batches,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None
+        }
@@ -0,0 +1,66 @@
+from src.models.user import db
+from datetime import datetime
+
+class ExerciseProgress(db.Model):
+    """
+    Running per-customer aggregates for one exercise, maintained on write by
+    src/progress.py. exercise_key is the normalized exercise name, so progress
+    carries across plans (cloned plans get their own exercise rows).
+    """
+    __tablename__ = 'exercise_progress'
+
+    customer_id = db.Column(db.String(36), db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True)
+    exercise_key = db.Column(db.String(100), primary_key=True)
+    exercise_name = db.Column(db.String(100), nullable=False)  # as last logged
+    best_weight = db.Column(db.Float)
+    best_estimated_1rm = db.Column(db.Float)
+    total_sets = db.Column(db.Integer, nullable=False, default=0)
+    total_reps = db.Column(db.Integer, nullable=False, default=0)
+    total_tonnage = db.Column(db.Float, nullable=False, default=0)
+    sessions = db.Column(db.Integer, nullable=False, default=0)
+    first_performed_at = db.Column(db.DateTime)
+    last_performed_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'exercise_key': self.exercise_key,
+            'exercise_name': self.exercise_name,
+            'best_weight': self.best_weight,
+            'best_estimated_1rm': self.best_estimated_1rm,
+            'total_sets': self.total_sets,
+            'total_reps': self.total_reps,
+            'total_tonnage': self.total_tonnage,
+            'sessions': self.sessions,
+            'first_performed_at': self.first_performed_at.isoformat() if self.first_performed_at else None,
+            'last_performed_at': self.last_performed_at.isoformat() if self.last_performed_at else None
+        }
+
+
+class ExerciseProgressWeek(db.Model):
+    """
+    One customer's totals for one exercise in one week (week_start is a Monday),
+    the precomputed series behind progress charts.
+    """
+    __tablename__ = 'exercise_progress_week'
+
+    customer_id = db.Column(db.String(36), db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True)
+    exercise_key = db.Column(db.String(100), primary_key=True)
+    week_start = db.Column(db.Date, primary_key=True)
+    sets = db.Column(db.Integer, nullable=False, default=0)
+    reps = db.Column(db.Integer, nullable=False, default=0)
+    tonnage = db.Column(db.Float, nullable=False, default=0)
+    sessions = db.Column(db.Integer, nullable=False, default=0)
+    best_weight = db.Column(db.Float)
+    best_estimated_1rm = db.Column(db.Float)
+
+    def to_dict(self):
+        return {
+            'week_start': self.week_start.isoformat() if self.week_start else None,
+            'sets': self.sets,
+            'reps': self.reps,
+            'tonnage': self.tonnage,
+            'sessions': self.sessions,
+            'best_weight': self.best_weight,
+            'best_estimated_1rm': self.best_estimated_1rm
+        }
@@ -0,0 +1,40 @@
+from src.models.user import db
+from datetime import datetime
+
+class StatCounter(db.Model):
+    """
+    Named running total maintained on write (e.g. 'users:coach:active').
+    Lets admin KPIs be read without scanning the underlying tables.
+    """
+    __tablename__ = 'stat_counter'
+
+    name = db.Column(db.String(100), primary_key=True)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'value': self.value,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+
+class DailyStat(db.Model):
+    """
+    Per-day rollup of a metric (e.g. 'signups', 'bookings') maintained on write
+    and re-derived by the nightly reconciliation in src/admin_stats.py.
+    """
+    __tablename__ = 'daily_stat'
+
+    day = db.Column(db.Date, primary_key=True)
+    metric = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'day': self.day.isoformat() if self.day else None,
+            'metric': self.metric,
+            'value': self.value
+        }
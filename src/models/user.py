@@ -1,6 +1,7 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.ext.hybrid import hybrid_property
 from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime
+from datetime import datetime, date
 import uuid
 
 db = SQLAlchemy()
@@ -69,6 +70,14 @@ class PasswordResetToken(db.Model):
 
 class AuditLog(db.Model):
     __tablename__ = 'audit_log'
+    # Newest-first keyset scans, optionally narrowed by actor / action / target
+    # (kept in sync with migrations/add_audit_log_indexes.sql)
+    __table_args__ = (
+        db.Index('idx_audit_log_timestamp', 'timestamp', 'id'),
+        db.Index('idx_audit_log_actor_timestamp', 'actor_id', 'timestamp', 'id'),
+        db.Index('idx_audit_log_action_timestamp', 'action', 'timestamp', 'id'),
+        db.Index('idx_audit_log_target_timestamp', 'target_id', 'timestamp', 'id'),
+    )
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
     actor_id = db.Column(db.String(36), db.ForeignKey('user.id'), nullable=False)
@@ -89,6 +98,35 @@ class AuditLog(db.Model):
             'details': self.details
         }
 
+class AuditLogArchive(db.Model):
+    """Audit entries moved out of audit_log once they age past the retention window"""
+    __tablename__ = 'audit_log_archive'
+    __table_args__ = (
+        db.Index('idx_audit_log_archive_timestamp', 'timestamp', 'id'),
+        db.Index('idx_audit_log_archive_actor_timestamp', 'actor_id', 'timestamp', 'id'),
+    )
+    id = db.Column(db.String(36), primary_key=True)
+    timestamp = db.Column(db.DateTime)
+    actor_id = db.Column(db.String(36), nullable=False)
+    action = db.Column(db.String(100), nullable=False)
+    target_id = db.Column(db.String(36), nullable=True)
+    details = db.Column(db.JSON, nullable=True)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    actor = db.relationship('User', primaryjoin='foreign(AuditLogArchive.actor_id) == User.id', viewonly=True, lazy='joined')
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'timestamp': self.timestamp.isoformat() if self.timestamp else None,
+            'actor_id': self.actor_id,
+            'actor_email': self.actor.email if self.actor and self.actor.email else None,
+            'action': self.action,
+            'target_id': self.target_id,
+            'details': self.details,
+            'archived_at': self.archived_at.isoformat() if self.archived_at else None
+        }
+
 class CoachProfile(db.Model):
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = db.Column(db.String(36), db.ForeignKey('user.id'), nullable=False)
@@ -154,6 +192,11 @@ class CustomerProfile(db.Model):
         }
 
 class TrainingPlan(db.Model):
+    # Coach plan listings filtered by status, which is a range over start/end dates
+    # (kept in sync with migrations/add_training_plan_status_index.sql)
+    __table_args__ = (
+        db.Index('idx_training_plan_coach_dates', 'coach_id', 'start_date', 'end_date'),
+    )
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     coach_id = db.Column(db.String(36), db.ForeignKey('coach_profile.id'), nullable=False)  # Changed from customer_id
     name = db.Column(db.String(100), nullable=False)
@@ -164,17 +207,21 @@ class TrainingPlan(db.Model):
     end_date = db.Column(db.Date, nullable=True)  # When plan expires
     is_active = db.Column(db.Boolean, default=True)
     exercises = db.Column(db.JSON)  # Store exercises as JSON array
-    assigned_customer_ids = db.Column(db.JSON)  # Store customer IDs as JSON array
+    assigned_customer_ids = db.Column(db.JSON)  # Mirror of plan_assignment for API compatibility; not queried
+    version = db.Column(db.Integer, nullable=False, default=1)  # Bumped on every plan or exercise change
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    assignments = db.relationship('PlanAssignment', backref='plan', cascade='all, delete-orphan')
     
-    @property
+    STATUSES = ('active', 'upcoming', 'draft', 'expired')  # also the sort order for ?sort=status
+
+    @hybrid_property
     def status(self):
         """Calculate status based on dates"""
         if not self.start_date:
             return 'draft'  # No start date set
         
-        from datetime import date
         today = date.today()
         
         if self.start_date > today:
@@ -184,6 +231,39 @@ class TrainingPlan(db.Model):
         else:
             return 'active'
 
+    @status.expression
+    def status(cls):
+        """The same rules as a SQL CASE, for grouping and sorting in the database"""
+        today = date.today()
+        return db.case(
+            (cls.start_date.is_(None), 'draft'),
+            (cls.start_date > today, 'upcoming'),
+            (db.and_(cls.end_date.isnot(None), cls.end_date < today), 'expired'),
+            else_='active'
+        )
+
+    @classmethod
+    def status_is(cls, status):
+        """
+        Predicate equivalent to status == value, written as ranges over start_date /
+        end_date so it can use idx_training_plan_coach_dates
+        """
+        today = date.today()
+        if status == 'draft':
+            return cls.start_date.is_(None)
+        if status == 'upcoming':
+            return cls.start_date > today
+        if status == 'expired':
+            return db.and_(cls.start_date <= today, cls.end_date < today)
+        if status == 'active':
+            return db.and_(cls.start_date <= today, db.or_(cls.end_date.is_(None), cls.end_date >= today))
+        raise ValueError(f'Unknown plan status: {status}')
+
+    @classmethod
+    def status_rank(cls):
+        """Sort key that puts statuses in STATUSES order when sorted descending"""
+        return db.case({status: len(cls.STATUSES) - index for index, status in enumerate(cls.STATUSES)}, value=cls.status)
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -198,10 +278,40 @@ class TrainingPlan(db.Model):
             'is_active': self.is_active,
             'exercises': self.exercises or [],
             'assigned_customer_ids': self.assigned_customer_ids or [],
+            'version': self.version,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
+class PlanAssignment(db.Model):
+    """
+    A training plan assigned to one customer. start_date / end_date narrow the
+    plan's own dates for this customer; NULL means "follow the plan".
+    """
+    __tablename__ = 'plan_assignment'
+    # Customer plan lookups and per-plan assignment lists
+    # (kept in sync with migrations/add_plan_assignment_table.sql)
+    __table_args__ = (
+        db.UniqueConstraint('plan_id', 'customer_id', name='uq_plan_assignment_plan_customer'),
+        db.Index('idx_plan_assignment_customer_plan', 'customer_id', 'plan_id'),
+    )
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    plan_id = db.Column(db.String(36), db.ForeignKey('training_plan.id', ondelete='CASCADE'), nullable=False)
+    customer_id = db.Column(db.String(36), db.ForeignKey('customer_profile.id', ondelete='CASCADE'), nullable=False)
+    start_date = db.Column(db.Date, nullable=True)
+    end_date = db.Column(db.Date, nullable=True)
+    assigned_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'plan_id': self.plan_id,
+            'customer_id': self.customer_id,
+            'start_date': self.start_date.isoformat() if self.start_date else None,
+            'end_date': self.end_date.isoformat() if self.end_date else None,
+            'assigned_at': self.assigned_at.isoformat() if self.assigned_at else None
+        }
+
 class Exercise(db.Model):
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     training_plan_id = db.Column(db.String(36), db.ForeignKey('training_plan.id'), nullable=False)
@@ -233,6 +343,20 @@ class Exercise(db.Model):
         }
 
 class Booking(db.Model):
+    # Calendar range scans, live-slot conflict checks and per-customer lookups
+    # (kept in sync with migrations/add_hot_query_indexes.sql)
+    __table_args__ = (
+        db.Index('idx_booking_coach_start', 'coach_id', 'start_time'),
+        db.Index('idx_booking_coach_live', 'coach_id', 'start_time', 'end_time',
+                 postgresql_where=db.text("status IN ('confirmed', 'pending')"),
+                 sqlite_where=db.text("status IN ('confirmed', 'pending')")),
+        # Pending-booking conversion: one customer's bookings with one coach in start_time order
+        db.Index('idx_booking_customer_coach_start', 'customer_id', 'coach_id', 'start_time', 'status'),
+        db.Index('idx_booking_customer_start', 'customer_id', 'start_time'),
+        # Stale pending bookings (src/expiry_sweeper.py; migrations/add_expiry_sweep_indexes.sql).
+        # Not partial: SQLite can't match a status IN (...) predicate against bound parameters
+        db.Index('idx_booking_status_start', 'status', 'start_time'),
+    )
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     customer_id = db.Column(db.String(36), db.ForeignKey('customer_profile.id'), nullable=True)  # Nullable for personal events
     coach_id = db.Column(db.String(36), db.ForeignKey('coach_profile.id'), nullable=False)
@@ -318,6 +442,9 @@ class Availability(db.Model):
 
 class DateSpecificAvailability(db.Model):
     __tablename__ = 'date_specific_availability'
+    __table_args__ = (
+        db.Index('idx_date_specific_availability_coach_date', 'coach_id', 'date'),
+    )
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     coach_id = db.Column(db.String(36), db.ForeignKey('coach_profile.id'), nullable=False)
     date = db.Column(db.Date, nullable=False)
@@ -402,6 +529,21 @@ class Package(db.Model):
 class PackageSubscription(db.Model):
     """Customer subscription to a package"""
     __tablename__ = 'package_subscription'
+    # The booking and package routes look up "the active subscription" of a customer with a coach
+    __table_args__ = (
+        db.Index('idx_package_subscription_customer_coach_status', 'customer_id', 'coach_id', 'status'),
+        db.Index('idx_package_subscription_active', 'customer_id', 'coach_id',
+                 postgresql_where=db.text("status = 'active'"),
+                 sqlite_where=db.text("status = 'active'")),
+        # Due renewals (src/renewals.py; kept in sync with migrations/add_subscription_renewal_index.sql)
+        db.Index('idx_package_subscription_renewal', 'next_renewal_date',
+                 postgresql_where=db.text("status = 'active' AND auto_renew"),
+                 sqlite_where=db.text("status = 'active' AND auto_renew")),
+        # Ended subscriptions still marked active (src/expiry_sweeper.py; migrations/add_expiry_sweep_indexes.sql)
+        db.Index('idx_package_subscription_expiry', 'end_date',
+                 postgresql_where=db.text("status = 'active'"),
+                 sqlite_where=db.text("status = 'active'")),
+    )
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     package_id = db.Column(db.String(36), db.ForeignKey('package.id'), nullable=False)
     customer_id = db.Column(db.String(36), db.ForeignKey('customer_profile.id'), nullable=False)
@@ -464,6 +606,12 @@ class PackageSubscription(db.Model):
 class RecurringSchedule(db.Model):
     """Recurring booking template for package subscribers"""
     __tablename__ = 'recurring_schedule'
+    # Due-schedule scan of the auto-booking run (kept in sync with migrations/add_recurring_schedule_horizon.sql)
+    __table_args__ = (
+        db.Index('idx_recurring_schedule_next_booking', 'next_booking_on',
+                 postgresql_where=db.text('is_active AND auto_book_enabled'),
+                 sqlite_where=db.text('is_active AND auto_book_enabled')),
+    )
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     subscription_id = db.Column(db.String(36), db.ForeignKey('package_subscription.id'), nullable=False)
     customer_id = db.Column(db.String(36), db.ForeignKey('customer_profile.id'), nullable=False)
@@ -477,6 +625,8 @@ class RecurringSchedule(db.Model):
     # Auto-booking settings
     auto_book_enabled = db.Column(db.Boolean, default=True)
     book_weeks_ahead = db.Column(db.Integer, default=4)
+    booked_until = db.Column(db.Date, nullable=True)  # Sessions exist up to this date (src/auto_booking.py)
+    next_booking_on = db.Column(db.Date, nullable=True)  # When the next unbooked occurrence enters the window; NULL = due now
     
     # Status
     is_active = db.Column(db.Boolean, default=True)
@@ -499,6 +649,7 @@ class RecurringSchedule(db.Model):
             'end_time': self.end_time.strftime('%H:%M') if self.end_time else None,
             'auto_book_enabled': self.auto_book_enabled,
             'book_weeks_ahead': self.book_weeks_ahead,
+            'booked_until': self.booked_until.isoformat() if self.booked_until else None,
             'is_active': self.is_active,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
@@ -510,6 +661,9 @@ class RecurringSchedule(db.Model):
 class CoachAssignment(db.Model):
     """Temporary coach assignment for vacation/sick coverage"""
     __tablename__ = 'coach_assignment'
+    __table_args__ = (
+        db.Index('idx_coach_assignment_customer_status_dates', 'customer_id', 'status', 'start_date', 'end_date'),
+    )
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     customer_id = db.Column(db.String(36), db.ForeignKey('customer_profile.id'), nullable=False)
@@ -4,6 +4,9 @@ import uuid
 
 class WorkoutCompletion(db.Model):
     __tablename__ = 'workout_completions'
+    __table_args__ = (
+        db.Index('idx_workout_completions_customer_completed', 'customer_id', 'completed_at'),
+    )
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     customer_id = db.Column(db.String(36), db.ForeignKey('user.id'), nullable=False)
@@ -19,8 +22,8 @@ class WorkoutCompletion(db.Model):
     training_plan = db.relationship('TrainingPlan', backref='completions')
     exercise_completions = db.relationship('ExerciseCompletion', backref='workout', cascade='all, delete-orphan')
     
-    def to_dict(self):
-        return {
+    def to_dict(self, include_exercises=True):
+        data = {
             'id': self.id,
             'customer_id': self.customer_id,
             'training_plan_id': self.training_plan_id,
@@ -28,9 +31,11 @@ class WorkoutCompletion(db.Model):
             'completed_at': self.completed_at.isoformat() if self.completed_at else None,
             'duration_minutes': self.duration_minutes,
             'notes': self.notes,
-            'rating': self.rating,
-            'exercise_completions': [ec.to_dict() for ec in self.exercise_completions]
+            'rating': self.rating
         }
+        if include_exercises:
+            data['exercise_completions'] = [ec.to_dict() for ec in self.exercise_completions]
+        return data
 
 
 class ExerciseCompletion(db.Model):
@@ -40,14 +45,16 @@ class ExerciseCompletion(db.Model):
     workout_completion_id = db.Column(db.String(36), db.ForeignKey('workout_completions.id'), nullable=False)
     exercise_id = db.Column(db.String(36), db.ForeignKey('exercise.id'), nullable=False)
     sets_completed = db.Column(db.Integer, default=0)
-    reps_completed = db.Column(db.String(100))  # e.g., "10,12,10" for 3 sets
-    weight_used = db.Column(db.String(100))  # e.g., "50,50,55" for 3 sets with different weights
+    reps_completed = db.Column(db.String(100))  # e.g., "10,12,10" for 3 sets (mirror of sets, kept for API compatibility)
+    weight_used = db.Column(db.String(100))  # e.g., "50,50,55" for 3 sets with different weights (mirror of sets)
     notes = db.Column(db.Text)  # Notes about this specific exercise
     is_pr = db.Column(db.Boolean, default=False)  # Did they hit a personal record?
     completed_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationships
     exercise = db.relationship('Exercise', backref='completions')
+    sets = db.relationship('ExerciseSet', backref='exercise_completion', cascade='all, delete-orphan',
+                           order_by='ExerciseSet.set_number')
     
     def to_dict(self):
         return {
@@ -58,7 +65,33 @@ class ExerciseCompletion(db.Model):
             'sets_completed': self.sets_completed,
             'reps_completed': self.reps_completed,
             'weight_used': self.weight_used,
+            'sets': [exercise_set.to_dict() for exercise_set in self.sets],
             'notes': self.notes,
             'is_pr': self.is_pr,
             'completed_at': self.completed_at.isoformat() if self.completed_at else None
         }
+
+
+class ExerciseSet(db.Model):
+    """
+    One performed set of an exercise completion, typed so volume, tonnage and
+    best-set figures are plain SQL aggregates.
+    """
+    __tablename__ = 'exercise_sets'
+    # (kept in sync with migrations/add_exercise_set_table.sql)
+    __table_args__ = (
+        db.UniqueConstraint('exercise_completion_id', 'set_number', name='uq_exercise_sets_completion_set'),
+    )
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    exercise_completion_id = db.Column(db.String(36), db.ForeignKey('exercise_completions.id', ondelete='CASCADE'), nullable=False)
+    set_number = db.Column(db.Integer, nullable=False)  # 1-based
+    reps = db.Column(db.Integer)  # NULL when not recorded or not a number ("to failure")
+    weight = db.Column(db.Float)  # NULL for bodyweight / not recorded
+
+    def to_dict(self):
+        return {
+            'set_number': self.set_number,
+            'reps': self.reps,
+            'weight': self.weight
+        }
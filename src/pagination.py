@@ -0,0 +1,96 @@
+"""
+Pagination Helpers
+Keyset (seek) pagination with opaque cursors
+"""
+
+import base64
+import json
+from datetime import datetime, date
+
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    if isinstance(value, date):
+        return {'d': value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if 'dt' in value:
+            return datetime.fromisoformat(value['dt'])
+        if 'd' in value:
+            return date.fromisoformat(value['d'])
+    return value
+
+
+def encode_cursor(values):
+    """Encode the sort-key values of the last row on a page into an opaque URL-safe token"""
+    raw = json.dumps([_encode_value(v) for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Inverse of encode_cursor. Raises ValueError for malformed tokens."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(values, list):
+        raise ValueError('Invalid cursor')
+    return [_decode_value(v) for v in values]
+
+
+def page_size(args, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """Read ?limit= from request args, clamped to [1, maximum]"""
+    try:
+        return max(1, min(int(args.get('limit', default)), maximum))
+    except (TypeError, ValueError):
+        return default
+
+
+def keyset_page(query, columns, cursor=None, limit=DEFAULT_PAGE_SIZE, descending=False, key=None):
+    """
+    Fetch one page of `query` ordered by `columns`.
+
+    The last column must make the ordering unique (normally the primary key), so a
+    composite index on the same columns lets the database seek straight to the page.
+
+    Args:
+        query: SQLAlchemy query with all filters applied
+        columns: Sort columns, e.g. [User.first_name, User.last_name, User.id]
+        cursor: Token from a previous page's next_cursor, or None for the first page
+        limit: Page size
+        descending: Sort all columns descending (newest first)
+        key: Function mapping a result row to its sort-key values; defaults to
+             reading the column attributes from the row
+
+    Returns:
+        (rows, next_cursor) - next_cursor is None on the last page
+    """
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != len(columns):
+            raise ValueError('Invalid cursor')
+        if descending:
+            query = query.filter(tuple_(*columns) < tuple_(*values))
+        else:
+            query = query.filter(tuple_(*columns) > tuple_(*values))
+
+    ordering = [column.desc() for column in columns] if descending else list(columns)
+    rows = query.order_by(*ordering).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        values = key(last) if key else [getattr(last, column.key) for column in columns]
+        next_cursor = encode_cursor(values)
+    return rows, next_cursor
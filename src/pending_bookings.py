@@ -0,0 +1,198 @@
+"""
+Pending Bookings
+Confirms pending / pending_credits bookings once credits are available, earliest
+session first - the same order the credits would have been spent in had they
+been there when the sessions were booked
+
+Bookings are ranked per customer and coach with ROW_NUMBER() OVER (ORDER BY
+start_time), and every booking ranked within the credits left (all of them for
+unlimited packages) is confirmed by one UPDATE ... FROM. The subscriptions (or
+the customer profile, when spending its session_credits) are locked first, so
+credits are decremented from a consistent balance in the same transaction.
+
+CustomerProfile.session_credits mirrors subscription credits (create_subscription
+and renewals add to it, customer bookings spend it), so spending a subscription's
+credits here takes them off session_credits as well, and records a 'booking'
+entry in the credit ledger.
+
+Runs whenever credits are added: new subscriptions and renewals (subscription
+credits), coach credit updates (session_credits), as well as the explicit
+convert-pending-bookings endpoint.
+"""
+
+from collections import Counter
+
+from sqlalchemy import and_, bindparam, case, func, insert, or_, select, update
+
+from src.models.user import db, CustomerProfile, Package, PackageSubscription, Booking
+from src.models.credit_ledger import CreditLedgerEntry
+from src.expiry_sweeper import PENDING_STATUSES
+
+
+def _position():
+    return func.row_number().over(
+        partition_by=(Booking.customer_id, Booking.coach_id),
+        order_by=(Booking.start_time, Booking.id)
+    ).label('position')
+
+
+def adjust_session_credits(deltas):
+    """
+    Add {customer_id: delta} to the customers' session_credits mirror in one
+    executemany UPDATE, never going below zero (the mirror can already be lower
+    than the subscription balance). Runs in the caller's transaction.
+    """
+    deltas = [{'customer': customer_id, 'delta': delta} for customer_id, delta in deltas.items() if delta]
+    if not deltas:
+        return
+    table = CustomerProfile.__table__
+    balance = func.coalesce(table.c.session_credits, 0) + bindparam('delta')
+    db.session.execute(
+        update(table).where(table.c.id == bindparam('customer')).values(
+            session_credits=case((balance < 0, 0), else_=balance)
+        ),
+        deltas
+    )
+
+
+def record_credit_spend(spent):
+    """
+    Record credits spent on bookings: one 'booking' ledger entry per subscription
+    and the matching session_credits decrement. spent is a list of dicts with
+    subscription_id, customer_id, coach_id, count, balance_after and booking_id
+    (the first booking paid for - a booking is only paid for once, so it keeps
+    the reference unique). Runs in the caller's transaction.
+    """
+    if not spent:
+        return
+    db.session.execute(insert(CreditLedgerEntry.__table__), [
+        {
+            'subscription_id': row['subscription_id'],
+            'customer_id': row['customer_id'],
+            'coach_id': row['coach_id'],
+            'entry_type': 'booking',
+            'delta': -row['count'],
+            'balance_after': row['balance_after'],
+            'reference': f"booking:{row['subscription_id']}:{row['booking_id']}"
+        }
+        for row in spent
+    ])
+    mirrored = Counter()
+    for row in spent:
+        mirrored[row['customer_id']] -= row['count']
+    adjust_session_credits(mirrored)
+
+
+def confirm_pending_bookings(subscription_ids):
+    """
+    Spend the credits of the given active subscriptions on their customers'
+    pending bookings with the subscription's coach. Runs in the caller's
+    transaction; does not commit.
+
+    Returns:
+        {subscription_id: bookings confirmed} for subscriptions that confirmed any
+    """
+    subscriptions = {
+        row.id: row for row in db.session.query(
+            PackageSubscription.id, PackageSubscription.customer_id, PackageSubscription.coach_id,
+            PackageSubscription.credits_remaining,
+            PackageSubscription.credits_used, Package.is_unlimited
+        ).join(Package, Package.id == PackageSubscription.package_id).filter(
+            PackageSubscription.id.in_(subscription_ids),
+            PackageSubscription.status == 'active'
+        ).with_for_update(of=PackageSubscription)
+    } if subscription_ids else {}
+    if not subscriptions:
+        return {}
+
+    ranked = select(
+        Booking.id.label('booking_id'),
+        PackageSubscription.id.label('subscription_id'),
+        PackageSubscription.credits_remaining,
+        Package.is_unlimited,
+        _position()
+    ).join(
+        PackageSubscription, and_(
+            PackageSubscription.customer_id == Booking.customer_id,
+            PackageSubscription.coach_id == Booking.coach_id
+        )
+    ).join(
+        Package, Package.id == PackageSubscription.package_id
+    ).where(
+        PackageSubscription.id.in_(list(subscriptions)),
+        Booking.status.in_(PENDING_STATUSES)
+    ).subquery()
+
+    # pending -> confirmed keeps bookings live: no admin stat rollup changes (see src/admin_stats.py)
+    confirmed = db.session.execute(
+        update(Booking).where(
+            Booking.id == ranked.c.booking_id,
+            or_(ranked.c.is_unlimited.is_(True), ranked.c.position <= ranked.c.credits_remaining)
+        ).values(
+            status='confirmed', subscription_id=ranked.c.subscription_id
+        ).returning(Booking.id, Booking.subscription_id).execution_options(synchronize_session=False)
+    ).all()
+
+    counts = Counter(subscription_id for _, subscription_id in confirmed)
+    first_booking = {}
+    for booking_id, subscription_id in confirmed:
+        first_booking[subscription_id] = min(first_booking.get(subscription_id, booking_id), booking_id)
+    spent = [
+        {
+            'id': subscription_id,
+            'credits_remaining': (subscriptions[subscription_id].credits_remaining or 0) - count,
+            'credits_used': (subscriptions[subscription_id].credits_used or 0) + count
+        }
+        for subscription_id, count in counts.items() if not subscriptions[subscription_id].is_unlimited
+    ]
+    if spent:
+        db.session.execute(update(PackageSubscription), spent)
+        record_credit_spend([
+            {
+                'subscription_id': row['id'],
+                'customer_id': subscriptions[row['id']].customer_id,
+                'coach_id': subscriptions[row['id']].coach_id,
+                'count': counts[row['id']],
+                'balance_after': row['credits_remaining'],
+                'booking_id': first_booking[row['id']]
+            }
+            for row in spent
+        ])
+    return dict(counts)
+
+
+def confirm_pending_with_session_credits(customer_id):
+    """
+    Spend a customer profile's session_credits on their pending bookings with
+    their coach (after a coach adds session_credits). Runs in the caller's
+    transaction; does not commit.
+
+    Returns:
+        Number of bookings confirmed
+    """
+    customer = db.session.query(
+        CustomerProfile.id, CustomerProfile.coach_id, CustomerProfile.session_credits
+    ).filter(CustomerProfile.id == customer_id).with_for_update().first()
+    if customer is None or not customer.session_credits or customer.session_credits <= 0:
+        return 0
+
+    ranked = select(Booking.id.label('booking_id'), _position()).where(
+        Booking.customer_id == customer.id,
+        Booking.coach_id == customer.coach_id,
+        Booking.status.in_(PENDING_STATUSES)
+    ).subquery()
+
+    count = db.session.execute(
+        update(Booking).where(
+            Booking.id == ranked.c.booking_id,
+            ranked.c.position <= customer.session_credits
+        ).values(status='confirmed').execution_options(synchronize_session=False)
+    ).rowcount
+    if count:
+        db.session.execute(
+            update(CustomerProfile).where(CustomerProfile.id == customer.id)
+            .values(session_credits=CustomerProfile.session_credits - count)
+            .execution_options(synchronize_session=False)
+        )
+    return count
+
@@ -0,0 +1,137 @@
+"""
+Plan Assignments
+Reads and writes of the plan_assignment table, so a customer's plans are found
+with one indexed query instead of scanning every plan of their coach
+
+TrainingPlan.assigned_customer_ids is still written as a mirror so existing
+clients keep working, but nothing reads it to decide access.
+"""
+
+from datetime import date
+
+from sqlalchemy import insert, or_
+
+from src.models.user import db, TrainingPlan, PlanAssignment, CustomerProfile
+from src.backfill import run_backfill
+
+
+def _set_mirror(plan, customer_ids):
+    # Reassign so SQLAlchemy notices the JSON column changed
+    plan.assigned_customer_ids = list(customer_ids)
+
+
+def _coach_customer_ids(coach_id, customer_ids):
+    """Subset of customer_ids that are customers of coach_id"""
+    if not customer_ids:
+        return set()
+    return {
+        row.id for row in db.session.query(CustomerProfile.id).filter(
+            CustomerProfile.id.in_(customer_ids),
+            CustomerProfile.coach_id == coach_id
+        )
+    }
+
+
+def assign_customer(plan, customer_id, start_date=None, end_date=None):
+    """Assign plan to one customer, or update the dates of an existing assignment"""
+    assignment = PlanAssignment.query.filter_by(plan_id=plan.id, customer_id=customer_id).first()
+    if assignment is None:
+        assignment = PlanAssignment(plan_id=plan.id, customer_id=customer_id)
+        db.session.add(assignment)
+    assignment.start_date = start_date
+    assignment.end_date = end_date
+
+    mirror = plan.assigned_customer_ids or []
+    if customer_id not in mirror:
+        _set_mirror(plan, mirror + [customer_id])
+    return assignment
+
+
+def unassign_customer(plan, customer_id):
+    """Remove one customer's assignment. Returns True if there was one."""
+    deleted = PlanAssignment.query.filter_by(
+        plan_id=plan.id, customer_id=customer_id
+    ).delete(synchronize_session='fetch')
+    _set_mirror(plan, [cid for cid in (plan.assigned_customer_ids or []) if cid != customer_id])
+    return bool(deleted)
+
+
+def set_assigned_customers(plan, customer_ids):
+    """
+    Make plan assigned to exactly customer_ids (ids not belonging to the plan's
+    coach are ignored). Adds and removes rows; existing assignments keep their dates.
+    """
+    if plan.id is None:
+        db.session.flush()
+
+    wanted = _coach_customer_ids(plan.coach_id, customer_ids or [])
+    existing = {
+        row.customer_id for row in db.session.query(PlanAssignment.customer_id).filter_by(plan_id=plan.id)
+    }
+
+    removed = existing - wanted
+    if removed:
+        PlanAssignment.query.filter(
+            PlanAssignment.plan_id == plan.id,
+            PlanAssignment.customer_id.in_(removed)
+        ).delete(synchronize_session='fetch')
+
+    added = wanted - existing
+    if added:
+        db.session.execute(insert(PlanAssignment.__table__), [
+            {'plan_id': plan.id, 'customer_id': customer_id} for customer_id in sorted(added)
+        ])
+
+    _set_mirror(plan, [cid for cid in (customer_ids or []) if cid in wanted])
+
+
+def assignment_window(today):
+    """Filters keeping assignments whose own dates (if any) cover today"""
+    return [
+        or_(PlanAssignment.start_date.is_(None), PlanAssignment.start_date <= today),
+        or_(PlanAssignment.end_date.is_(None), PlanAssignment.end_date >= today)
+    ]
+
+
+def customer_plans_query(customer_id, on=None):
+    """Query of TrainingPlans assigned to a customer whose assignment covers `on` (default today)"""
+    return TrainingPlan.query.join(
+        PlanAssignment, PlanAssignment.plan_id == TrainingPlan.id
+    ).filter(
+        PlanAssignment.customer_id == customer_id,
+        *assignment_window(on or date.today())
+    )
+
+
+def backfill_plan_assignments(max_batches=None):
+    """
+    Create plan_assignment rows from TrainingPlan.assigned_customer_ids, in
+    resumable batches of plans. Ids of deleted customers are skipped.
+    """
+    def process(plan_ids):
+        plans = db.session.query(
+            TrainingPlan.id, TrainingPlan.assigned_customer_ids
+        ).filter(TrainingPlan.id.in_(plan_ids)).all()
+
+        existing = {
+            tuple(row) for row in db.session.query(PlanAssignment.plan_id, PlanAssignment.customer_id).filter(
+                PlanAssignment.plan_id.in_(plan_ids)
+            )
+        }
+        candidates = {customer_id for plan in plans for customer_id in (plan.assigned_customer_ids or [])}
+        known = {
+            row.id for row in db.session.query(CustomerProfile.id).filter(CustomerProfile.id.in_(candidates))
+        } if candidates else set()
+
+        rows = [
+            {'plan_id': plan.id, 'customer_id': customer_id}
+            for plan in plans
+            for customer_id in dict.fromkeys(plan.assigned_customer_ids or [])
+            if customer_id in known and (plan.id, customer_id) not in existing
+        ]
+        if rows:
+            db.session.execute(insert(PlanAssignment.__table__), rows)
+        return len(rows)
+
+    return run_backfill('plan_assignment_from_json', TrainingPlan.id, process,
+                        batch_size=500, max_batches=max_batches)
@@ -0,0 +1,127 @@
+"""
+Plan Clones
+Copies a template TrainingPlan and its exercises to many customers with
+set-based SQL: one multi-row INSERT for the plan rows, one INSERT ... SELECT
+that copies every source exercise into every new plan, and one multi-row
+INSERT for the assignments - per chunk of customers, whatever the plan size
+
+Each clone gets its own exercise rows. Exercises are edited in place by id and
+referenced by ExerciseCompletion.exercise_id, so clones sharing rows with the
+template would see each other's edits and history.
+"""
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.types import String
+
+from src.models.user import db, TrainingPlan, PlanAssignment, Exercise
+from src.plan_assignments import _coach_customer_ids
+from src.adherence import invalidate_coach
+
+CLONE_CHUNK_SIZE = 100
+CLONE_BACKGROUND_THRESHOLD = 500
+
+# Fields a clone takes from the template unless overridden by the request
+CLONE_PLAN_FIELDS = ('name', 'description', 'difficulty', 'duration_weeks', 'start_date', 'end_date', 'is_active')
+CLONE_EXERCISE_FIELDS = ('name', 'sets', 'reps', 'rest_seconds', 'tempo', 'instructions',
+                         'video_url', 'notes', 'order', 'day_number')
+
+
+class random_uuid(FunctionElement):
+    """A new uuid4 string generated by the database, one per row"""
+    type = String()
+    inherit_cache = True
+
+
+@compiles(random_uuid, 'postgresql')
+def _random_uuid_postgresql(element, compiler, **kw):
+    return 'gen_random_uuid()::text'
+
+
+@compiles(random_uuid)
+def _random_uuid_default(element, compiler, **kw):
+    # SQLite: format 16 random bytes as a version 4 uuid
+    return (
+        "lower(hex(randomblob(4)) || '-' || hex(randomblob(2)) || '-4' || substr(hex(randomblob(2)), 2) || '-'"
+        " || substr('89ab', 1 + abs(random()) % 4, 1) || substr(hex(randomblob(2)), 2) || '-' || hex(randomblob(6)))"
+    )
+
+
+def clone_targets(coach_id, customer_ids):
+    """customer_ids that belong to coach_id, de-duplicated, in request order"""
+    allowed = _coach_customer_ids(coach_id, customer_ids)
+    return [customer_id for customer_id in dict.fromkeys(customer_ids) if customer_id in allowed]
+
+
+def clone_plan(source_plan_id, customer_ids, overrides=None, progress=None):
+    """
+    Create one copy of a plan (with all its exercises) per customer and assign it
+    to them. Commits every CLONE_CHUNK_SIZE customers.
+
+    Args:
+        source_plan_id: Template plan to copy
+        customer_ids: Customers to clone for (already checked to belong to the coach)
+        overrides: Optional values for CLONE_PLAN_FIELDS replacing the template's
+        progress: Optional callback(customers_done) after each chunk
+
+    Returns:
+        {'cloned': count, 'plans': {customer_id: new_plan_id}}
+    """
+    source = TrainingPlan.query.get(source_plan_id)
+    if source is None:
+        raise ValueError('Training plan not found')
+
+    plan_values = {field: getattr(source, field) for field in CLONE_PLAN_FIELDS}
+    plan_values.update({
+        field: value for field, value in (overrides or {}).items() if field in CLONE_PLAN_FIELDS
+    })
+
+    exercise_columns = [getattr(Exercise, field) for field in CLONE_EXERCISE_FIELDS]
+    plans = {}
+
+    for offset in range(0, len(customer_ids), CLONE_CHUNK_SIZE):
+        chunk = customer_ids[offset:offset + CLONE_CHUNK_SIZE]
+        now = datetime.utcnow()
+        new_ids = {customer_id: str(uuid.uuid4()) for customer_id in chunk}
+
+        db.session.execute(insert(TrainingPlan.__table__), [
+            {
+                **plan_values,
+                'id': new_ids[customer_id],
+                'coach_id': source.coach_id,
+                'assigned_customer_ids': [customer_id],
+                'version': 1,
+                'created_at': now,
+                'updated_at': now
+            }
+            for customer_id in chunk
+        ])
+
+        # Every template exercise x every new plan in one statement
+        copies = select(
+            random_uuid(), TrainingPlan.id, *exercise_columns
+        ).select_from(Exercise).join(
+            TrainingPlan, TrainingPlan.id.in_(list(new_ids.values()))
+        ).where(Exercise.training_plan_id == source.id)
+        db.session.execute(
+            insert(Exercise.__table__).from_select(
+                ['id', 'training_plan_id', *CLONE_EXERCISE_FIELDS], copies
+            )
+        )
+
+        db.session.execute(insert(PlanAssignment.__table__), [
+            {'plan_id': new_ids[customer_id], 'customer_id': customer_id, 'assigned_at': now}
+            for customer_id in chunk
+        ])
+
+        db.session.commit()
+        invalidate_coach(source.coach_id)
+        plans.update(new_ids)
+        if progress:
+            progress(len(plans))
+
+    return {'cloned': len(plans), 'plans': plans}
@@ -0,0 +1,80 @@
+"""
+Plan Documents
+Builds training plan payloads with their exercises, loading the exercises of all
+requested plans with one IN query and caching each plan's compiled exercise list
+under (plan_id, version)
+
+TrainingPlan.version is bumped by every plan or exercise change, so a cached list
+can never be served for a newer version - even by another worker whose copy of
+the cache was not invalidated. Plan fields (including the date-based status) are
+always taken from the freshly loaded plan row.
+"""
+
+from collections import defaultdict
+from datetime import datetime
+
+from src.models.user import db, TrainingPlan, Exercise
+from src.ttl_cache import TTLCache
+
+# Compiled exercise lists keyed by (plan_id, version)
+plan_exercise_cache = TTLCache(maxsize=4096, ttl=3600)
+
+
+def bump_plan_version(plan):
+    """
+    Mark a plan as changed: increments version in SQL (safe under concurrent
+    writers) and drops this worker's cached exercise lists for it.
+    """
+    plan.version = TrainingPlan.version + 1
+    plan.updated_at = datetime.utcnow()
+    invalidate_plan(plan.id)
+
+
+def invalidate_plan(plan_id):
+    plan_exercise_cache.invalidate_where(lambda key: key[0] == plan_id)
+
+
+def _compile_exercises(exercises):
+    return [exercise.to_dict() for exercise in exercises]
+
+
+def plan_exercises(plans):
+    """
+    Return {plan_id: [exercise dicts ordered by day_number, order]} for plans.
+    Cached lists are used where the version matches; all misses are loaded with
+    a single query.
+    """
+    result = {}
+    missing = []
+    for plan in plans:
+        cached = plan_exercise_cache.get((plan.id, plan.version))
+        if cached is None:
+            missing.append(plan)
+        else:
+            result[plan.id] = cached
+
+    if missing:
+        grouped = defaultdict(list)
+        exercises = Exercise.query.filter(
+            Exercise.training_plan_id.in_([plan.id for plan in missing])
+        ).order_by(Exercise.training_plan_id, Exercise.day_number, Exercise.order).all()
+        for exercise in exercises:
+            grouped[exercise.training_plan_id].append(exercise)
+
+        for plan in missing:
+            compiled = _compile_exercises(grouped.get(plan.id, []))
+            plan_exercise_cache.set((plan.id, plan.version), compiled)
+            result[plan.id] = compiled
+
+    return result
+
+
+def plan_documents(plans):
+    """[plan.to_dict() with 'exercises' filled in] for plans, in the given order"""
+    exercises = plan_exercises(plans)
+    documents = []
+    for plan in plans:
+        document = plan.to_dict()
+        document['exercises'] = exercises[plan.id]
+        documents.append(document)
+    return documents
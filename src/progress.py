@@ -0,0 +1,241 @@
+"""
+Progress
+Per-customer, per-exercise aggregates (best weight, estimated 1RM, totals,
+last performed) and weekly series, updated incrementally in the same
+transaction that writes exercise completions, so progress screens and charts
+read a few precomputed rows instead of scanning completion history
+
+is_pr on each completion is decided here from the stored bests: a completion
+is a PR when its heaviest set or best estimated 1RM beats every earlier
+session of that exercise.
+
+Rebuild from history (also run by schema migration 0012):
+    python -m src.progress --rebuild [--customer USER_ID]
+"""
+
+import argparse
+from datetime import datetime, timedelta
+
+from sqlalchemy import bindparam, case, text, update
+
+from src.models.user import db, User, Exercise
+from src.models.workout_completion import WorkoutCompletion, ExerciseCompletion, ExerciseSet
+from src.models.progress import ExerciseProgress, ExerciseProgressWeek
+from src.workout_sets import set_count, total_reps, tonnage, best_weight, estimated_one_rep_max
+from src.backfill import run_backfill
+
+REBUILD_CHUNK_SIZE = 1000
+DEFAULT_SERIES_WEEKS = 12
+
+
+def exercise_key(name):
+    """'  Bench  Press' -> 'bench press'"""
+    return ' '.join((name or '').lower().split())[:100]
+
+
+def week_start(moment):
+    day = moment.date()
+    return day - timedelta(days=day.weekday())
+
+
+def _max_sql(column, table):
+    return (f"CASE WHEN {table}.{column} IS NULL OR excluded.{column} > {table}.{column} "
+            f"THEN excluded.{column} ELSE {table}.{column} END")
+
+
+def _min_sql(column, table):
+    return (f"CASE WHEN {table}.{column} IS NULL OR excluded.{column} < {table}.{column} "
+            f"THEN excluded.{column} ELSE {table}.{column} END")
+
+
+UPSERT_PROGRESS = text(
+    "INSERT INTO exercise_progress (customer_id, exercise_key, exercise_name, best_weight, best_estimated_1rm, "
+    "total_sets, total_reps, total_tonnage, sessions, first_performed_at, last_performed_at, updated_at) "
+    "VALUES (:customer_id, :exercise_key, :exercise_name, :best_weight, :best_estimated_1rm, "
+    ":sets, :reps, :tonnage, :sessions, :first_performed_at, :last_performed_at, CURRENT_TIMESTAMP) "
+    "ON CONFLICT (customer_id, exercise_key) DO UPDATE SET "
+    "exercise_name = CASE WHEN excluded.last_performed_at >= exercise_progress.last_performed_at "
+    "THEN excluded.exercise_name ELSE exercise_progress.exercise_name END, "
+    f"best_weight = {_max_sql('best_weight', 'exercise_progress')}, "
+    f"best_estimated_1rm = {_max_sql('best_estimated_1rm', 'exercise_progress')}, "
+    "total_sets = exercise_progress.total_sets + excluded.total_sets, "
+    "total_reps = exercise_progress.total_reps + excluded.total_reps, "
+    "total_tonnage = exercise_progress.total_tonnage + excluded.total_tonnage, "
+    "sessions = exercise_progress.sessions + excluded.sessions, "
+    f"first_performed_at = {_min_sql('first_performed_at', 'exercise_progress')}, "
+    f"last_performed_at = {_max_sql('last_performed_at', 'exercise_progress')}, "
+    "updated_at = CURRENT_TIMESTAMP"
+).bindparams(
+    bindparam('first_performed_at', type_=db.DateTime),
+    bindparam('last_performed_at', type_=db.DateTime)
+)
+
+UPSERT_WEEK = text(
+    "INSERT INTO exercise_progress_week (customer_id, exercise_key, week_start, sets, reps, tonnage, sessions, "
+    "best_weight, best_estimated_1rm) "
+    "VALUES (:customer_id, :exercise_key, :week_start, :sets, :reps, :tonnage, :sessions, "
+    ":best_weight, :best_estimated_1rm) "
+    "ON CONFLICT (customer_id, exercise_key, week_start) DO UPDATE SET "
+    "sets = exercise_progress_week.sets + excluded.sets, "
+    "reps = exercise_progress_week.reps + excluded.reps, "
+    "tonnage = exercise_progress_week.tonnage + excluded.tonnage, "
+    "sessions = exercise_progress_week.sessions + excluded.sessions, "
+    f"best_weight = {_max_sql('best_weight', 'exercise_progress_week')}, "
+    f"best_estimated_1rm = {_max_sql('best_estimated_1rm', 'exercise_progress_week')}"
+).bindparams(bindparam('week_start', type_=db.Date))
+
+
+def _completion_facts(exercise_completion_ids):
+    """Per-completion set aggregates with the customer and exercise name, oldest first"""
+    return db.session.query(
+        ExerciseCompletion.id,
+        WorkoutCompletion.customer_id,
+        Exercise.name,
+        ExerciseCompletion.completed_at,
+        set_count(), total_reps(), tonnage(), best_weight(), estimated_one_rep_max()
+    ).join(
+        WorkoutCompletion, WorkoutCompletion.id == ExerciseCompletion.workout_completion_id
+    ).join(
+        Exercise, Exercise.id == ExerciseCompletion.exercise_id
+    ).outerjoin(
+        ExerciseSet, ExerciseSet.exercise_completion_id == ExerciseCompletion.id
+    ).filter(
+        ExerciseCompletion.id.in_(exercise_completion_ids)
+    ).group_by(
+        ExerciseCompletion.id, WorkoutCompletion.customer_id, Exercise.name, ExerciseCompletion.completed_at
+    ).order_by(ExerciseCompletion.completed_at, ExerciseCompletion.id).all()
+
+
+def _merge_best(current, value):
+    return value if current is None or (value is not None and value > current) else current
+
+
+def record_completions(exercise_completion_ids):
+    """
+    Fold newly written exercise completions (and their sets) into the progress
+    tables and set their is_pr flags. Runs in the caller's transaction; does not
+    commit. Each completion must be recorded exactly once.
+    """
+    if not exercise_completion_ids:
+        return
+    facts = _completion_facts(list(exercise_completion_ids))
+    if not facts:
+        return
+
+    keys = {(fact.customer_id, exercise_key(fact.name)) for fact in facts}
+    bests = {
+        (row.customer_id, row.exercise_key): [row.best_weight, row.best_estimated_1rm]
+        for row in ExerciseProgress.query.filter(
+            ExerciseProgress.customer_id.in_({customer_id for customer_id, _ in keys}),
+            ExerciseProgress.exercise_key.in_({key for _, key in keys})
+        )
+    }
+
+    totals = {}
+    weeks = {}
+    pr_ids = []
+    for fact in facts:
+        completion_id, customer_id, name, completed_at, sets, reps, volume, heaviest, estimated = fact
+        completed_at = completed_at or datetime.utcnow()
+        estimated = round(estimated, 1) if estimated is not None else None
+        key = (customer_id, exercise_key(name))
+
+        previous = bests.get(key)
+        if previous is not None and (
+            (heaviest is not None and previous[0] is not None and heaviest > previous[0]) or
+            (estimated is not None and previous[1] is not None and estimated > previous[1])
+        ):
+            pr_ids.append(completion_id)
+        bests[key] = [_merge_best(previous and previous[0], heaviest), _merge_best(previous and previous[1], estimated)]
+
+        total = totals.setdefault(key, {
+            'customer_id': customer_id, 'exercise_key': key[1], 'exercise_name': name,
+            'best_weight': None, 'best_estimated_1rm': None, 'sets': 0, 'reps': 0, 'tonnage': 0.0,
+            'sessions': 0, 'first_performed_at': completed_at, 'last_performed_at': completed_at
+        })
+        week = weeks.setdefault(key + (week_start(completed_at),), {
+            'customer_id': customer_id, 'exercise_key': key[1], 'week_start': week_start(completed_at),
+            'best_weight': None, 'best_estimated_1rm': None, 'sets': 0, 'reps': 0, 'tonnage': 0.0, 'sessions': 0
+        })
+        for row in (total, week):
+            row['sets'] += sets
+            row['reps'] += int(reps)
+            row['tonnage'] += float(volume)
+            row['sessions'] += 1
+            row['best_weight'] = _merge_best(row['best_weight'], heaviest)
+            row['best_estimated_1rm'] = _merge_best(row['best_estimated_1rm'], estimated)
+        total['exercise_name'] = name
+        total['last_performed_at'] = completed_at
+
+    db.session.execute(UPSERT_PROGRESS, list(totals.values()))
+    db.session.execute(UPSERT_WEEK, list(weeks.values()))
+    db.session.execute(
+        update(ExerciseCompletion)
+        .where(ExerciseCompletion.id.in_([fact.id for fact in facts]))
+        .values(is_pr=case((ExerciseCompletion.id.in_(pr_ids), True), else_=False))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def rebuild_customer_progress(customer_id):
+    """Recompute a customer's progress rows and PR flags from their full history. Does not commit."""
+    ExerciseProgressWeek.query.filter_by(customer_id=customer_id).delete(synchronize_session=False)
+    ExerciseProgress.query.filter_by(customer_id=customer_id).delete(synchronize_session=False)
+
+    completion_ids = [
+        row.id for row in db.session.query(ExerciseCompletion.id).join(
+            WorkoutCompletion, WorkoutCompletion.id == ExerciseCompletion.workout_completion_id
+        ).filter(
+            WorkoutCompletion.customer_id == customer_id
+        ).order_by(ExerciseCompletion.completed_at, ExerciseCompletion.id)
+    ]
+    # Oldest first, so each chunk's PRs are judged against everything before it
+    for offset in range(0, len(completion_ids), REBUILD_CHUNK_SIZE):
+        record_completions(completion_ids[offset:offset + REBUILD_CHUNK_SIZE])
+
+
+def backfill_exercise_progress(max_batches=None):
+    """Build progress rows for every customer's existing history, in resumable batches"""
+    def process(user_ids):
+        for user_id in user_ids:
+            rebuild_customer_progress(user_id)
+        return len(user_ids)
+
+    return run_backfill('exercise_progress_from_history', User.id, process,
+                        where=User.role == 'customer', batch_size=50, max_batches=max_batches)
+
+
+def progress_summary(customer_id):
+    """A customer's per-exercise progress, most recently performed first"""
+    rows = ExerciseProgress.query.filter_by(customer_id=customer_id).order_by(
+        ExerciseProgress.last_performed_at.desc()
+    ).all()
+    return [row.to_dict() for row in rows]
+
+
+def progress_series(customer_id, exercise, weeks=DEFAULT_SERIES_WEEKS):
+    """Weekly totals for one exercise (name or key) over the last `weeks` weeks, oldest first"""
+    since = week_start(datetime.utcnow()) - timedelta(weeks=weeks - 1)
+    rows = ExerciseProgressWeek.query.filter(
+        ExerciseProgressWeek.customer_id == customer_id,
+        ExerciseProgressWeek.exercise_key == exercise_key(exercise),
+        ExerciseProgressWeek.week_start >= since
+    ).order_by(ExerciseProgressWeek.week_start).all()
+    return {'exercise_key': exercise_key(exercise), 'weeks': [row.to_dict() for row in rows]}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Rebuild exercise progress from completion history')
+    parser.add_argument('--rebuild', action='store_true', required=True)
+    parser.add_argument('--customer', help='Only rebuild this customer (user id)')
+    args = parser.parse_args()
+
+    from src.main import app
+    with app.app_context():
+        customer_ids = [args.customer] if args.customer else [
+            row.customer_id for row in db.session.query(WorkoutCompletion.customer_id).distinct()
+        ]
+        for customer_id in customer_ids:
+            rebuild_customer_progress(customer_id)
+            db.session.commit()
+        print(f"✅ Rebuilt progress for {len(customer_ids)} customers")
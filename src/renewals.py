@@ -0,0 +1,159 @@
+"""
+Subscription Renewals
+Renews auto-renewing package subscriptions whose next_renewal_date has come:
+unused credits of the ending period expire, the package's credits_per_period
+are allocated for the new period and next_renewal_date moves one period on.
+Both credit changes are written to the credit ledger and mirrored into the
+customer's session_credits (as create_subscription does), and the new credits
+are spent on pending bookings (src/pending_bookings.py). Subscriptions past
+their end_date are left for the expiry sweeper.
+
+Due subscriptions are found through idx_package_subscription_renewal and taken
+in batches with FOR UPDATE SKIP LOCKED; each batch is one executemany UPDATE
+plus one multi-row ledger INSERT, committed on its own. A renewed subscription's
+next_renewal_date is in the future, so re-running (or retrying a failed batch)
+never renews a period twice, and ledger references are unique per period.
+
+Period boundaries are counted from start_date (start + n periods), so monthly
+subscriptions starting on the 31st don't drift to the 28th.
+
+Run daily from cron, before auto-booking:
+    python -m src.renewals [--date 2026-01-31]
+"""
+
+import argparse
+from datetime import date
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import insert, or_, update
+
+from src.models.user import db, Package, PackageSubscription
+from src.models.credit_ledger import CreditLedgerEntry
+from src.pending_bookings import adjust_session_credits, confirm_pending_bookings
+
+RENEWAL_BATCH_SIZE = 1000
+UNLIMITED_CREDITS = 999999  # what create_subscription allocates for unlimited packages
+
+PERIODS = {
+    'weekly': relativedelta(weeks=1),
+    'monthly': relativedelta(months=1),
+    'quarterly': relativedelta(months=3),
+    'yearly': relativedelta(years=1)
+}
+
+
+def _boundary(start_date, period, count):
+    return start_date + period * count
+
+
+def current_period(start_date, period_type, today):
+    """(period_start, next_renewal_date) of the period containing today"""
+    period = PERIODS[period_type]
+    # Estimate the number of elapsed periods, then correct for month lengths
+    days = {'weekly': 7, 'monthly': 30, 'quarterly': 91, 'yearly': 365}[period_type]
+    count = max((today - start_date).days // days, 0)
+    while count > 0 and _boundary(start_date, period, count) > today:
+        count -= 1
+    while _boundary(start_date, period, count + 1) <= today:
+        count += 1
+    return _boundary(start_date, period, count), _boundary(start_date, period, count + 1)
+
+
+def _ledger_row(subscription, entry_type, delta, balance_after, period_start):
+    return {
+        'subscription_id': subscription.id,
+        'customer_id': subscription.customer_id,
+        'coach_id': subscription.coach_id,
+        'entry_type': entry_type,
+        'delta': delta,
+        'balance_after': balance_after,
+        'period_start': period_start,
+        'reference': f'{entry_type}:{subscription.id}:{period_start.isoformat()}'
+    }
+
+
+def renew_batch(today, batch_size=RENEWAL_BATCH_SIZE):
+    """
+    Renew up to batch_size due subscriptions in the caller's transaction.
+
+    Returns:
+        Number of subscriptions renewed (0 when nothing unlocked is due)
+    """
+    due = db.session.query(
+        PackageSubscription.id, PackageSubscription.customer_id, PackageSubscription.coach_id,
+        PackageSubscription.start_date, PackageSubscription.credits_remaining,
+        Package.period_type, Package.credits_per_period, Package.is_unlimited
+    ).join(Package, Package.id == PackageSubscription.package_id).filter(
+        PackageSubscription.status == 'active',
+        PackageSubscription.auto_renew.is_(True),
+        PackageSubscription.next_renewal_date <= today,
+        or_(PackageSubscription.end_date.is_(None), PackageSubscription.end_date >= today)
+    ).order_by(
+        PackageSubscription.next_renewal_date, PackageSubscription.id
+    ).limit(batch_size).with_for_update(of=PackageSubscription, skip_locked=True).all()
+
+    updates = []
+    ledger = []
+    mirrored = {}  # customer_id -> change of session_credits
+    for subscription in due:
+        if subscription.period_type not in PERIODS:
+            # one_time packages never renew; stop them showing up as due
+            updates.append({'id': subscription.id, 'next_renewal_date': None, 'auto_renew': False})
+            continue
+
+        period_start, next_renewal = current_period(subscription.start_date, subscription.period_type, today)
+        allocation = UNLIMITED_CREDITS if subscription.is_unlimited else (subscription.credits_per_period or 0)
+        leftover = subscription.credits_remaining or 0
+        expired = 0 if subscription.is_unlimited else leftover
+
+        if expired:
+            ledger.append(_ledger_row(subscription, 'expiry', -expired, leftover - expired, period_start))
+        ledger.append(_ledger_row(subscription, 'renewal', allocation - (leftover - expired), allocation, period_start))
+        mirrored[subscription.customer_id] = mirrored.get(subscription.customer_id, 0) + allocation - leftover
+        updates.append({
+            'id': subscription.id,
+            'next_renewal_date': next_renewal,
+            'credits_allocated': allocation,
+            'credits_used': 0,
+            'credits_remaining': allocation
+        })
+
+    # Credits and dates only: no admin stat counter changes (see src/admin_stats.py)
+    if updates:
+        db.session.execute(update(PackageSubscription), updates)
+    if ledger:
+        db.session.execute(insert(CreditLedgerEntry.__table__), ledger)
+    adjust_session_credits(mirrored)
+    renewed_ids = [row['id'] for row in updates if 'credits_remaining' in row]
+    if renewed_ids:
+        confirm_pending_bookings(renewed_ids)
+    return len(due)
+
+
+def run_renewals(today=None, batch_size=RENEWAL_BATCH_SIZE, log=print):
+    """Renew every due subscription, committing per batch. Returns the number renewed."""
+    today = today or date.today()
+    renewed = 0
+    while True:
+        try:
+            count = renew_batch(today, batch_size)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        renewed += count
+        if count < batch_size:
+            break
+    log(f"   renewals: {renewed} subscriptions renewed for {today.isoformat()}")
+    return renewed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Renew due package subscriptions')
+    parser.add_argument('--date', help='Renew as of this date (YYYY-MM-DD, default today)')
+    args = parser.parse_args()
+
+    from src.main import app
+    with app.app_context():
+        as_of = date.fromisoformat(args.date) if args.date else None
+        run_renewals(as_of)
@@ -1,6 +1,15 @@
 from flask import Blueprint, request, jsonify
-from src.models.user import User, AuditLog, db
+from src.models.user import User, AuditLog, AuditLogArchive, db
+from src.models.job import BackgroundJob
 from src.routes.auth import admin_required
+from src.admin_stats import user_total, dashboard_stats
+from src.admin_bulk import (
+    ACCOUNT_STATUSES, BULK_FILTER_FIELDS, BULK_BACKGROUND_THRESHOLD,
+    bulk_status_targets, apply_status_change
+)
+from src.audit_writer import record_audit
+from src.background_jobs import start_job
+from src.pagination import keyset_page, page_size
 from datetime import datetime
 from sqlalchemy import or_
 
@@ -10,17 +19,21 @@ admin_bp = Blueprint('admin', __name__)
 @admin_required
 def get_all_users(current_user):
     """
-    Admin endpoint to get a list of all users with their profiles, supporting search and filter.
+    Admin endpoint to page through users with their profiles, supporting search and filter.
+    Query params:
+    - search: substring of email, phone, first or last name
+    - role / status: exact filters (served by the role/status/created_at index)
+    - limit: page size (default 50, max 200)
+    - cursor: next_cursor from the previous page
+    Users are returned newest first. `total` comes from maintained counters and is
+    null when a search term is given.
     """
     try:
         search_term = request.args.get('search', '').strip()
         role_filter = request.args.get('role', '').strip()
         status_filter = request.args.get('status', '').strip()
 
-        query = User.query.options(
-            db.joinedload(User.coach_profile),
-            db.joinedload(User.customer_profile)
-        )
+        query = User.query
 
         # Apply filters
         if role_filter:
@@ -29,16 +42,26 @@ def get_all_users(current_user):
         if status_filter:
             query = query.filter(User.account_status == status_filter)
 
-        # Apply search (case-insensitive on email, first_name, last_name)
+        # Apply search (case-insensitive on email, phone, first_name, last_name - trigram indexed on PostgreSQL)
         if search_term:
             search_pattern = f'%{search_term}%'
             query = query.filter(or_(
                 User.email.ilike(search_pattern),
+                User.phone.ilike(search_pattern),
                 User.first_name.ilike(search_pattern),
                 User.last_name.ilike(search_pattern)
             ))
 
-        users = query.all()
+        try:
+            users, next_cursor = keyset_page(
+                query,
+                [User.created_at, User.id],
+                cursor=request.args.get('cursor'),
+                limit=page_size(request.args),
+                descending=True
+            )
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
         
         user_list = []
         for user in users:
@@ -49,11 +72,30 @@ def get_all_users(current_user):
                 user_data['profile'] = user.customer_profile.to_dict()
             user_list.append(user_data)
             
-        print(f"✅ Successfully retrieved {len(user_list)} users.")
-        return jsonify(user_list), 200
+        return jsonify({
+            'users': user_list,
+            'total': None if search_term else user_total(role_filter, status_filter),
+            'next_cursor': next_cursor
+        }), 200
     except Exception as e:
         return jsonify({'message': f'Failed to retrieve users: {str(e)}'}), 500
 
+@admin_bp.route('/stats', methods=['GET'])
+@admin_required
+def get_admin_stats(current_user):
+    """
+    Admin KPIs read from maintained counters and daily rollups.
+    Query params:
+    - days: length of the signups/bookings series (default 30, max 365)
+    """
+    try:
+        days = max(1, min(int(request.args.get('days', 30)), 365))
+        return jsonify(dashboard_stats(days)), 200
+    except ValueError:
+        return jsonify({'message': 'days must be an integer'}), 400
+    except Exception as e:
+        return jsonify({'message': f'Failed to retrieve stats: {str(e)}'}), 500
+
 @admin_bp.route('/users/<user_id>/status', methods=['PUT'])
 @admin_required
 def update_user_status(current_user, user_id):
@@ -65,7 +107,7 @@ def update_user_status(current_user, user_id):
         new_status = data.get('status')
         status_reason = data.get('reason', '')
 
-        if not new_status or new_status not in ['active', 'inactive', 'suspended', 'deleted']:
+        if not new_status or new_status not in ACCOUNT_STATUSES:
             return jsonify({'message': 'Invalid status provided'}), 400
 
         user_to_update = User.query.get(user_id)
@@ -76,6 +118,8 @@ def update_user_status(current_user, user_id):
         if user_to_update.id == current_user.id and new_status in ['deleted', 'suspended']:
             return jsonify({'message': 'Cannot change your own status to deleted or suspended'}), 403
 
+        previous_status = user_to_update.account_status
+
         # Update status fields
         user_to_update.account_status = new_status
         user_to_update.status_changed_at = datetime.utcnow()
@@ -87,6 +131,11 @@ def update_user_status(current_user, user_id):
         elif user_to_update.deleted_at is not None:
             user_to_update.deleted_at = None # Un-delete if status is changed back
 
+        record_audit(current_user.id, 'user.status_changed', target_id=user_id, details={
+            'from': previous_status,
+            'to': new_status,
+            'reason': status_reason
+        })
         db.session.commit()
 
         return jsonify({'message': f'User {user_id} status updated to {new_status}'}), 200
@@ -94,6 +143,78 @@ def update_user_status(current_user, user_id):
         db.session.rollback()
         return jsonify({'message': f'Failed to update user status: {str(e)}'}), 500
 
+@admin_bp.route('/users/bulk-status', methods=['POST'])
+@admin_required
+def bulk_update_user_status(current_user):
+    """
+    Admin endpoint to change the status of many users at once.
+    Body:
+    - status: new account status
+    - reason: optional status reason
+    - user_ids: explicit list of user ids, and/or
+    - filter: {role, status, coach_id} - coach_id selects that coach's customers
+    - dry_run: true to only return how many users would change
+    Up to BULK_BACKGROUND_THRESHOLD users are changed inline (200); larger batches
+    run as a background job (202) whose progress is read from GET /admin/jobs/<id>.
+    """
+    try:
+        data = request.json or {}
+        new_status = data.get('status')
+        status_reason = data.get('reason', '')
+        user_ids = data.get('user_ids')
+        filters = data.get('filter') or {}
+
+        if not new_status or new_status not in ACCOUNT_STATUSES:
+            return jsonify({'message': 'Invalid status provided'}), 400
+
+        if user_ids is not None and not isinstance(user_ids, list):
+            return jsonify({'message': 'user_ids must be a list'}), 400
+
+        if not isinstance(filters, dict) or set(filters) - set(BULK_FILTER_FIELDS):
+            return jsonify({'message': f'filter supports only: {", ".join(BULK_FILTER_FIELDS)}'}), 400
+
+        # Never apply a status to every user by accident
+        if not user_ids and not any(filters.get(field) for field in BULK_FILTER_FIELDS):
+            return jsonify({'message': 'Provide user_ids or at least one filter'}), 400
+
+        target_ids = bulk_status_targets(current_user.id, new_status, user_ids=user_ids or None, filters=filters)
+
+        if data.get('dry_run'):
+            return jsonify({'matched': len(target_ids)}), 200
+
+        if len(target_ids) > BULK_BACKGROUND_THRESHOLD:
+            job = start_job(
+                'user.bulk_status', current_user.id, len(target_ids),
+                apply_status_change, current_user.id, new_status, status_reason, target_ids
+            )
+            return jsonify({
+                'message': f'Updating {len(target_ids)} users in the background',
+                'job': job.to_dict()
+            }), 202
+
+        result = apply_status_change(current_user.id, new_status, status_reason, target_ids)
+        return jsonify({
+            'message': f'{result["updated"]} users updated to {new_status}',
+            **result
+        }), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': f'Failed to update user statuses: {str(e)}'}), 500
+
+@admin_bp.route('/jobs/<job_id>', methods=['GET'])
+@admin_required
+def get_admin_job(current_user, job_id):
+    """
+    Admin endpoint to poll the progress of a background job.
+    """
+    try:
+        job = BackgroundJob.query.get(job_id)
+        if not job:
+            return jsonify({'message': 'Job not found'}), 404
+        return jsonify(job.to_dict()), 200
+    except Exception as e:
+        return jsonify({'message': f'Failed to retrieve job: {str(e)}'}), 500
+
 @admin_bp.route('/users/<user_id>/reset-password', methods=['POST'])
 @admin_required
 def admin_reset_password(current_user, user_id):
@@ -130,15 +251,42 @@ def admin_reset_password(current_user, user_id):
 @admin_required
 def get_audit_log(current_user):
     """
-    Admin endpoint to get a list of all audit log entries.
+    Admin endpoint to page through audit log entries, newest first.
+    Query params:
+    - actor_id / action / target_id: exact filters (each backed by an index)
+    - since / until: ISO timestamps bounding the window
+    - archived: 1 to read entries moved to audit_log_archive
+    - limit: page size (default 50, max 200)
+    - cursor: next_cursor from the previous page
     """
     try:
-        # Fetch all audit logs, ordered by timestamp descending
-        logs = AuditLog.query.order_by(AuditLog.timestamp.desc()).all()
-        
-        log_list = [log.to_dict() for log in logs]
+        model = AuditLogArchive if request.args.get('archived') in ('1', 'true') else AuditLog
+        query = model.query
+
+        for field in ('actor_id', 'action', 'target_id'):
+            value = request.args.get(field, '').strip()
+            if value:
+                query = query.filter(getattr(model, field) == value)
+
+        try:
+            if request.args.get('since'):
+                query = query.filter(model.timestamp >= datetime.fromisoformat(request.args['since'].replace('Z', '+00:00')))
+            if request.args.get('until'):
+                query = query.filter(model.timestamp < datetime.fromisoformat(request.args['until'].replace('Z', '+00:00')))
+
+            logs, next_cursor = keyset_page(
+                query,
+                [model.timestamp, model.id],
+                cursor=request.args.get('cursor'),
+                limit=page_size(request.args),
+                descending=True
+            )
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
         
-        print(f"✅ Successfully retrieved {len(log_list)} audit log entries.")
-        return jsonify(log_list), 200
+        return jsonify({
+            'entries': [log.to_dict() for log in logs],
+            'next_cursor': next_cursor
+        }), 200
     except Exception as e:
-        return jsonify({'message': f'Failed to retrieve audit log: {str(e)}'}), 500
\ No newline at end of file
+        return jsonify({'message': f'Failed to retrieve audit log: {str(e)}'}), 500
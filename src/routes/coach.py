@@ -1,6 +1,12 @@
 from flask import Blueprint, request, jsonify
 from src.models.user import User, CoachProfile, CustomerProfile, TrainingPlan, Exercise, Booking, db
 from src.routes.auth import token_required
+from src.audit_writer import record_audit
+from src.plan_assignments import set_assigned_customers
+from src.plan_documents import bump_plan_version, invalidate_plan
+from src.pagination import keyset_page, page_size
+from src.adherence import coach_adherence, invalidate_coach, DEFAULT_WINDOW_DAYS, MAX_WINDOW_DAYS
+from src.pending_bookings import confirm_pending_with_session_credits
 from functools import wraps
 import uuid
 import jwt
@@ -243,6 +249,8 @@ def update_customer_credits(current_user, customer_id):
         if not customer:
             return jsonify({'message': 'Customer not found'}), 404
         
+        previous_credits = customer.session_credits
+        
         if 'credits' in data:
             # Add credits to existing balance
             customer.session_credits += int(data['credits'])
@@ -250,10 +258,22 @@ def update_customer_credits(current_user, customer_id):
             # Set absolute credit amount
             customer.session_credits = int(data['session_credits'])
         
+        if customer.session_credits != previous_credits:
+            record_audit(current_user.id, 'customer.credits_changed', target_id=customer.id, details={
+                'from': previous_credits,
+                'to': customer.session_credits
+            })
+        
+        converted_count = 0
+        if customer.session_credits > previous_credits:
+            db.session.flush()
+            converted_count = confirm_pending_with_session_credits(customer.id)
+        
         db.session.commit()
         
         customer_data = customer.to_dict()
         customer_data['user'] = customer.user.to_dict()
+        customer_data['converted_bookings'] = converted_count
         
         return jsonify(customer_data), 200
         
@@ -265,11 +285,45 @@ def update_customer_credits(current_user, customer_id):
 @token_required
 @coach_required
 def get_training_plans(current_user):
+    """
+    Query params:
+    - status: draft / upcoming / active / expired (filtered in SQL)
+    - sort: created (newest first, default) or status (active, upcoming, draft, expired)
+    - limit / cursor: page through plans; the response is then
+      {plans, next_cursor, counts} instead of a plain list
+    """
     try:
-        # Get all training plans created by this coach
-        training_plans = TrainingPlan.query.filter_by(
+        status_filter = request.args.get('status')
+        sort = request.args.get('sort', 'created')
+
+        # Get training plans created by this coach
+        query = TrainingPlan.query.filter_by(
             coach_id=current_user.coach_profile.id
-        ).all()
+        )
+        if status_filter:
+            if status_filter not in TrainingPlan.STATUSES:
+                return jsonify({'message': f'status must be one of: {", ".join(TrainingPlan.STATUSES)}'}), 400
+            query = query.filter(TrainingPlan.status_is(status_filter))
+
+        if sort == 'status':
+            columns = [TrainingPlan.status_rank(), TrainingPlan.created_at, TrainingPlan.id]
+            key = lambda plan: [len(TrainingPlan.STATUSES) - TrainingPlan.STATUSES.index(plan.status), plan.created_at, plan.id]
+        else:
+            columns = [TrainingPlan.created_at, TrainingPlan.id]
+            key = None
+
+        paged = 'limit' in request.args or 'cursor' in request.args
+        next_cursor = None
+        if paged:
+            try:
+                training_plans, next_cursor = keyset_page(
+                    query, columns, cursor=request.args.get('cursor'),
+                    limit=page_size(request.args), descending=True, key=key
+                )
+            except ValueError as e:
+                return jsonify({'message': str(e)}), 400
+        else:
+            training_plans = query.order_by(*[column.desc() for column in columns]).all()
         
         plans_data = []
         for plan in training_plans:
@@ -277,8 +331,22 @@ def get_training_plans(current_user):
             # Count assigned customers
             plan_data['assigned_customers'] = len(plan.assigned_customer_ids) if plan.assigned_customer_ids else 0
             plans_data.append(plan_data)
-        
-        return jsonify(plans_data), 200
+
+        if not paged:
+            return jsonify(plans_data), 200
+
+        status_column = TrainingPlan.status.label('status')
+        counts = dict(
+            db.session.query(status_column, db.func.count(TrainingPlan.id))
+            .filter(TrainingPlan.coach_id == current_user.coach_profile.id)
+            .group_by(status_column)
+            .all()
+        )
+        return jsonify({
+            'plans': plans_data,
+            'next_cursor': next_cursor,
+            'counts': {status: counts.get(status, 0) for status in TrainingPlan.STATUSES}
+        }), 200
     except Exception as e:
         return jsonify({'message': f'Failed to get training plans: {str(e)}'}), 500
 
@@ -304,11 +372,13 @@ def create_training_plan(current_user):
             duration_weeks=data.get('duration_weeks', 4),
             is_active=data.get('is_active', True),
             exercises=data.get('exercises', []),
-            assigned_customer_ids=data.get('assigned_customer_ids', [])
+            assigned_customer_ids=[]
         )
         
         db.session.add(training_plan)
+        set_assigned_customers(training_plan, data.get('assigned_customer_ids', []))
         db.session.commit()
+        invalidate_coach(training_plan.coach_id)
         
         return jsonify({
             'message': 'Training plan created successfully',
@@ -347,9 +417,11 @@ def update_training_plan(current_user, plan_id):
         if 'exercises' in data:
             training_plan.exercises = data['exercises']
         if 'assigned_customer_ids' in data:
-            training_plan.assigned_customer_ids = data['assigned_customer_ids']
+            set_assigned_customers(training_plan, data['assigned_customer_ids'])
         
+        bump_plan_version(training_plan)
         db.session.commit()
+        invalidate_coach(training_plan.coach_id)
         
         return jsonify({
             'message': 'Training plan updated successfully',
@@ -375,6 +447,8 @@ def delete_training_plan(current_user, plan_id):
         
         db.session.delete(training_plan)
         db.session.commit()
+        invalidate_plan(plan_id)
+        invalidate_coach(current_user.coach_profile.id)
         
         return jsonify({'message': 'Training plan deleted successfully'}), 200
         
@@ -382,6 +456,22 @@ def delete_training_plan(current_user, plan_id):
         db.session.rollback()
         return jsonify({'message': f'Failed to delete training plan: {str(e)}'}), 500
 # ✅ NEW: Generate invitation link for customer
+@coach_bp.route('/adherence', methods=['GET'])
+@token_required
+@coach_required
+def get_adherence(current_user):
+    """
+    Scheduled plan days versus logged workouts for all of the coach's customers.
+    Query: days (window ending today, default 28)
+    """
+    try:
+        if not current_user.coach_profile:
+            return jsonify({'message': 'Coach profile not found'}), 404
+        days = min(max(request.args.get('days', DEFAULT_WINDOW_DAYS, type=int), 1), MAX_WINDOW_DAYS)
+        return jsonify(coach_adherence(current_user.coach_profile.id, days)), 200
+    except Exception as e:
+        return jsonify({'message': f'Failed to compute adherence: {str(e)}'}), 500
+
 @coach_bp.route('/customers/<customer_id>/generate-invite', methods=['POST'])
 @token_required
 @coach_required
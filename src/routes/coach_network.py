@@ -1,61 +1,118 @@
 from flask import Blueprint, request, jsonify, current_app
 from src.models.user import db, CoachProfile, User
 from src.routes.auth import token_required
+from src.pagination import keyset_page, page_size
+from src.ttl_cache import TTLCache
 
 coach_network_bp = Blueprint('coach_network', __name__)
 
+# Typeahead fires on every keystroke and most users type the same few prefixes,
+# so ranked results are shared across requests for a short time
+coach_search_cache = TTLCache(maxsize=512, ttl=30)
+
+# Kept in sync with the expression indexes in migrations/add_coach_search_indexes.sql
+FULL_NAME = db.func.lower(User.first_name + db.literal_column("' '") + User.last_name)
+
+_trigram_available = None
+
+
+def trigram_available():
+    """True on PostgreSQL with the pg_trgm extension installed (checked once per process)"""
+    global _trigram_available
+    if _trigram_available is None:
+        _trigram_available = db.engine.dialect.name == 'postgresql' and db.session.execute(
+            db.text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        ).first() is not None
+    return _trigram_available
+
+
+def _coach_summary(coach_profile, user):
+    return {
+        'id': coach_profile.id,
+        'user_id': user.id,
+        'email': user.email,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'full_name': f'{user.first_name} {user.last_name}',
+        'profile_picture': getattr(user, 'profile_picture', None)
+    }
+
+
+def _ranked_coach_search(term, limit):
+    """
+    Active coaches whose full name, first name, last name or email starts with term,
+    best match first. On PostgreSQL, names within trigram distance also match.
+    """
+    query = db.session.query(CoachProfile, User).join(
+        User, CoachProfile.user_id == User.id
+    ).filter(
+        User.role == 'coach',
+        User.account_status == 'active'
+    )
+
+    if not term:
+        results = query.order_by(User.first_name, User.last_name, User.id).limit(limit).all()
+    else:
+        escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        prefix = f'{escaped}%'
+        first_name = db.func.lower(User.first_name)
+        last_name = db.func.lower(User.last_name)
+        email = db.func.lower(User.email)
+
+        prefix_match = db.or_(
+            FULL_NAME.like(prefix, escape='\\'),
+            first_name.like(prefix, escape='\\'),
+            last_name.like(prefix, escape='\\'),
+            email.like(prefix, escape='\\')
+        )
+        rank = db.case(
+            (FULL_NAME.like(prefix, escape='\\'), 0),
+            (first_name.like(prefix, escape='\\'), 1),
+            (last_name.like(prefix, escape='\\'), 2),
+            (email.like(prefix, escape='\\'), 3),
+            else_=4
+        )
+
+        if trigram_available():
+            query = query.filter(db.or_(prefix_match, FULL_NAME.op('%')(term)))
+            ordering = [rank, db.func.similarity(FULL_NAME, term).desc()]
+        else:
+            query = query.filter(prefix_match)
+            ordering = [rank]
+
+        results = query.order_by(*ordering, User.first_name, User.last_name, User.id).limit(limit).all()
+
+    coaches = []
+    for coach_profile, user in results:
+        coach = _coach_summary(coach_profile, user)
+        coach['specialty'] = getattr(coach_profile, 'specialty', None)
+        coach['bio'] = getattr(coach_profile, 'bio', None)
+        coaches.append(coach)
+    return coaches
+
+
 @coach_network_bp.route('/coach/search', methods=['GET'])
 @token_required
 def search_coaches(current_user):
     """
-    Search for coaches in the system
+    Search for coaches in the system (prefix typeahead, ranked)
     Query params:
-    - q: search query (name or email)
+    - q: search query (start of name, full name or email)
     - limit: max results (default 20)
     """
     try:
         if current_user.role != 'coach':
             return jsonify({'error': 'Only coaches can search for other coaches'}), 403
         
-        search_query = request.args.get('q', '').strip()
+        search_query = request.args.get('q', '').strip().lower()
         limit = min(int(request.args.get('limit', 20)), 50)
         
-        # Build query
-        query = db.session.query(CoachProfile, User).join(
-            User, CoachProfile.user_id == User.id
-        ).filter(
-            User.account_status == 'active',
-            User.id != current_user.id  # Exclude self
+        # Fetch one extra so dropping the caller still leaves a full page
+        cached = coach_search_cache.get_or_set(
+            (search_query, limit + 1),
+            lambda: _ranked_coach_search(search_query, limit + 1)
         )
-        
-        # Apply search filter
-        if search_query:
-            search_pattern = f'%{search_query}%'
-            query = query.filter(
-                db.or_(
-                    User.first_name.ilike(search_pattern),
-                    User.last_name.ilike(search_pattern),
-                    User.email.ilike(search_pattern)
-                )
-            )
-        
-        # Execute query
-        results = query.limit(limit).all()
-        
-        # Format response
-        coaches = []
-        for coach_profile, user in results:
-            coaches.append({
-                'id': coach_profile.id,
-                'user_id': user.id,
-                'email': user.email,
-                'first_name': user.first_name,
-                'last_name': user.last_name,
-                'full_name': f'{user.first_name} {user.last_name}',
-                'profile_picture': getattr(user, 'profile_picture', None),
-                'specialty': getattr(coach_profile, 'specialty', None),
-                'bio': getattr(coach_profile, 'bio', None)
-            })
+        coaches = [coach for coach in cached if coach['user_id'] != current_user.id][:limit]
         
         return jsonify({
             'coaches': coaches,
@@ -70,35 +127,40 @@ def search_coaches(current_user):
 @token_required
 def list_all_coaches(current_user):
     """
-    Get list of all active coaches (for dropdown)
+    Get a page of active coaches (for dropdown), ordered by name
+    Query params:
+    - limit: page size (default 50, max 100)
+    - cursor: next_cursor from the previous page
     """
     try:
         if current_user.role != 'coach':
             return jsonify({'error': 'Only coaches can access this endpoint'}), 403
         
-        # Get all active coaches except current user
-        results = db.session.query(CoachProfile, User).join(
+        query = db.session.query(CoachProfile, User).join(
             User, CoachProfile.user_id == User.id
         ).filter(
+            User.role == 'coach',
             User.account_status == 'active',
             User.id != current_user.id
-        ).order_by(User.first_name, User.last_name).all()
+        )
+        
+        try:
+            results, next_cursor = keyset_page(
+                query,
+                [User.first_name, User.last_name, User.id],
+                cursor=request.args.get('cursor'),
+                limit=page_size(request.args, default=50, maximum=100),
+                key=lambda row: [row[1].first_name, row[1].last_name, row[1].id]
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        coaches = []
-        for coach_profile, user in results:
-            coaches.append({
-                'id': coach_profile.id,
-                'user_id': user.id,
-                'email': user.email,
-                'first_name': user.first_name,
-                'last_name': user.last_name,
-                'full_name': f'{user.first_name} {user.last_name}',
-                'profile_picture': getattr(user, 'profile_picture', None)
-            })
+        coaches = [_coach_summary(coach_profile, user) for coach_profile, user in results]
         
         return jsonify({
             'coaches': coaches,
-            'count': len(coaches)
+            'count': len(coaches),
+            'next_cursor': next_cursor
         }), 200
         
     except Exception as e:
@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify
 from src.models.user import db
 from src.models.exercise_template import ExerciseTemplate
+from src.exercise_catalog import exercise_catalog
+from src.exercise_search import search_available, search_exercise_templates
 from functools import wraps
 import jwt
 import os
@@ -39,43 +41,85 @@ def coach_required(f):
     return decorated
 
 
+def catalog_scope(current_user_id, current_user_role):
+    """
+    Coach profile ID whose custom exercises the caller may see.
+    Coaches see their own, customers see their coach's, anyone else sees every custom exercise.
+    """
+    from src.models.user import CoachProfile, CustomerProfile
+    if current_user_role == 'coach':
+        return db.session.query(CoachProfile.id).filter_by(user_id=current_user_id).scalar()
+    if current_user_role == 'customer':
+        return db.session.query(CustomerProfile.coach_id).filter_by(user_id=current_user_id).scalar()
+    return None
+
+
 @exercise_template_bp.route('/exercise-templates', methods=['GET'])
 @token_required
 def get_exercise_templates(current_user_id, current_user_role):
     """
-    Get all exercise templates with optional filtering
+    Get all exercise templates with optional filtering (served from the in-memory catalog)
     Query params:
     - muscle_group: Filter by muscle group (Chest, Back, Legs, etc.)
     - category: Filter by category (Barbell, Dumbbell, Bodyweight, etc.)
     - difficulty: Filter by difficulty (beginner, intermediate, advanced)
-    - search: Search by name
+    - equipment: Filter by a single piece of equipment (Bench, Cable, etc.)
+    - search: Ranked search over name, equipment, muscle group and instructions
     """
     try:
-        query = ExerciseTemplate.query.filter_by(is_active=True)
+        search = request.args.get('search', '').strip()
+        ranked_ids = None
+        if search and search_available():
+            ranked_ids = search_exercise_templates(search, limit=200)
+            search = None  # Backend already matched; fall back to name substring otherwise
         
-        # Apply filters
-        muscle_group = request.args.get('muscle_group')
-        if muscle_group:
-            query = query.filter_by(muscle_group=muscle_group)
-        
-        category = request.args.get('category')
-        if category:
-            query = query.filter_by(category=category)
+        exercises = exercise_catalog.filter(
+            coach_id=catalog_scope(current_user_id, current_user_role),
+            muscle_group=request.args.get('muscle_group'),
+            category=request.args.get('category'),
+            difficulty=request.args.get('difficulty'),
+            equipment=request.args.get('equipment'),
+            search=search,
+            ranked_ids=ranked_ids
+        )
         
-        difficulty = request.args.get('difficulty')
-        if difficulty:
-            query = query.filter_by(difficulty=difficulty)
+        return jsonify({
+            'exercises': exercises,
+            'count': len(exercises),
+            'version': exercise_catalog.version
+        }), 200
         
-        search = request.args.get('search')
-        if search:
-            query = query.filter(ExerciseTemplate.name.ilike(f'%{search}%'))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@exercise_template_bp.route('/exercise-templates/suggest', methods=['GET'])
+@token_required
+def suggest_exercise_templates(current_user_id, current_user_role):
+    """
+    Typeahead suggestions (prefix match on every word)
+    Query params:
+    - q: partial input, e.g. "inc ben"
+    - limit: max results (default 10, max 25)
+    """
+    try:
+        query = request.args.get('q', '').strip()
+        limit = min(int(request.args.get('limit', 10)), 25)
+        if not query:
+            return jsonify({'suggestions': []}), 200
         
-        # Order by muscle group and name
-        exercises = query.order_by(ExerciseTemplate.muscle_group, ExerciseTemplate.name).all()
+        coach_id = catalog_scope(current_user_id, current_user_role)
+        if search_available():
+            # Over-fetch: other coaches' custom exercises are dropped by the catalog scope
+            exercises = exercise_catalog.filter(coach_id=coach_id, ranked_ids=search_exercise_templates(query, limit=limit * 4))
+        else:
+            exercises = exercise_catalog.filter(coach_id=coach_id, search=query)
         
         return jsonify({
-            'exercises': [exercise.to_dict() for exercise in exercises],
-            'count': len(exercises)
+            'suggestions': [
+                {'id': ex['id'], 'name': ex['name'], 'muscle_group': ex['muscle_group'], 'category': ex['category']}
+                for ex in exercises[:limit]
+            ]
         }), 200
         
     except Exception as e:
@@ -137,6 +181,7 @@ def create_exercise_template(current_user_id, current_user_role):
         
         db.session.add(exercise)
         db.session.commit()
+        exercise_catalog.invalidate()
         
         return jsonify({
             'message': 'Exercise template created successfully',
@@ -203,6 +248,7 @@ def update_exercise_template(exercise_id, current_user_id, current_user_role):
             exercise.is_active = data['is_active']
         
         db.session.commit()
+        exercise_catalog.invalidate()
         
         return jsonify({
             'message': 'Exercise template updated successfully',
@@ -237,6 +283,7 @@ def delete_exercise_template(exercise_id, current_user_id, current_user_role):
         # Soft delete by setting is_active to False
         exercise.is_active = False
         db.session.commit()
+        exercise_catalog.invalidate()
         
         return jsonify({'message': 'Exercise template deleted successfully'}), 200
         
@@ -248,28 +295,22 @@ def delete_exercise_template(exercise_id, current_user_id, current_user_role):
 @exercise_template_bp.route('/exercise-templates/categories', methods=['GET'])
 @token_required
 def get_categories(current_user_id, current_user_role):
-    """Get available categories and muscle groups"""
-    return jsonify({
-        'muscle_groups': [
-            'Chest',
-            'Back',
-            'Legs',
-            'Shoulders',
-            'Arms',
-            'Core',
-            'Cardio'
-        ],
-        'categories': [
-            'Barbell',
-            'Dumbbell',
-            'Bodyweight',
-            'Machine',
-            'Cable',
-            'Other'
-        ],
-        'difficulties': [
-            'beginner',
-            'intermediate',
-            'advanced'
-        ]
-    }), 200
+    """Get available categories and muscle groups, with per-value counts from the catalog"""
+    try:
+        counts = exercise_catalog.facet_counts(catalog_scope(current_user_id, current_user_role))
+        
+        def with_extra(defaults, facet):
+            # Keep the canonical ordering, then append any values only found in the data
+            return defaults + sorted(value for value in counts[facet] if value not in defaults)
+        
+        return jsonify({
+            'muscle_groups': with_extra(['Chest', 'Back', 'Legs', 'Shoulders', 'Arms', 'Core', 'Cardio'], 'muscle_group'),
+            'categories': with_extra(['Barbell', 'Dumbbell', 'Bodyweight', 'Machine', 'Cable', 'Other'], 'category'),
+            'difficulties': with_extra(['beginner', 'intermediate', 'advanced'], 'difficulty'),
+            'equipment': sorted(counts['equipment']),
+            'counts': counts,
+            'version': exercise_catalog.version
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
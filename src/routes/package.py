@@ -1,10 +1,14 @@
-from flask import Blueprint, request, jsonify
-from src.models.user import db, CoachProfile, CustomerProfile, Package, PackageSubscription, RecurringSchedule, Booking
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from src.models.user import db, CoachProfile, CustomerProfile, Package, PackageSubscription, RecurringSchedule
 from src.routes.auth import token_required
 from functools import wraps
 import uuid
 from datetime import datetime, timedelta, date, time
 from dateutil.relativedelta import relativedelta
+from src.models.credit_ledger import CreditLedgerEntry
+from src.auto_booking import book_schedules, run_auto_booking
+from src.pending_bookings import confirm_pending_bookings
+from src.usage_export import EXPORT_FORMATS, PERIOD_STARTS, default_range, export_chunks, export_filename
 
 package_bp = Blueprint('package', __name__)
 
@@ -273,15 +277,30 @@ def create_subscription(current_user):
         )
         
         db.session.add(subscription)
+        db.session.flush()
+        db.session.add(CreditLedgerEntry(
+            subscription_id=subscription.id,
+            customer_id=customer.id,
+            coach_id=coach_profile.id,
+            entry_type='allocation',
+            delta=subscription.credits_remaining,
+            balance_after=subscription.credits_remaining,
+            period_start=start_date,
+            reference=f'allocation:{subscription.id}:{start_date.isoformat()}'
+        ))
         
         # Also update customer's session_credits (for backward compatibility)
         customer.session_credits += package.credits_per_period if not package.is_unlimited else 999999
         
+        # Spend the new credits on sessions that were waiting for them
+        converted_count = confirm_pending_bookings([subscription.id]).get(subscription.id, 0)
+        
         db.session.commit()
         
         return jsonify({
             'message': 'Subscription created successfully',
-            'subscription': subscription.to_dict()
+            'subscription': subscription.to_dict(),
+            'converted_bookings': converted_count
         }), 201
         
     except Exception as e:
@@ -309,6 +328,60 @@ def get_subscriptions(current_user):
         return jsonify({'message': f'Failed to get subscriptions: {str(e)}'}), 500
 
 
+@package_bp.route('/usage-export', methods=['GET'])
+@token_required
+@coach_required
+def export_usage(current_user):
+    """
+    Stream the coach's usage and billing report (see src/usage_export.py)
+
+    Query params:
+    - format: csv (default) or ndjson
+    - period: month (default) or week
+    - from / to: YYYY-MM-DD, inclusive (default: the last twelve months)
+    - gzip: 1 to download the file gzip-compressed
+    """
+    try:
+        coach_profile = current_user.coach_profile
+        if not coach_profile:
+            return jsonify({'message': 'Coach profile not found'}), 404
+        
+        fmt = request.args.get('format', 'csv')
+        period = request.args.get('period', 'month')
+        if fmt not in EXPORT_FORMATS:
+            return jsonify({'message': f'format must be one of: {", ".join(EXPORT_FORMATS)}'}), 400
+        if period not in PERIOD_STARTS:
+            return jsonify({'message': f'period must be one of: {", ".join(PERIOD_STARTS)}'}), 400
+        
+        first_day, last_day = default_range()
+        try:
+            if request.args.get('from'):
+                first_day = datetime.strptime(request.args['from'], '%Y-%m-%d').date()
+            if request.args.get('to'):
+                last_day = datetime.strptime(request.args['to'], '%Y-%m-%d').date() + timedelta(days=1)
+        except ValueError:
+            return jsonify({'message': 'Invalid date format. Use YYYY-MM-DD'}), 400
+        if first_day >= last_day:
+            return jsonify({'message': 'from must not be after to'}), 400
+        
+        compress = request.args.get('gzip', '').lower() in ('1', 'true', 'yes')
+        if compress:
+            mimetype = 'application/gzip'
+        else:
+            mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+        
+        return Response(
+            stream_with_context(export_chunks(coach_profile.id, first_day, last_day, period, fmt, compress)),
+            mimetype=mimetype,
+            headers={
+                'Content-Disposition': f'attachment; filename="{export_filename(first_day, last_day, fmt, compress)}"'
+            }
+        )
+        
+    except Exception as e:
+        return jsonify({'message': f'Failed to export usage: {str(e)}'}), 500
+
+
 @package_bp.route('/subscriptions/customer/<customer_id>', methods=['GET'])
 @token_required
 @coach_required
@@ -417,9 +490,10 @@ def create_recurring_schedule(current_user):
         db.session.add(schedule)
         db.session.commit()
         
-        # Trigger auto-booking if enabled
+        # Book the first weeks right away if enabled
         if schedule.auto_book_enabled:
-            create_bookings_from_schedule(schedule)
+            book_schedules([schedule.id])
+            db.session.commit()
         
         return jsonify({
             'message': 'Recurring schedule created successfully',
@@ -480,98 +554,24 @@ def delete_recurring_schedule(current_user, schedule_id):
 
 
 # ============================================================================
-# AUTO-BOOKING LOGIC
+# AUTO-BOOKING (batch logic in src/auto_booking.py)
 # ============================================================================
 
-def create_bookings_from_schedule(schedule):
-    """Create bookings from a recurring schedule"""
-    try:
-        subscription = schedule.subscription
-        
-        # Calculate how many weeks ahead to book
-        weeks_ahead = schedule.book_weeks_ahead
-        today = date.today()
-        end_date = today + timedelta(weeks=weeks_ahead)
-        
-        # Find the next occurrence of the day_of_week
-        days_ahead = schedule.day_of_week - today.weekday()
-        if days_ahead < 0:  # Target day already happened this week
-            days_ahead += 7
-        
-        current_date = today + timedelta(days=days_ahead)
-        
-        # Create bookings for each week
-        while current_date <= end_date:
-            # Check if booking already exists
-            start_datetime = datetime.combine(current_date, schedule.start_time)
-            end_datetime = datetime.combine(current_date, schedule.end_time)
-            
-            existing_booking = Booking.query.filter_by(
-                customer_id=schedule.customer_id,
-                coach_id=schedule.coach_id,
-                start_time=start_datetime
-            ).first()
-            
-            if not existing_booking:
-                # Determine status based on available credits
-                if subscription.credits_remaining > 0 or subscription.package.is_unlimited:
-                    status = 'confirmed'
-                else:
-                    status = 'pending'
-                
-                # Create booking
-                booking = Booking(
-                    id=str(uuid.uuid4()),
-                    customer_id=schedule.customer_id,
-                    coach_id=schedule.coach_id,
-                    start_time=start_datetime,
-                    end_time=end_datetime,
-                    status=status,
-                    event_type='customer_session',
-                    package_subscription_id=subscription.id,
-                    recurring_schedule_id=schedule.id
-                )
-                
-                db.session.add(booking)
-                
-                # Deduct credit if confirmed
-                if status == 'confirmed' and not subscription.package.is_unlimited:
-                    subscription.credits_used += 1
-                    subscription.credits_remaining -= 1
-            
-            # Move to next week
-            current_date += timedelta(weeks=1)
-        
-        db.session.commit()
-        
-    except Exception as e:
-        db.session.rollback()
-        print(f"Error creating bookings from schedule: {str(e)}")
-
-
 @package_bp.route('/auto-book', methods=['POST'])
 @token_required
 @coach_required
 def trigger_auto_booking(current_user):
-    """Manually trigger auto-booking for all active recurring schedules"""
+    """Run auto-booking now for the coach's due recurring schedules"""
     try:
         coach_profile = current_user.coach_profile
         if not coach_profile:
             return jsonify({'message': 'Coach profile not found'}), 404
         
-        schedules = RecurringSchedule.query.filter_by(
-            coach_id=coach_profile.id,
-            is_active=True,
-            auto_book_enabled=True
-        ).all()
-        
-        bookings_created = 0
-        for schedule in schedules:
-            create_bookings_from_schedule(schedule)
-            bookings_created += 1
+        result = run_auto_booking(coach_id=coach_profile.id)
         
         return jsonify({
-            'message': f'Auto-booking triggered for {bookings_created} schedules'
+            'message': f'Auto-booking processed {result["schedules"]} schedules',
+            **result
         }), 200
         
     except Exception as e:
@@ -608,26 +608,8 @@ def convert_pending_bookings(current_user):
         if not subscription:
             return jsonify({'message': 'No active subscription found'}), 404
         
-        # Get pending bookings (both 'pending' and 'pending_credits')
-        pending_bookings = Booking.query.filter(
-            Booking.customer_id == customer_id,
-            Booking.coach_id == coach_profile.id,
-            Booking.status.in_(['pending', 'pending_credits'])
-        ).order_by(Booking.start_time).all()
-        
-        converted_count = 0
-        for booking in pending_bookings:
-            if subscription.credits_remaining > 0 or subscription.package.is_unlimited:
-                booking.status = 'confirmed'
-                booking.subscription_id = subscription.id  # Link to subscription
-                
-                if not subscription.package.is_unlimited:
-                    subscription.credits_used += 1
-                    subscription.credits_remaining -= 1
-                
-                converted_count += 1
-            else:
-                break  # No more credits available
+        # Confirm pending bookings (both 'pending' and 'pending_credits'), earliest first, while credits last
+        converted_count = confirm_pending_bookings([subscription.id]).get(subscription.id, 0)
         
         db.session.commit()
         
@@ -1,9 +1,22 @@
 from flask import Blueprint, request, jsonify
-from src.models.user import db, TrainingPlan, Exercise, CustomerProfile
-from src.models.workout_completion import WorkoutCompletion, ExerciseCompletion
+from src.models.user import db, TrainingPlan, PlanAssignment, Exercise, CustomerProfile
+from src.plan_assignments import assign_customer, unassign_customer, customer_plans_query
+from src.plan_documents import bump_plan_version, invalidate_plan, plan_exercises, plan_documents
+from src.plan_clones import clone_plan, clone_targets, CLONE_PLAN_FIELDS, CLONE_BACKGROUND_THRESHOLD
+from src.models.job import BackgroundJob
+from src.background_jobs import start_job
+from src.models.workout_completion import WorkoutCompletion, ExerciseCompletion, ExerciseSet
+from src.workout_sets import parse_sets
+from src.adherence import invalidate_coach
+from src.progress import record_completions, progress_summary, progress_series, DEFAULT_SERIES_WEEKS
+from src.workout_logging import log_workout, load_workout, workout_detail_options, WorkoutLogError
+from src.pagination import keyset_page, page_size
 from src.routes.auth import token_required
 from functools import wraps
 from datetime import datetime, date
+from sqlalchemy import insert, update, delete
+from sqlalchemy.orm import joinedload, selectinload
+import uuid
 
 # Coach-specific decorator
 def coach_required(f):
@@ -36,14 +49,16 @@ def get_coach_training_plans(current_user):
         if not current_user.coach_profile:
             return jsonify({'message': 'Coach profile not found'}), 404
         
-        # Get all plans for the coach
-        plans = TrainingPlan.query.filter_by(coach_id=current_user.coach_profile.id).all()
+        # Get plans for the coach, applying the status filter in SQL if provided
+        query = TrainingPlan.query.filter_by(coach_id=current_user.coach_profile.id)
         
-        # Apply status filter if provided
         status_filter = request.args.get('status')
         if status_filter:
-            plans = [plan for plan in plans if plan.status == status_filter]
+            if status_filter not in TrainingPlan.STATUSES:
+                return jsonify({'message': f'status must be one of: {", ".join(TrainingPlan.STATUSES)}'}), 400
+            query = query.filter(TrainingPlan.status_is(status_filter))
         
+        plans = query.order_by(TrainingPlan.created_at.desc()).all()
         return jsonify([plan.to_dict() for plan in plans]), 200
     except Exception as e:
         import traceback
@@ -117,9 +132,10 @@ def update_training_plan(current_user, plan_id):
         if 'end_date' in data:
             plan.end_date = datetime.strptime(data['end_date'], '%Y-%m-%d').date() if data['end_date'] else None
         
-        plan.updated_at = datetime.utcnow()
+        bump_plan_version(plan)
         
         db.session.commit()
+        invalidate_coach(plan.coach_id)
         return jsonify(plan.to_dict()), 200
     except Exception as e:
         db.session.rollback()
@@ -141,6 +157,8 @@ def delete_training_plan(current_user, plan_id):
         
         db.session.delete(plan)
         db.session.commit()
+        invalidate_plan(plan_id)
+        invalidate_coach(current_user.coach_profile.id)
         return jsonify({'message': 'Training plan deleted successfully'}), 200
     except Exception as e:
         db.session.rollback()
@@ -157,8 +175,7 @@ def get_plan_exercises(current_user, plan_id):
         if not plan:
             return jsonify({'message': 'Training plan not found'}), 404
         
-        exercises = Exercise.query.filter_by(training_plan_id=plan_id).order_by(Exercise.day_number, Exercise.order).all()
-        return jsonify([ex.to_dict() for ex in exercises]), 200
+        return jsonify(plan_exercises([plan])[plan.id]), 200
     except Exception as e:
         return jsonify({'message': f'Error fetching exercises: {str(e)}'}), 500
 
@@ -190,7 +207,9 @@ def add_exercise_to_plan(current_user, plan_id):
         )
         
         db.session.add(new_exercise)
+        bump_plan_version(plan)
         db.session.commit()
+        invalidate_coach(plan.coach_id)
         
         return jsonify(new_exercise.to_dict()), 201
     except Exception as e:
@@ -225,7 +244,9 @@ def update_exercise(current_user, exercise_id):
         exercise.order = data.get('order', exercise.order)
         exercise.day_number = data.get('day_number', exercise.day_number)
         
+        bump_plan_version(plan)
         db.session.commit()
+        invalidate_coach(plan.coach_id)
         return jsonify(exercise.to_dict()), 200
     except Exception as e:
         db.session.rollback()
@@ -248,13 +269,143 @@ def delete_exercise(current_user, exercise_id):
             return jsonify({'message': 'Unauthorized'}), 403
         
         db.session.delete(exercise)
+        bump_plan_version(plan)
         db.session.commit()
+        invalidate_coach(plan.coach_id)
         return jsonify({'message': 'Exercise deleted successfully'}), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': f'Error deleting exercise: {str(e)}'}), 500
 
 
+EXERCISE_FIELDS = ('name', 'sets', 'reps', 'rest_seconds', 'tempo', 'instructions',
+                   'video_url', 'notes', 'order', 'day_number')
+# Values of fields a new exercise leaves out (the model defaults); every inserted
+# row carries all EXERCISE_FIELDS, as the multi-row INSERT takes its columns from one row
+NEW_EXERCISE_DEFAULTS = {**dict.fromkeys(EXERCISE_FIELDS), 'rest_seconds': 60}
+
+
+@training_plan_bp.route('/coach/training-plans/<plan_id>/exercises/batch', methods=['PUT'])
+@token_required
+@coach_required
+def batch_update_plan_exercises(current_user, plan_id):
+    """
+    Insert, update, delete and reorder many exercises of a plan in one transaction.
+    Body:
+    - version: plan version the edit is based on (409 if the plan changed since)
+    - exercises: list of exercise objects; items with an id update that exercise
+      (only the fields given), items without one are inserted. New items without
+      an order are placed after the last exercise of their day, in list order.
+    - delete_ids: exercise ids to delete (400 if also listed in exercises)
+    - replace: true to also delete every exercise in scope that is not listed
+    - day_number: limit the edit to one day (the scope for replace, and the
+      default day for new items)
+    Returns the plan's new version and full exercise list.
+    """
+    try:
+        plan = TrainingPlan.query.filter_by(id=plan_id, coach_id=current_user.coach_profile.id).first()
+        if not plan:
+            return jsonify({'message': 'Training plan not found'}), 404
+
+        data = request.json or {}
+        items = data.get('exercises') or []
+        delete_ids = set(data.get('delete_ids') or [])
+        scope_day = data.get('day_number')
+
+        if 'version' not in data:
+            return jsonify({'message': 'version is required'}), 400
+        if not isinstance(items, list):
+            return jsonify({'message': 'exercises must be a list'}), 400
+        conflicting = sorted(delete_ids & {item['id'] for item in items if item.get('id')})
+        if conflicting:
+            return jsonify({'message': 'Exercises cannot be both updated and deleted', 'ids': conflicting}), 400
+
+        # Claim the version first: the conditional UPDATE also locks the plan row,
+        # so concurrent batch edits of the same plan are serialized
+        claimed = db.session.execute(
+            update(TrainingPlan)
+            .where(TrainingPlan.id == plan_id, TrainingPlan.version == data['version'])
+            .values(version=TrainingPlan.version + 1, updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not claimed:
+            db.session.rollback()
+            current = db.session.query(TrainingPlan.version).filter_by(id=plan_id).scalar()
+            return jsonify({'message': 'Training plan was changed by someone else', 'version': current}), 409
+
+        existing_rows = db.session.query(Exercise.id, Exercise.day_number, Exercise.order).filter_by(
+            training_plan_id=plan_id
+        ).all()
+        existing = {exercise_id: day for exercise_id, day, _ in existing_rows}
+
+        unknown = [item['id'] for item in items if item.get('id') and item['id'] not in existing]
+        unknown += [exercise_id for exercise_id in delete_ids if exercise_id not in existing]
+        if unknown:
+            db.session.rollback()
+            return jsonify({'message': 'Exercises not in this plan', 'ids': unknown}), 400
+
+        # Next free position per day, after kept exercises and orders given in this batch
+        positions = {}
+        for exercise_id, day, order in existing_rows:
+            if exercise_id not in delete_ids:
+                positions[day or 1] = max(positions.get(day or 1, 0), (order or 0) + 1)
+        for item in items:
+            if item.get('order') is not None:
+                day = item.get('day_number') or existing.get(item.get('id')) or scope_day or 1
+                positions[day] = max(positions.get(day, 0), item['order'] + 1)
+
+        inserts = []
+        updates = []
+        for item in items:
+            values = {field: item[field] for field in EXERCISE_FIELDS if field in item}
+            if item.get('id'):
+                # Updates only change the fields given; order stays unless sent
+                updates.append({'id': item['id'], **values})
+                continue
+
+            if not values.get('name'):
+                db.session.rollback()
+                return jsonify({'message': 'name is required for new exercises'}), 400
+            day = values.get('day_number') or scope_day or 1
+            if values.get('order') is None:
+                values['order'] = positions.get(day, 0)
+                positions[day] = values['order'] + 1
+            values.setdefault('day_number', day)
+            inserts.append({'id': str(uuid.uuid4()), 'training_plan_id': plan_id, **NEW_EXERCISE_DEFAULTS, **values})
+
+        if data.get('replace'):
+            listed = {item['id'] for item in items if item.get('id')}
+            delete_ids |= {
+                exercise_id for exercise_id, day in existing.items()
+                if exercise_id not in listed and (scope_day is None or day == scope_day)
+            }
+
+        if delete_ids:
+            db.session.execute(
+                delete(Exercise).where(Exercise.id.in_(delete_ids)).execution_options(synchronize_session=False)
+            )
+        if updates:
+            db.session.execute(update(Exercise), updates)
+        if inserts:
+            db.session.execute(insert(Exercise.__table__), inserts)
+
+        db.session.commit()
+        invalidate_plan(plan_id)
+        invalidate_coach(plan.coach_id)
+
+        db.session.refresh(plan)
+        return jsonify({
+            'version': plan.version,
+            'inserted': len(inserts),
+            'updated': len(updates),
+            'deleted': len(delete_ids),
+            'exercises': plan_exercises([plan])[plan.id]
+        }), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': f'Error updating exercises: {str(e)}'}), 500
+
+
 @training_plan_bp.route('/coach/training-plans/<plan_id>/assign', methods=['POST'])
 @token_required
 @coach_required
@@ -273,30 +424,104 @@ def assign_plan_to_customer(current_user, plan_id):
         if not customer:
             return jsonify({'message': 'Customer not found'}), 404
         
-        # Add customer to assigned list
-        assigned_ids = plan.assigned_customer_ids or []
-        if customer_id not in assigned_ids:
-            assigned_ids.append(customer_id)
-            plan.assigned_customer_ids = assigned_ids
-            
-            # Set start_date to today if not already set
-            if not plan.start_date:
-                plan.start_date = date.today()
-            
-            # Calculate end_date if not set and duration_weeks is available
-            if not plan.end_date and plan.duration_weeks:
-                from datetime import timedelta
-                plan.end_date = plan.start_date + timedelta(weeks=plan.duration_weeks)
-            
-            plan.updated_at = datetime.utcnow()
-            db.session.commit()
-        
+        # Optional per-customer window inside the plan's own dates
+        try:
+            assignment_start = datetime.strptime(data['start_date'], '%Y-%m-%d').date() if data.get('start_date') else None
+            assignment_end = datetime.strptime(data['end_date'], '%Y-%m-%d').date() if data.get('end_date') else None
+        except ValueError:
+            return jsonify({'message': 'Invalid date format. Use YYYY-MM-DD'}), 400
+
+        assign_customer(plan, customer_id, assignment_start, assignment_end)
+
+        # Set start_date to today if not already set
+        if not plan.start_date:
+            plan.start_date = date.today()
+
+        # Calculate end_date if not set and duration_weeks is available
+        if not plan.end_date and plan.duration_weeks:
+            from datetime import timedelta
+            plan.end_date = plan.start_date + timedelta(weeks=plan.duration_weeks)
+
+        bump_plan_version(plan)
+        db.session.commit()
+        invalidate_coach(plan.coach_id)
+
         return jsonify({'message': 'Training plan assigned successfully', 'plan': plan.to_dict()}), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': f'Error assigning training plan: {str(e)}'}), 500
 
 
+@training_plan_bp.route('/coach/training-plans/<plan_id>/clone', methods=['POST'])
+@token_required
+@coach_required
+def clone_training_plan(current_user, plan_id):
+    """
+    Copy a plan and its exercises to many customers, assigning each their own copy.
+    Body:
+    - customer_ids: customers to clone for (ids of other coaches' customers are skipped)
+    - name, description, difficulty, duration_weeks, start_date, end_date: optional
+      values for the copies instead of the template's
+    Up to CLONE_BACKGROUND_THRESHOLD customers are cloned inline (201); more run as
+    a background job (202) whose progress is read from GET /coach/jobs/<id>.
+    """
+    try:
+        plan = TrainingPlan.query.filter_by(id=plan_id, coach_id=current_user.coach_profile.id).first()
+        if not plan:
+            return jsonify({'message': 'Training plan not found'}), 404
+
+        data = request.json or {}
+        customer_ids = data.get('customer_ids')
+        if not customer_ids or not isinstance(customer_ids, list):
+            return jsonify({'message': 'customer_ids must be a non-empty list'}), 400
+
+        overrides = {field: data[field] for field in CLONE_PLAN_FIELDS if field in data}
+        try:
+            for field in ('start_date', 'end_date'):
+                if overrides.get(field):
+                    overrides[field] = datetime.strptime(overrides[field], '%Y-%m-%d').date()
+        except ValueError:
+            return jsonify({'message': 'Invalid date format. Use YYYY-MM-DD'}), 400
+
+        targets = clone_targets(current_user.coach_profile.id, customer_ids)
+        if not targets:
+            return jsonify({'message': 'No matching customers found'}), 404
+
+        if len(targets) > CLONE_BACKGROUND_THRESHOLD:
+            job = start_job(
+                'training_plan.clone', current_user.id, len(targets),
+                clone_plan, plan.id, targets, overrides
+            )
+            return jsonify({
+                'message': f'Cloning training plan for {len(targets)} customers in the background',
+                'job': job.to_dict()
+            }), 202
+
+        result = clone_plan(plan.id, targets, overrides)
+        return jsonify({
+            'message': f'Training plan cloned for {result["cloned"]} customers',
+            'skipped': len(set(customer_ids)) - result['cloned'],
+            **result
+        }), 201
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': f'Error cloning training plan: {str(e)}'}), 500
+
+
+@training_plan_bp.route('/coach/jobs/<job_id>', methods=['GET'])
+@token_required
+@coach_required
+def get_coach_job(current_user, job_id):
+    """Poll the progress of a background job started by this coach"""
+    try:
+        job = BackgroundJob.query.filter_by(id=job_id, created_by=current_user.id).first()
+        if not job:
+            return jsonify({'message': 'Job not found'}), 404
+        return jsonify(job.to_dict()), 200
+    except Exception as e:
+        return jsonify({'message': f'Error retrieving job: {str(e)}'}), 500
+
+
 @training_plan_bp.route('/coach/training-plans/<plan_id>/unassign', methods=['POST'])
 @token_required
 @coach_required
@@ -311,12 +536,10 @@ def unassign_plan_from_customer(current_user, plan_id):
         customer_id = data.get('customer_id')
         
         # Remove customer from assigned list
-        assigned_ids = plan.assigned_customer_ids or []
-        if customer_id in assigned_ids:
-            assigned_ids.remove(customer_id)
-            plan.assigned_customer_ids = assigned_ids
-            plan.updated_at = datetime.utcnow()
+        if unassign_customer(plan, customer_id):
+            bump_plan_version(plan)
             db.session.commit()
+            invalidate_coach(plan.coach_id)
         
         return jsonify({'message': 'Training plan unassigned successfully'}), 200
     except Exception as e:
@@ -335,23 +558,14 @@ def get_customer_training_plans(current_user):
         if not current_user.customer_profile or not current_user.customer_profile.coach_id:
             return jsonify([]), 200 # Return empty list if no profile or coach
 
-        # Find plans where customer is in assigned_customer_ids
-        all_plans = TrainingPlan.query.filter_by(coach_id=current_user.customer_profile.coach_id).all()
-        assigned_plans = [plan for plan in all_plans if current_user.customer_profile.id in (plan.assigned_customer_ids or [])]
-        
-        # Filter to show only active plans for customers
-        assigned_plans = [plan for plan in assigned_plans if plan.status == 'active']
-        
-        # Include exercises for each plan
-        plans_with_exercises = []
-        for plan in assigned_plans:
-            plan_dict = plan.to_dict()
-            # Fetch exercises from Exercise table
-            exercises = Exercise.query.filter_by(training_plan_id=plan.id).order_by(Exercise.day_number, Exercise.order).all()
-            plan_dict['exercises'] = [ex.to_dict() for ex in exercises]
-            plans_with_exercises.append(plan_dict)
+        # Find the coach's active plans assigned to this customer (plan_assignment index)
+        assigned_plans = customer_plans_query(current_user.customer_profile.id).filter(
+            TrainingPlan.coach_id == current_user.customer_profile.coach_id,
+            TrainingPlan.status_is('active')
+        ).all()
         
-        return jsonify(plans_with_exercises), 200
+        # Include exercises for each plan (cached per plan version, misses loaded in one query)
+        return jsonify(plan_documents(assigned_plans)), 200
     except Exception as e:
         import traceback
         error_details = traceback.format_exc()
@@ -370,12 +584,14 @@ def get_customer_plan_exercises(current_user, plan_id):
             return jsonify({'message': 'Customer profile not found'}), 404
 
         # Verify customer has access to this plan
-        plan = TrainingPlan.query.get(plan_id)
-        if not plan or current_user.customer_profile.id not in (plan.assigned_customer_ids or []):
+        plan = TrainingPlan.query.join(PlanAssignment, PlanAssignment.plan_id == TrainingPlan.id).filter(
+            TrainingPlan.id == plan_id,
+            PlanAssignment.customer_id == current_user.customer_profile.id
+        ).first()
+        if not plan:
             return jsonify({'message': 'Training plan not found'}), 404
         
-        exercises = Exercise.query.filter_by(training_plan_id=plan_id).order_by(Exercise.day_number, Exercise.order).all()
-        return jsonify([ex.to_dict() for ex in exercises]), 200
+        return jsonify(plan_exercises([plan])[plan.id]), 200
     except Exception as e:
         return jsonify({'message': f'Error fetching exercises: {str(e)}'}), 500
 
@@ -389,7 +605,7 @@ def log_workout_completion(current_user):
         data = request.json
         
         workout_completion = WorkoutCompletion(
-            customer_id=current_user.customer_profile.id,
+            customer_id=current_user.id,
             training_plan_id=data.get('training_plan_id'),
             day_number=data.get('day_number'),
             duration_minutes=data.get('duration_minutes'),
@@ -399,6 +615,8 @@ def log_workout_completion(current_user):
         
         db.session.add(workout_completion)
         db.session.commit()
+        if current_user.customer_profile:
+            invalidate_coach(current_user.customer_profile.coach_id)
         
         return jsonify(workout_completion.to_dict()), 201
     except Exception as e:
@@ -406,6 +624,33 @@ def log_workout_completion(current_user):
         return jsonify({'message': f'Error logging workout: {str(e)}'}), 500
 
 
+@training_plan_bp.route('/customer/workouts', methods=['POST'])
+@token_required
+@customer_required
+def log_full_workout(current_user):
+    """
+    Log a workout together with all its exercise and set results in one call.
+    Body: training_plan_id, day_number, optional id (client-generated, makes
+    retries safe), completed_at, duration_minutes, notes, rating, and
+    exercises: [{exercise_id, notes, is_pr, sets: [{reps, weight}, ...]}]
+    Returns the stored workout (201, or 200 if this id was already logged).
+    """
+    try:
+        workout_id, created = log_workout(current_user, request.json or {})
+        db.session.commit()
+        if current_user.customer_profile:
+            invalidate_coach(current_user.customer_profile.coach_id)
+
+        workout = load_workout(workout_id, current_user.id)
+        return jsonify(workout.to_dict()), 201 if created else 200
+    except WorkoutLogError as e:
+        db.session.rollback()
+        return jsonify({'message': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': f'Error logging workout: {str(e)}'}), 500
+
+
 @training_plan_bp.route('/customer/exercise-completions', methods=['POST'])
 @token_required
 @customer_required
@@ -414,18 +659,36 @@ def log_exercise_completion(current_user):
     try:
         data = request.json
         
+        # Only the customer's own workout, and only exercises of its plan (as log_workout checks)
+        workout = WorkoutCompletion.query.filter_by(
+            id=data.get('workout_completion_id'), customer_id=current_user.id
+        ).first()
+        if not workout:
+            return jsonify({'message': 'Workout not found'}), 404
+        in_plan = db.session.query(Exercise.id).filter(
+            Exercise.id == data.get('exercise_id'), Exercise.training_plan_id == workout.training_plan_id
+        ).first()
+        if not in_plan:
+            return jsonify({'message': 'Exercise not in this training plan'}), 400
+        
         exercise_completion = ExerciseCompletion(
-            workout_completion_id=data.get('workout_completion_id'),
+            workout_completion_id=workout.id,
             exercise_id=data.get('exercise_id'),
             sets_completed=data.get('sets_completed'),
             reps_completed=data.get('reps_completed'),
             weight_used=data.get('weight_used'),
-            notes=data.get('notes'),
-            is_pr=data.get('is_pr', False)
+            notes=data.get('notes')
         )
+        exercise_completion.sets = [
+            ExerciseSet(set_number=number, **set_result)
+            for number, set_result in enumerate(parse_sets(data.get('reps_completed'), data.get('weight_used')), start=1)
+        ]
         
         db.session.add(exercise_completion)
+        db.session.flush()
+        record_completions([exercise_completion.id])
         db.session.commit()
+        db.session.refresh(exercise_completion)
         
         return jsonify(exercise_completion.to_dict()), 201
     except Exception as e:
@@ -433,14 +696,112 @@ def log_exercise_completion(current_user):
         return jsonify({'message': f'Error logging exercise: {str(e)}'}), 500
 
 
+@training_plan_bp.route('/customer/progress', methods=['GET'])
+@token_required
+@customer_required
+def get_customer_progress(current_user):
+    """Per-exercise progress (bests, totals, last performed) for the customer"""
+    try:
+        return jsonify({'exercises': progress_summary(current_user.id)}), 200
+    except Exception as e:
+        return jsonify({'message': f'Error fetching progress: {str(e)}'}), 500
+
+
+@training_plan_bp.route('/customer/progress/weekly', methods=['GET'])
+@token_required
+@customer_required
+def get_customer_progress_series(current_user):
+    """Weekly series for one exercise: ?exercise=<name>&weeks=12"""
+    try:
+        exercise = request.args.get('exercise')
+        if not exercise:
+            return jsonify({'message': 'exercise is required'}), 400
+        weeks = min(max(request.args.get('weeks', DEFAULT_SERIES_WEEKS, type=int), 1), 104)
+        return jsonify(progress_series(current_user.id, exercise, weeks)), 200
+    except Exception as e:
+        return jsonify({'message': f'Error fetching progress: {str(e)}'}), 500
+
+
+@training_plan_bp.route('/coach/customers/<customer_id>/progress', methods=['GET'])
+@token_required
+@coach_required
+def get_customer_progress_for_coach(current_user, customer_id):
+    """Per-exercise progress of one of the coach's customers"""
+    try:
+        customer = CustomerProfile.query.filter_by(id=customer_id, coach_id=current_user.coach_profile.id).first()
+        if not customer:
+            return jsonify({'message': 'Customer not found'}), 404
+        return jsonify({'exercises': progress_summary(customer.user_id)}), 200
+    except Exception as e:
+        return jsonify({'message': f'Error fetching progress: {str(e)}'}), 500
+
+
+@training_plan_bp.route('/coach/customers/<customer_id>/progress/weekly', methods=['GET'])
+@token_required
+@coach_required
+def get_customer_progress_series_for_coach(current_user, customer_id):
+    """Weekly series for one exercise of one of the coach's customers: ?exercise=<name>&weeks=12"""
+    try:
+        customer = CustomerProfile.query.filter_by(id=customer_id, coach_id=current_user.coach_profile.id).first()
+        if not customer:
+            return jsonify({'message': 'Customer not found'}), 404
+        exercise = request.args.get('exercise')
+        if not exercise:
+            return jsonify({'message': 'exercise is required'}), 400
+        weeks = min(max(request.args.get('weeks', DEFAULT_SERIES_WEEKS, type=int), 1), 104)
+        return jsonify(progress_series(customer.user_id, exercise, weeks)), 200
+    except Exception as e:
+        return jsonify({'message': f'Error fetching progress: {str(e)}'}), 500
+
+
 @training_plan_bp.route('/customer/workout-completions', methods=['GET'])
 @token_required
 @customer_required
 def get_workout_completions(current_user):
-    """Get customer's workout completion logs"""
+    """
+    Get customer's workout completion logs, newest first
+    Query params:
+    - summary=1: workouts without nested exercise results, with exercise_count
+    - limit / cursor: page through logs; the response is then
+      {workouts, next_cursor} instead of a plain list
+    """
     try:
-        logs = WorkoutCompletion.query.filter_by(customer_id=current_user.id).order_by(WorkoutCompletion.completed_at.desc()).all()
-        return jsonify([log.to_dict() for log in logs]), 200
+        summary = request.args.get('summary') in ('1', 'true')
+        query = WorkoutCompletion.query.filter_by(customer_id=current_user.id)
+        if not summary:
+            query = query.options(workout_detail_options())
+        columns = [WorkoutCompletion.completed_at, WorkoutCompletion.id]
+
+        paged = 'limit' in request.args or 'cursor' in request.args
+        next_cursor = None
+        if paged:
+            try:
+                logs, next_cursor = keyset_page(
+                    query, columns, cursor=request.args.get('cursor'),
+                    limit=page_size(request.args), descending=True
+                )
+            except ValueError as e:
+                return jsonify({'message': str(e)}), 400
+        else:
+            logs = query.order_by(*[column.desc() for column in columns]).all()
+
+        if summary:
+            counts = dict(
+                db.session.query(ExerciseCompletion.workout_completion_id, db.func.count(ExerciseCompletion.id))
+                .filter(ExerciseCompletion.workout_completion_id.in_([log.id for log in logs]))
+                .group_by(ExerciseCompletion.workout_completion_id)
+                .all()
+            ) if logs else {}
+            logs_data = [
+                {**log.to_dict(include_exercises=False), 'exercise_count': counts.get(log.id, 0)}
+                for log in logs
+            ]
+        else:
+            logs_data = [log.to_dict() for log in logs]
+
+        if not paged:
+            return jsonify(logs_data), 200
+        return jsonify({'workouts': logs_data, 'next_cursor': next_cursor}), 200
     except Exception as e:
         return jsonify({'message': f'Error fetching workout logs: {str(e)}'}), 500
 
@@ -456,7 +817,9 @@ def get_exercise_completions(current_user, log_id):
         if not workout_log:
             return jsonify({'message': 'Workout log not found'}), 404
         
-        exercise_logs = ExerciseCompletion.query.filter_by(workout_completion_id=log_id).all()
+        exercise_logs = ExerciseCompletion.query.options(
+            joinedload(ExerciseCompletion.exercise), selectinload(ExerciseCompletion.sets)
+        ).filter_by(workout_completion_id=log_id).all()
         return jsonify([log.to_dict() for log in exercise_logs]), 200
     except Exception as e:
         return jsonify({'message': f'Error fetching exercise logs: {str(e)}'}), 500
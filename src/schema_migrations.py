@@ -0,0 +1,206 @@
+"""
+Schema Migrations
+Versioned migration runner: applies the SQL files in migrations/ and batched
+backfills (src/backfill.py) in order, recording each in the schema_version table
+
+New databases get their tables from db.create_all(), so SQL migrations marked
+postgresql_only are recorded as 'skipped' elsewhere. Every registered SQL file is
+idempotent, so an existing database can simply run `upgrade`. `baseline` records
+versions as applied without running them.
+
+DDL runs with a short lock_timeout and is retried, so an ALTER that would queue
+behind live booking traffic (and block everything queued after it) backs off.
+
+Usage:
+    python -m src.schema_migrations status
+    python -m src.schema_migrations upgrade [--target 0007] [--max-batches N]
+    python -m src.schema_migrations baseline 0007
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from sqlalchemy.exc import OperationalError
+
+from src.models.user import db
+from src.models.migration import SchemaVersion
+from src.plan_assignments import backfill_plan_assignments
+from src.workout_sets import backfill_exercise_sets
+from src.progress import backfill_exercise_progress
+from src.admin_stats import seed_user_counters, seed_admin_stats
+
+MIGRATIONS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'migrations'))
+
+DDL_LOCK_TIMEOUT_MS = 5000
+DDL_RETRIES = 5
+
+# sql: file in migrations/; backfill: function(max_batches) -> True when complete
+# transactional: False for statements such as CREATE INDEX CONCURRENTLY
+Migration = namedtuple('Migration', ['version', 'name', 'sql', 'backfill', 'transactional', 'postgresql_only'])
+
+
+def migration(version, name, sql=None, backfill=None, transactional=True, postgresql_only=True):
+    return Migration(version, name, sql, backfill, transactional, postgresql_only)
+
+
+MIGRATIONS = [
+    migration('0001', 'coach_assignment_table', sql='add_coach_assignment_table.sql'),
+    migration('0002', 'coach_connections_table', sql='add_coach_connections_table.sql'),
+    migration('0003', 'exercise_search_index', sql='add_exercise_search_index.sql'),
+    migration('0004', 'coach_search_indexes', sql='add_coach_search_indexes.sql'),
+    migration('0005', 'admin_user_indexes', sql='add_admin_user_indexes.sql'),
+    migration('0006', 'audit_log_indexes', sql='add_audit_log_indexes.sql'),
+    migration('0007', 'hot_query_indexes', sql='add_hot_query_indexes.sql', transactional=False),
+    migration('0008', 'plan_assignment_table', sql='add_plan_assignment_table.sql',
+              backfill=backfill_plan_assignments),
+    migration('0009', 'training_plan_version', sql='add_training_plan_version.sql'),
+    migration('0010', 'training_plan_status_index', sql='add_training_plan_status_index.sql'),
+    migration('0011', 'exercise_set_table', sql='add_exercise_set_table.sql',
+              backfill=backfill_exercise_sets),
+    migration('0012', 'exercise_progress', backfill=backfill_exercise_progress),
+    migration('0013', 'recurring_schedule_horizon', sql='add_recurring_schedule_horizon.sql'),
+    migration('0014', 'subscription_renewal_index', sql='add_subscription_renewal_index.sql', transactional=False),
+    migration('0015', 'expiry_sweep_indexes', sql='add_expiry_sweep_indexes.sql', transactional=False),
+    migration('0016', 'user_counters', backfill=seed_user_counters),
+    migration('0017', 'admin_stat_rollups', backfill=seed_admin_stats),
+]
+
+
+def _statements(sql):
+    """Split a migration file into statements, keeping DO $$ ... $$ blocks intact"""
+    statements = []
+    current = []
+    in_dollar_block = False
+    for line in sql.splitlines():
+        stripped = line.strip()
+        if not current and (not stripped or stripped.startswith('--')):
+            continue
+        current.append(line)
+        if line.count('$$') % 2 == 1:
+            in_dollar_block = not in_dollar_block
+        if stripped.endswith(';') and not in_dollar_block:
+            statements.append('\n'.join(current))
+            current = []
+    if current and '\n'.join(current).strip():
+        statements.append('\n'.join(current))
+    return statements
+
+
+def _run_sql(entry, log):
+    with open(os.path.join(MIGRATIONS_DIR, entry.sql), 'r') as f:
+        statements = _statements(f.read())
+
+    for attempt in range(1, DDL_RETRIES + 1):
+        try:
+            if entry.transactional:
+                # All statements in one transaction, failing fast if a table lock isn't granted
+                with db.engine.begin() as connection:
+                    connection.exec_driver_sql(f"SET LOCAL lock_timeout = '{DDL_LOCK_TIMEOUT_MS}ms'")
+                    for statement in statements:
+                        connection.exec_driver_sql(statement)
+            else:
+                with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+                    for statement in statements:
+                        connection.exec_driver_sql(statement)
+            return
+        except OperationalError as e:
+            if attempt == DDL_RETRIES or 'lock timeout' not in str(e.orig).lower():
+                raise
+            backoff = 2 ** attempt
+            log(f"   lock not granted, retrying in {backoff}s")
+            time.sleep(backoff)
+
+
+def applied_versions():
+    return {row.version: row for row in SchemaVersion.query.all()}
+
+
+def pending_migrations(target=None):
+    applied = applied_versions()
+    return [
+        entry for entry in MIGRATIONS
+        if entry.version not in applied and (target is None or entry.version <= target)
+    ]
+
+
+def upgrade(target=None, max_batches=None, log=print):
+    """
+    Apply pending migrations in version order.
+
+    Returns:
+        True when everything up to target is applied, False if a backfill was
+        paused by max_batches (run upgrade again to resume)
+    """
+    postgres = db.engine.dialect.name == 'postgresql'
+
+    for entry in pending_migrations(target):
+        log(f"→ {entry.version} {entry.name}")
+        started = time.monotonic()
+        status = 'applied'
+
+        if entry.sql:
+            if postgres or not entry.postgresql_only:
+                _run_sql(entry, log)
+            else:
+                status = 'skipped'
+
+        if entry.backfill and not entry.backfill(max_batches=max_batches):
+            log(f"⏸  {entry.version} {entry.name} backfill paused; run upgrade again to continue")
+            return False
+
+        db.session.add(SchemaVersion(
+            version=entry.version,
+            name=entry.name,
+            status=status,
+            applied_at=datetime.utcnow(),
+            duration_ms=int((time.monotonic() - started) * 1000)
+        ))
+        db.session.commit()
+        log(f"✅ {entry.version} {entry.name} {status}")
+    return True
+
+
+def baseline(version, log=print):
+    """Record every migration up to version as applied without running it"""
+    for entry in pending_migrations(version):
+        db.session.add(SchemaVersion(version=entry.version, name=entry.name, status='baseline'))
+        log(f"✅ {entry.version} {entry.name} marked as baseline")
+    db.session.commit()
+
+
+def status(log=print):
+    applied = applied_versions()
+    for entry in MIGRATIONS:
+        row = applied.get(entry.version)
+        state = f"{row.status} {row.applied_at:%Y-%m-%d %H:%M}" if row else 'pending'
+        log(f"{entry.version} {entry.name:<40} {state}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Apply versioned schema migrations and backfills')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('status', help='List migrations and whether they are applied')
+    upgrade_parser = subparsers.add_parser('upgrade', help='Apply pending migrations')
+    upgrade_parser.add_argument('--target', help='Stop after this version')
+    upgrade_parser.add_argument('--max-batches', type=int, help='Pause backfills after this many batches')
+    baseline_parser = subparsers.add_parser('baseline', help='Mark migrations up to VERSION as applied')
+    baseline_parser.add_argument('version')
+    args = parser.parse_args()
+
+    from src.main import app
+    with app.app_context():
+        try:
+            if args.command == 'status':
+                status()
+            elif args.command == 'upgrade':
+                upgrade(args.target, args.max_batches)
+            elif args.command == 'baseline':
+                baseline(args.version)
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Migration failed: {str(e)}")
+            sys.exit(1)
@@ -109,8 +109,10 @@ export const customerAPI = {
 export const adminAPI = {
   getUsers: (params = {}) => api.get('/admin/users', { params }),
   updateUserStatus: (userId, statusData) => api.put(`/admin/users/${userId}/status`, statusData),
+  bulkUpdateUserStatus: (payload) => api.post('/admin/users/bulk-status', payload),
+  getJob: (jobId) => api.get(`/admin/jobs/${jobId}`),
   adminResetPassword: (userId) => api.post(`/admin/users/${userId}/reset-password`),
-  getAuditLog: () => api.get('/admin/audit-log'),
+  getAuditLog: (params = {}) => api.get('/admin/audit-log', { params }),
 };
 
 export default api;
@@ -44,16 +44,36 @@ export const coachNetworkApi = {
   },
 
   /**
-   * Get list of all active coaches
-   * @returns {Promise<Object>} List of all coaches
+   * Get a page of active coaches, ordered by name
+   * @param {string|null} cursor - next_cursor from the previous page
+   * @param {number} limit - Page size (default 50, max 100)
+   * @returns {Promise<Object>} Coaches and next_cursor (null on the last page)
    */
-  listAllCoaches: async () => {
+  listCoachesPage: async (cursor = null, limit = 50) => {
     try {
-      const response = await axios.get(`${API_URL}/coach/list`, createAuthRequest());
+      const response = await axios.get(`${API_URL}/coach/list`, {
+        params: cursor ? { cursor, limit } : { limit },
+        ...createAuthRequest()
+      });
       return response.data;
     } catch (error) {
       throw error.response?.data || error;
     }
+  },
+
+  /**
+   * Get every active coach, ordered by name, following next_cursor page by page
+   * @returns {Promise<Object>} All coaches
+   */
+  listAllCoaches: async () => {
+    const coaches = [];
+    let cursor = null;
+    do {
+      const page = await coachNetworkApi.listCoachesPage(cursor, 100);
+      coaches.push(...(page.coaches || []));
+      cursor = page.next_cursor;
+    } while (cursor);
+    return { coaches };
   }
 };
 
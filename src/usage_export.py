@@ -0,0 +1,271 @@
+"""
+Usage Export
+Per-period usage and billing report of a coach: for every customer and
+subscription, the sessions booked, delivered, cancelled and still pending in
+each calendar month (or week), and the credits granted, used and expired in it
+
+Credits used are the period's confirmed sessions charged to a limited
+subscription; credits granted (allocations, renewals) and expired come from the
+credit ledger, by the subscription period each entry belongs to. Unlimited
+packages grant and use no credits.
+
+The report is one aggregate query over the coach's bookings (served by
+idx_booking_coach_start) and ledger entries (idx_credit_ledger_coach_created),
+read through a server-side cursor (yield_per), and is
+written as CSV or NDJSON in chunks as rows arrive - optionally gzip-compressed
+on the fly - so memory stays flat however large the studio is.
+
+Served by GET /api/packages/usage-export, or from the command line:
+    python -m src.usage_export --coach COACH_PROFILE_ID [--format ndjson] [--gzip] [-o usage.csv.gz]
+"""
+
+import argparse
+import csv
+import io
+import json
+import sys
+import zlib
+from datetime import date, datetime, timedelta
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import and_, case, func, literal, select, union_all
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.types import String
+
+from src.models.user import db, User, CustomerProfile, Package, PackageSubscription, Booking
+from src.models.credit_ledger import CreditLedgerEntry
+
+EXPORT_FORMATS = ('csv', 'ndjson')
+EXPORT_FETCH_SIZE = 1000   # rows per server-side cursor fetch
+EXPORT_CHUNK_ROWS = 500    # rows per chunk written to the response / file
+
+# The first six describe the row, the rest are per-period totals
+EXPORT_COLUMNS = (
+    'period_start', 'customer_id', 'customer_name', 'customer_email', 'subscription_id', 'package_name',
+    'sessions_booked', 'sessions_delivered', 'sessions_cancelled', 'sessions_pending',
+    'credits_granted', 'credits_used', 'credits_expired'
+)
+
+
+class month_start(FunctionElement):
+    """First day of the calendar month a timestamp falls in, as 'YYYY-MM-DD'"""
+    type = String()
+    inherit_cache = True
+
+
+class week_start(FunctionElement):
+    """Monday of the week a timestamp falls in, as 'YYYY-MM-DD'"""
+    type = String()
+    inherit_cache = True
+
+
+@compiles(month_start, 'postgresql')
+def _month_start_postgresql(element, compiler, **kw):
+    return f"to_char(date_trunc('month', {compiler.process(element.clauses, **kw)}), 'YYYY-MM-DD')"
+
+
+@compiles(month_start)
+def _month_start_default(element, compiler, **kw):
+    return f"date({compiler.process(element.clauses, **kw)}, 'start of month')"
+
+
+@compiles(week_start, 'postgresql')
+def _week_start_postgresql(element, compiler, **kw):
+    return f"to_char(date_trunc('week', {compiler.process(element.clauses, **kw)}), 'YYYY-MM-DD')"
+
+
+@compiles(week_start)
+def _week_start_default(element, compiler, **kw):
+    # SQLite: 'weekday 0' moves to the week's Sunday, six days back is its Monday
+    return f"date({compiler.process(element.clauses, **kw)}, 'weekday 0', '-6 days')"
+
+
+PERIOD_STARTS = {'month': month_start, 'week': week_start}
+
+
+def default_range(today=None):
+    """The last twelve calendar months including the current one, as [first_day, last_day)"""
+    today = today or date.today()
+    return today.replace(day=1) - relativedelta(months=11), today + timedelta(days=1)
+
+
+def _booking_facts(coach_id, first_day, last_day, period, now):
+    """One row per booking: session counts and credits used (confirmed on a limited subscription)"""
+    confirmed = Booking.status == 'confirmed'
+
+    def flag(condition):
+        return case((condition, 1), else_=0)
+
+    return select(
+        PERIOD_STARTS[period](Booking.start_time).label('period_start'),
+        Booking.customer_id,
+        Booking.subscription_id,
+        flag(confirmed).label('sessions_booked'),
+        flag(and_(confirmed, Booking.end_time <= now)).label('sessions_delivered'),
+        flag(Booking.status == 'cancelled').label('sessions_cancelled'),
+        flag(Booking.status.in_(['pending', 'pending_credits'])).label('sessions_pending'),
+        literal(0).label('credits_granted'),
+        flag(and_(confirmed, Booking.subscription_id.isnot(None), Package.is_unlimited.isnot(True))).label('credits_used'),
+        literal(0).label('credits_expired')
+    ).outerjoin(
+        PackageSubscription, PackageSubscription.id == Booking.subscription_id
+    ).outerjoin(
+        Package, Package.id == PackageSubscription.package_id
+    ).where(
+        Booking.coach_id == coach_id,
+        Booking.event_type == 'customer_session',
+        Booking.start_time >= first_day,
+        Booking.start_time < last_day
+    )
+
+
+def _ledger_facts(coach_id, first_day, last_day, period):
+    """
+    One row per credit ledger entry: credits granted (allocations, renewals) and
+    expired, dated by the subscription period they belong to - not by when the
+    renewal job happened to run
+    """
+    limited = Package.is_unlimited.isnot(True)
+    entry_date = func.coalesce(CreditLedgerEntry.period_start, CreditLedgerEntry.created_at)
+    return select(
+        PERIOD_STARTS[period](entry_date).label('period_start'),
+        CreditLedgerEntry.customer_id,
+        CreditLedgerEntry.subscription_id,
+        literal(0).label('sessions_booked'),
+        literal(0).label('sessions_delivered'),
+        literal(0).label('sessions_cancelled'),
+        literal(0).label('sessions_pending'),
+        case(
+            (and_(CreditLedgerEntry.entry_type.in_(['allocation', 'renewal']), limited), CreditLedgerEntry.delta),
+            else_=0
+        ).label('credits_granted'),
+        literal(0).label('credits_used'),
+        case((CreditLedgerEntry.entry_type == 'expiry', -CreditLedgerEntry.delta), else_=0).label('credits_expired')
+    ).join(
+        PackageSubscription, PackageSubscription.id == CreditLedgerEntry.subscription_id
+    ).join(
+        Package, Package.id == PackageSubscription.package_id
+    ).where(
+        CreditLedgerEntry.coach_id == coach_id,
+        entry_date >= first_day,
+        entry_date < last_day
+    )
+
+
+def usage_query(coach_id, first_day, last_day, period='month', now=None):
+    """
+    Aggregate rows of the report for bookings starting, and ledger entries
+    dated (period_start, else created_at), in [first_day, last_day)
+    """
+    now = now or datetime.utcnow()
+    facts = union_all(
+        _booking_facts(coach_id, first_day, last_day, period, now),
+        _ledger_facts(coach_id, first_day, last_day, period)
+    ).subquery('facts')
+
+    def total(column):
+        return func.coalesce(func.sum(facts.c[column]), 0).label(column)
+
+    return select(
+        facts.c.period_start,
+        facts.c.customer_id,
+        (User.first_name + ' ' + User.last_name).label('customer_name'),
+        User.email.label('customer_email'),
+        facts.c.subscription_id,
+        Package.name.label('package_name'),
+        *(total(column) for column in EXPORT_COLUMNS[6:])
+    ).join(
+        CustomerProfile, CustomerProfile.id == facts.c.customer_id
+    ).join(
+        User, User.id == CustomerProfile.user_id
+    ).outerjoin(
+        PackageSubscription, PackageSubscription.id == facts.c.subscription_id
+    ).outerjoin(
+        Package, Package.id == PackageSubscription.package_id
+    ).group_by(
+        facts.c.period_start, facts.c.customer_id, User.first_name, User.last_name, User.email,
+        facts.c.subscription_id, Package.name
+    ).order_by(facts.c.period_start, User.first_name, User.last_name, facts.c.customer_id, facts.c.subscription_id)
+
+
+def usage_rows(coach_id, first_day, last_day, period='month'):
+    """Report rows as dicts, fetched EXPORT_FETCH_SIZE at a time from a server-side cursor"""
+    result = db.session.execute(
+        usage_query(coach_id, first_day, last_day, period).execution_options(yield_per=EXPORT_FETCH_SIZE)
+    )
+    for row in result:
+        yield {column: getattr(row, column) for column in EXPORT_COLUMNS}
+
+
+def _csv_chunks(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for index, row in enumerate(rows, 1):
+        writer.writerow([row[column] for column in EXPORT_COLUMNS])
+        if index % EXPORT_CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _ndjson_chunks(rows):
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(row, default=str))
+        if len(lines) == EXPORT_CHUNK_ROWS:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def _gzip(chunks):
+    compressor = zlib.compressobj(wbits=31)  # 31: gzip header and trailer
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_chunks(coach_id, first_day, last_day, period='month', fmt='csv', compress=False):
+    """The report as an iterator of bytes chunks, ready to stream"""
+    rows = usage_rows(coach_id, first_day, last_day, period)
+    chunks = (chunk.encode('utf-8') for chunk in (_csv_chunks(rows) if fmt == 'csv' else _ndjson_chunks(rows)))
+    return _gzip(chunks) if compress else chunks
+
+
+def export_filename(first_day, last_day, fmt='csv', compress=False):
+    name = f"usage_{first_day.isoformat()}_{(last_day - timedelta(days=1)).isoformat()}.{fmt}"
+    return name + '.gz' if compress else name
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Export a coach's usage and billing report")
+    parser.add_argument('--coach', required=True, help='Coach profile id')
+    parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv')
+    parser.add_argument('--period', choices=list(PERIOD_STARTS), default='month')
+    parser.add_argument('--from', dest='first_day', help='First day (YYYY-MM-DD, default 12 months back)')
+    parser.add_argument('--to', dest='last_day', help='Last day, inclusive (YYYY-MM-DD, default today)')
+    parser.add_argument('--gzip', action='store_true', help='Compress the output')
+    parser.add_argument('-o', '--output', help='Output file (default stdout)')
+    args = parser.parse_args()
+
+    from src.main import app
+    with app.app_context():
+        first_day, last_day = default_range()
+        if args.first_day:
+            first_day = date.fromisoformat(args.first_day)
+        if args.last_day:
+            last_day = date.fromisoformat(args.last_day) + timedelta(days=1)
+
+        output = open(args.output, 'wb') if args.output else sys.stdout.buffer
+        try:
+            for chunk in export_chunks(args.coach, first_day, last_day, args.period, args.format, args.gzip):
+                output.write(chunk)
+        finally:
+            if args.output:
+                output.close()
@@ -0,0 +1,170 @@
+"""
+Workout Logging
+Stores a whole workout - the workout row, its exercise results and their typed
+sets - from one request: ownership is checked with one query per kind of id and
+every table gets a single (multi-row) INSERT, all in one transaction
+
+A client may send its own workout id; repeating a request that already
+succeeded (e.g. a retry after a dropped connection) returns the stored workout
+instead of logging it twice.
+"""
+
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import insert
+from sqlalchemy.orm import selectinload, joinedload
+
+from src.models.user import db, Exercise, PlanAssignment
+from src.models.workout_completion import WorkoutCompletion, ExerciseCompletion, ExerciseSet
+from src.workout_sets import parse_sets, typed_sets, join_sets, set_rows
+from src.progress import record_completions
+
+MAX_EXERCISES_PER_WORKOUT = 100
+MAX_SETS_PER_EXERCISE = 50
+
+
+class WorkoutLogError(ValueError):
+    """The submitted workout is invalid or references something the customer can't log"""
+
+
+def _parse_completed_at(value):
+    """ISO 8601 timestamp as naive UTC, like every other stored timestamp (no offset: taken as UTC)"""
+    if not value:
+        return datetime.utcnow()
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        raise WorkoutLogError('Invalid completed_at. Use ISO 8601')
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _exercise_rows(workout_id, completed_at, item):
+    """(exercise_completions row, its exercise_sets rows) for one submitted exercise"""
+    if not isinstance(item, dict) or not item.get('exercise_id'):
+        raise WorkoutLogError('Every exercise needs an exercise_id')
+
+    row = {
+        'id': str(uuid.uuid4()),
+        'workout_completion_id': workout_id,
+        'exercise_id': item['exercise_id'],
+        'notes': item.get('notes'),
+        'is_pr': False,  # decided by record_completions
+        'completed_at': completed_at
+    }
+
+    sets = item.get('sets')
+    if sets is not None:
+        if not isinstance(sets, list) or len(sets) > MAX_SETS_PER_EXERCISE:
+            raise WorkoutLogError(f'sets must be a list of at most {MAX_SETS_PER_EXERCISE} set results')
+        if not all(isinstance(set_result, dict) for set_result in sets):
+            raise WorkoutLogError('Every set must be an object like {"reps": 10, "weight": 50}')
+        sets = typed_sets(sets)
+        row['sets_completed'] = len(sets)
+        row['reps_completed'] = join_sets(sets, 'reps')
+        row['weight_used'] = join_sets(sets, 'weight')
+    else:
+        sets = parse_sets(item.get('reps_completed'), item.get('weight_used'))[:MAX_SETS_PER_EXERCISE]
+        row['sets_completed'] = item.get('sets_completed', len(sets))
+        row['reps_completed'] = item.get('reps_completed')
+        row['weight_used'] = item.get('weight_used')
+    return row, set_rows(row['id'], sets)
+
+
+def workout_detail_options():
+    """
+    Loader options for serializing workouts with to_dict(): exercise results,
+    their exercise names and sets arrive in three queries for any number of workouts
+    """
+    return selectinload(WorkoutCompletion.exercise_completions).options(
+        joinedload(ExerciseCompletion.exercise),
+        selectinload(ExerciseCompletion.sets)
+    )
+
+
+def load_workout(workout_id, user_id):
+    """A customer's workout with its exercise results, exercise names and sets"""
+    return WorkoutCompletion.query.options(workout_detail_options()).filter_by(
+        id=workout_id, customer_id=user_id
+    ).first()
+
+
+def log_workout(user, data):
+    """
+    Validate and store a nested workout for a customer. Does not commit.
+
+    Body shape:
+        {training_plan_id, day_number, id?, completed_at?, duration_minutes?, notes?, rating?,
+         exercises: [{exercise_id, notes?,
+                      sets: [{reps, weight}, ...] | sets_completed/reps_completed/weight_used}]}
+
+    Returns:
+        (workout_id, created) - created is False when the client's id was already logged
+
+    Raises:
+        WorkoutLogError: invalid body, a plan not assigned to the customer, or
+                         exercises that are not part of that plan
+    """
+    workout_id = data.get('id')
+    if workout_id:
+        existing = db.session.query(WorkoutCompletion.customer_id).filter_by(id=workout_id).scalar()
+        if existing == user.id:
+            return workout_id, False
+        if existing is not None:
+            raise WorkoutLogError('Workout id already in use')
+    else:
+        workout_id = str(uuid.uuid4())
+
+    plan_id = data.get('training_plan_id')
+    day_number = data.get('day_number')
+    items = data.get('exercises') or []
+    if not plan_id or day_number is None:
+        raise WorkoutLogError('training_plan_id and day_number are required')
+    if not isinstance(items, list) or len(items) > MAX_EXERCISES_PER_WORKOUT:
+        raise WorkoutLogError(f'exercises must be a list of at most {MAX_EXERCISES_PER_WORKOUT} items')
+
+    if user.customer_profile is None:
+        raise WorkoutLogError('Customer profile not found')
+    assigned = db.session.query(PlanAssignment.id).filter_by(
+        plan_id=plan_id, customer_id=user.customer_profile.id
+    ).first()
+    if not assigned:
+        raise WorkoutLogError('Training plan not assigned to you')
+
+    completed_at = _parse_completed_at(data.get('completed_at'))
+    rows = []
+    sets = []
+    for item in items:
+        row, item_sets = _exercise_rows(workout_id, completed_at, item)
+        rows.append(row)
+        sets.extend(item_sets)
+
+    exercise_ids = {row['exercise_id'] for row in rows}
+    if exercise_ids:
+        in_plan = {
+            exercise_id for (exercise_id,) in db.session.query(Exercise.id).filter(
+                Exercise.id.in_(exercise_ids), Exercise.training_plan_id == plan_id
+            )
+        }
+        unknown = sorted(exercise_ids - in_plan)
+        if unknown:
+            raise WorkoutLogError(f'Exercises not in this training plan: {", ".join(unknown)}')
+
+    db.session.execute(insert(WorkoutCompletion.__table__).values(
+        id=workout_id,
+        customer_id=user.id,
+        training_plan_id=plan_id,
+        day_number=day_number,
+        completed_at=completed_at,
+        duration_minutes=data.get('duration_minutes'),
+        notes=data.get('notes'),
+        rating=data.get('rating')
+    ))
+    if rows:
+        db.session.execute(insert(ExerciseCompletion.__table__), rows)
+    if sets:
+        db.session.execute(insert(ExerciseSet.__table__), sets)
+    record_completions([row['id'] for row in rows])
+    return workout_id, True
@@ -0,0 +1,157 @@
+"""
+Workout Sets
+Typed per-set results (exercise_sets) for exercise completions: conversion from
+and to the legacy comma-separated reps_completed / weight_used strings, SQL
+aggregates for volume, tonnage and best sets, and the online backfill that
+creates set rows for completions logged before the table existed
+"""
+
+import math
+
+from sqlalchemy import func, insert, select
+
+from src.models.user import db
+from src.models.workout_completion import ExerciseCompletion, ExerciseSet
+from src.backfill import run_backfill
+
+
+def _number(value, cast):
+    if value is None:
+        return None
+    try:
+        number = cast(str(value).strip())
+    except (ValueError, OverflowError):  # 'BW', 'nan' / 'inf' as int
+        return None
+    return number if math.isfinite(number) else None
+
+
+def parse_sets(reps_completed, weight_used):
+    """
+    '10,12,10', '50,50,55' -> [{'reps': 10, 'weight': 50.0}, ...]. Entries that
+    aren't numbers ('to failure', 'BW') become None; the longer list sets the count.
+    Plain numbers (10, 52.5) are read as a single set, as the string columns accepted them.
+    """
+    reps = str(reps_completed).split(',') if reps_completed not in (None, '') else []
+    weights = str(weight_used).split(',') if weight_used not in (None, '') else []
+    count = max(len(reps), len(weights))
+    return [
+        {
+            'reps': _number(reps[index], lambda value: int(float(value))) if index < len(reps) else None,
+            'weight': _number(weights[index], float) if index < len(weights) else None
+        }
+        for index in range(count)
+    ]
+
+
+def typed_sets(sets):
+    """Client set results [{'reps', 'weight'}, ...] coerced to int / float (or None)"""
+    return [
+        {
+            'reps': _number(set_result.get('reps'), lambda value: int(float(value))),
+            'weight': _number(set_result.get('weight'), float)
+        }
+        for set_result in sets
+    ]
+
+
+def _format(value):
+    """Exact text of a set value: 12345.67 -> '12345.67', 50.0 -> '50', 1000000 -> '1000000'"""
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def join_sets(sets, key):
+    """[{'reps': 10}, {'reps': 12}] -> '10,12' for the legacy string columns"""
+    values = [set_result[key] for set_result in sets]
+    if all(value is None for value in values):
+        return None
+    return ','.join(_format(value) for value in values)
+
+
+def set_rows(exercise_completion_id, sets):
+    """exercise_sets rows for one completion, ready for a multi-row INSERT"""
+    return [
+        {
+            'exercise_completion_id': exercise_completion_id,
+            'set_number': number,
+            'reps': set_result['reps'],
+            'weight': set_result['weight']
+        }
+        for number, set_result in enumerate(sets, start=1)
+    ]
+
+
+# Aggregates over exercise_sets - use with a query joined to ExerciseSet
+def set_count():
+    return func.count(ExerciseSet.id)
+
+
+def total_reps():
+    return func.coalesce(func.sum(ExerciseSet.reps), 0)
+
+
+def tonnage():
+    """Sum of reps x weight over weighted sets"""
+    return func.coalesce(func.sum(ExerciseSet.reps * ExerciseSet.weight), 0)
+
+
+def best_weight():
+    return func.max(ExerciseSet.weight)
+
+
+def estimated_one_rep_max():
+    """Best Epley estimate, weight x (1 + reps / 30), over sets with both values"""
+    return func.max(ExerciseSet.weight * (1 + ExerciseSet.reps / 30.0))
+
+
+def completion_totals(exercise_completion_ids):
+    """{exercise_completion_id: {sets, reps, tonnage, best_weight, estimated_1rm}} in one query"""
+    if not exercise_completion_ids:
+        return {}
+    rows = db.session.query(
+        ExerciseSet.exercise_completion_id,
+        set_count(), total_reps(), tonnage(), best_weight(), estimated_one_rep_max()
+    ).filter(
+        ExerciseSet.exercise_completion_id.in_(exercise_completion_ids)
+    ).group_by(ExerciseSet.exercise_completion_id).all()
+    return {
+        row[0]: {
+            'sets': row[1],
+            'reps': int(row[2]),
+            'tonnage': float(row[3]),
+            'best_weight': row[4],
+            'estimated_1rm': round(row[5], 1) if row[5] is not None else None
+        }
+        for row in rows
+    }
+
+
+def backfill_exercise_sets(max_batches=None):
+    """
+    Create exercise_sets rows from the reps_completed / weight_used strings of
+    completions that have none yet, in resumable batches.
+    """
+    def process(completion_ids):
+        completions = db.session.query(
+            ExerciseCompletion.id, ExerciseCompletion.reps_completed, ExerciseCompletion.weight_used
+        ).filter(
+            ExerciseCompletion.id.in_(completion_ids),
+            ~select(ExerciseSet.id).where(
+                ExerciseSet.exercise_completion_id == ExerciseCompletion.id
+            ).exists()
+        ).all()
+
+        rows = [
+            row
+            for completion in completions
+            for row in set_rows(completion.id, parse_sets(completion.reps_completed, completion.weight_used))
+        ]
+        if rows:
+            db.session.execute(insert(ExerciseSet.__table__), rows)
+        return len(rows)
+
+    return run_backfill('exercise_sets_from_strings', ExerciseCompletion.id, process,
+                        batch_size=1000, max_batches=max_batches)
@@ -0,0 +1,56 @@
+import { test, expect } from '@playwright/test';
+
+const API = 'http://localhost:5000/api';
+
+async function coachHeaders(request) {
+  const email = `batch-coach-${Date.now()}@example.com`;
+  await request.post(`${API}/auth/register`, {
+    data: { email, password: 'password', first_name: 'Batch', last_name: 'Coach', role: 'coach' }
+  });
+  const login = await request.post(`${API}/auth/login`, { data: { email, password: 'password' } });
+  const { token } = await login.json();
+  return { Authorization: `Bearer ${token}` };
+}
+
+test('Batch exercise edit stores new items of different shapes', async ({ request }) => {
+  const headers = await coachHeaders(request);
+  const { training_plan: plan } = await (await request.post(`${API}/coach/training-plans`, {
+    headers, data: { name: 'Batch plan', description: 'Batch edits' }
+  })).json();
+
+  const response = await request.put(`${API}/coach/training-plans/${plan.id}/exercises/batch`, {
+    headers,
+    data: {
+      version: plan.version,
+      exercises: [
+        { name: 'New1', sets: 4 },
+        { name: 'New2', reps: '8' },
+        { name: 'New3', sets: 2, reps: '5', tempo: '3-1-1-0' }
+      ]
+    }
+  });
+  expect(response.status()).toBe(200);
+
+  const { exercises } = await response.json();
+  const byName = Object.fromEntries(exercises.map((exercise) => [exercise.name, exercise]));
+  expect(byName.New1).toMatchObject({ sets: 4, reps: null, rest_seconds: 60, order: 0 });
+  expect(byName.New2).toMatchObject({ sets: null, reps: '8', rest_seconds: 60, order: 1 });
+  expect(byName.New3).toMatchObject({ sets: 2, reps: '5', tempo: '3-1-1-0', order: 2 });
+});
+
+test('Batch exercise edit rejects ids both updated and deleted', async ({ request }) => {
+  const headers = await coachHeaders(request);
+  const { training_plan: plan } = await (await request.post(`${API}/coach/training-plans`, {
+    headers, data: { name: 'Batch plan', description: 'Batch edits' }
+  })).json();
+  const exercise = await (await request.post(`${API}/coach/training-plans/${plan.id}/exercises`, {
+    headers, data: { name: 'Squat' }
+  })).json();
+
+  const response = await request.put(`${API}/coach/training-plans/${plan.id}/exercises/batch`, {
+    headers,
+    data: { version: plan.version + 1, delete_ids: [exercise.id], exercises: [{ id: exercise.id, reps: '5' }] }
+  });
+  expect(response.status()).toBe(400);
+  expect((await response.json()).ids).toEqual([exercise.id]);
+});